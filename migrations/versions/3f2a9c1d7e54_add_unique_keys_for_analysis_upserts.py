@@ -0,0 +1,89 @@
+"""Add unique keys so analysis components can be bulk upserted
+
+Revision ID: 3f2a9c1d7e54
+Revises: 9776dbefad1c
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f2a9c1d7e54"
+down_revision = "9776dbefad1c"
+branch_labels = None
+depends_on = None
+
+
+# One row per document for each analysis component table
+COMPONENT_TABLES = [
+    "llm_analysis",
+    "extracted_text",
+    "classifications",
+    "design_elements",
+    "entities",
+    "communication_focus",
+]
+
+
+def upgrade():
+    # Repeated processing used to insert a new component row per run.
+    # Point keywords at the newest analysis of their document before
+    # dropping the older analysis rows.
+    op.execute(
+        """
+        UPDATE llm_keywords
+        SET llm_analysis_id = (
+            SELECT MAX(newest.id)
+            FROM llm_analysis newest
+            WHERE newest.document_id = (
+                SELECT owner.document_id
+                FROM llm_analysis owner
+                WHERE owner.id = llm_keywords.llm_analysis_id
+            )
+        )
+        WHERE llm_analysis_id IN (
+            SELECT id FROM llm_analysis WHERE document_id IS NOT NULL
+        )
+        """
+    )
+
+    for table in COMPONENT_TABLES:
+        op.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE document_id IS NOT NULL
+              AND id NOT IN (
+                SELECT MAX(id) FROM {table}
+                WHERE document_id IS NOT NULL
+                GROUP BY document_id
+              )
+            """
+        )
+        op.create_index(
+            f"uq_{table}_document_id", table, ["document_id"], unique=True
+        )
+
+    op.execute(
+        """
+        DELETE FROM llm_keywords
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM llm_keywords
+            GROUP BY llm_analysis_id, verbatim_term
+        )
+        """
+    )
+    op.create_index(
+        "uq_llm_keywords_analysis_term",
+        "llm_keywords",
+        ["llm_analysis_id", "verbatim_term"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_llm_keywords_analysis_term", table_name="llm_keywords")
+
+    for table in reversed(COMPONENT_TABLES):
+        op.drop_index(f"uq_{table}_document_id", table_name=table)
@@ -0,0 +1,51 @@
+"""Add per-component analysis checkpoints
+
+Revision ID: 5b7d2e8f41c3
+Revises: 3f2a9c1d7e54
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b7d2e8f41c3"
+down_revision = "3f2a9c1d7e54"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analysis_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("component", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("response_hash", sa.String(length=64), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("task_id", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["document_id"], ["documents.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_analysis_checkpoints_document_component",
+        "analysis_checkpoints",
+        ["document_id", "component"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "uq_analysis_checkpoints_document_component",
+        table_name="analysis_checkpoints",
+    )
+    op.drop_table("analysis_checkpoints")
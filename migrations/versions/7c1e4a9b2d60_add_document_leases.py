@@ -0,0 +1,55 @@
+"""Add processing lease columns to documents
+
+Revision ID: 7c1e4a9b2d60
+Revises: 5b7d2e8f41c3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c1e4a9b2d60"
+down_revision = "5b7d2e8f41c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("lease_owner", sa.Text(), nullable=True))
+        batch_op.add_column(
+            sa.Column("lease_expires", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.create_index(
+            "ix_documents_lease_expires", ["lease_expires"], unique=False
+        )
+
+    # Give documents already in flight the old one-hour-since-upload grace
+    # period, after which the lease sweeper picks them up
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            UPDATE documents
+            SET lease_expires = upload_date + INTERVAL '1 hour'
+            WHERE status IN ('PENDING', 'PROCESSING')
+            """
+        )
+    else:
+        op.execute(
+            """
+            UPDATE documents
+            SET lease_expires = datetime(upload_date, '+1 hour')
+            WHERE status IN ('PENDING', 'PROCESSING')
+            """
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.drop_index("ix_documents_lease_expires")
+        batch_op.drop_column("lease_expires")
+        batch_op.drop_column("lease_owner")
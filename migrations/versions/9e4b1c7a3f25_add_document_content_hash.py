@@ -0,0 +1,33 @@
+"""Add content hash to documents
+
+Revision ID: 9e4b1c7a3f25
+Revises: 7c1e4a9b2d60
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e4b1c7a3f25"
+down_revision = "7c1e4a9b2d60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("content_sha256", sa.String(length=64), nullable=True)
+        )
+        batch_op.create_index(
+            "ix_documents_content_sha256", ["content_sha256"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.drop_index("ix_documents_content_sha256")
+        batch_op.drop_column("content_sha256")
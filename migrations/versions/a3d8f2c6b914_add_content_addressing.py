@@ -0,0 +1,50 @@
+"""Add content-addressed storage key and duplicate links to documents
+
+Revision ID: a3d8f2c6b914
+Revises: 9e4b1c7a3f25
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3d8f2c6b914"
+down_revision = "9e4b1c7a3f25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("storage_key", sa.Text(), nullable=True))
+        batch_op.add_column(
+            sa.Column("perceptual_hash", sa.String(length=16), nullable=True)
+        )
+        batch_op.add_column(sa.Column("duplicate_of_id", sa.Integer(), nullable=True))
+        batch_op.add_column(
+            sa.Column("near_duplicate_of_id", sa.Integer(), nullable=True)
+        )
+        batch_op.create_foreign_key(
+            "fk_documents_duplicate_of_id", "documents", ["duplicate_of_id"], ["id"]
+        )
+        batch_op.create_foreign_key(
+            "fk_documents_near_duplicate_of_id",
+            "documents",
+            ["near_duplicate_of_id"],
+            ["id"],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("documents", schema=None) as batch_op:
+        batch_op.drop_constraint(
+            "fk_documents_near_duplicate_of_id", type_="foreignkey"
+        )
+        batch_op.drop_constraint("fk_documents_duplicate_of_id", type_="foreignkey")
+        batch_op.drop_column("near_duplicate_of_id")
+        batch_op.drop_column("duplicate_of_id")
+        batch_op.drop_column("perceptual_hash")
+        batch_op.drop_column("storage_key")
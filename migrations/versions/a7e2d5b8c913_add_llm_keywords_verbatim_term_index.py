@@ -0,0 +1,29 @@
+"""Index llm_keywords by lower(verbatim_term) for taxonomy remapping
+
+Revision ID: a7e2d5b8c913
+Revises: f1a7c4e9d203
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7e2d5b8c913"
+down_revision = "f1a7c4e9d203"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_llm_keywords_verbatim_term_lower",
+        "llm_keywords",
+        [sa.text("lower(verbatim_term)")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_llm_keywords_verbatim_term_lower", table_name="llm_keywords")
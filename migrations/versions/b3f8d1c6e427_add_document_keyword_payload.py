@@ -0,0 +1,27 @@
+"""Add documents.keyword_payload, the precomputed hierarchical keyword list
+
+Revision ID: b3f8d1c6e427
+Revises: a7e2d5b8c913
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b3f8d1c6e427"
+down_revision = "a7e2d5b8c913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Left NULL here; readers fall back to the keyword tables until
+    # scripts/rebuild_keyword_payloads.py has filled it in
+    op.add_column("documents", sa.Column("keyword_payload", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("documents", "keyword_payload")
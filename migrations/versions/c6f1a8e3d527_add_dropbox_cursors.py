@@ -0,0 +1,33 @@
+"""Add persisted Dropbox list_folder cursors
+
+Revision ID: c6f1a8e3d527
+Revises: a3d8f2c6b914
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c6f1a8e3d527"
+down_revision = "a3d8f2c6b914"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dropbox_cursors",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("folder_path", sa.Text(), nullable=False),
+        sa.Column("cursor", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("folder_path"),
+    )
+
+
+def downgrade():
+    op.drop_table("dropbox_cursors")
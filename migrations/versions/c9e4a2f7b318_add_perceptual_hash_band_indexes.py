@@ -0,0 +1,34 @@
+"""Index documents.perceptual_hash by 8-bit bands for near-duplicate lookups
+
+Revision ID: c9e4a2f7b318
+Revises: b3f8d1c6e427
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c9e4a2f7b318"
+down_revision = "b3f8d1c6e427"
+branch_labels = None
+depends_on = None
+
+# DEDUP_SETTINGS['HASH_BANDS'] bands of two hex characters of the 64-bit hash
+BAND_STARTS = range(1, 17, 2)
+
+
+def upgrade():
+    for start in BAND_STARTS:
+        op.create_index(
+            f"ix_documents_phash_band_{start // 2}",
+            "documents",
+            [sa.text(f"substr(perceptual_hash, {start}, 2)")],
+        )
+
+
+def downgrade():
+    for start in BAND_STARTS:
+        op.drop_index(f"ix_documents_phash_band_{start // 2}", table_name="documents")
@@ -0,0 +1,170 @@
+"""Add trigger-maintained document statistics rollups
+
+Revision ID: d2b7e9a4c1f8
+Revises: c6f1a8e3d527
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d2b7e9a4c1f8"
+down_revision = "c6f1a8e3d527"
+branch_labels = None
+depends_on = None
+
+
+# Deltas are applied in (day, status) order so two transactions moving
+# documents between the same counters always lock rows in the same order
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION document_stats_apply(
+        p_day date, p_status text, p_count integer, p_bytes bigint
+    ) RETURNS void AS $$
+    BEGIN
+        INSERT INTO daily_document_stats (day, status, document_count, total_bytes)
+        VALUES (p_day, p_status, p_count, p_bytes)
+        ON CONFLICT (day, status) DO UPDATE SET
+            document_count = daily_document_stats.document_count + EXCLUDED.document_count,
+            total_bytes = daily_document_stats.total_bytes + EXCLUDED.total_bytes;
+        INSERT INTO document_status_counts (status, document_count)
+        VALUES (p_status, p_count)
+        ON CONFLICT (status) DO UPDATE SET
+            document_count = document_status_counts.document_count + EXCLUDED.document_count;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION documents_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM document_stats_apply(NEW.upload_date::date, NEW.status, 1, NEW.file_size);
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM document_stats_apply(OLD.upload_date::date, OLD.status, -1, -OLD.file_size);
+        ELSIF (OLD.upload_date::date, OLD.status) < (NEW.upload_date::date, NEW.status) THEN
+            PERFORM document_stats_apply(OLD.upload_date::date, OLD.status, -1, -OLD.file_size);
+            PERFORM document_stats_apply(NEW.upload_date::date, NEW.status, 1, NEW.file_size);
+        ELSE
+            PERFORM document_stats_apply(NEW.upload_date::date, NEW.status, 1, NEW.file_size);
+            PERFORM document_stats_apply(OLD.upload_date::date, OLD.status, -1, -OLD.file_size);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER documents_stats_insert_delete
+    AFTER INSERT OR DELETE ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_stats_trigger()
+    """,
+    """
+    CREATE TRIGGER documents_stats_update
+    AFTER UPDATE OF status, upload_date, file_size ON documents
+    FOR EACH ROW
+    WHEN (
+        OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.upload_date::date IS DISTINCT FROM NEW.upload_date::date
+        OR OLD.file_size IS DISTINCT FROM NEW.file_size
+    )
+    EXECUTE FUNCTION documents_stats_trigger()
+    """,
+]
+
+
+def _sqlite_apply(row, sign):
+    """Trigger statements adding sign * row to both rollups"""
+    return f"""
+        INSERT OR IGNORE INTO daily_document_stats (day, status, document_count, total_bytes)
+        VALUES (date({row}.upload_date), {row}.status, 0, 0);
+        UPDATE daily_document_stats
+        SET document_count = document_count {sign} 1,
+            total_bytes = total_bytes {sign} {row}.file_size
+        WHERE day = date({row}.upload_date) AND status = {row}.status;
+        INSERT OR IGNORE INTO document_status_counts (status, document_count)
+        VALUES ({row}.status, 0);
+        UPDATE document_status_counts
+        SET document_count = document_count {sign} 1
+        WHERE status = {row}.status;
+    """
+
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER documents_stats_insert AFTER INSERT ON documents
+    BEGIN {_sqlite_apply("NEW", "+")} END
+    """,
+    f"""
+    CREATE TRIGGER documents_stats_delete AFTER DELETE ON documents
+    BEGIN {_sqlite_apply("OLD", "-")} END
+    """,
+    f"""
+    CREATE TRIGGER documents_stats_update
+    AFTER UPDATE OF status, upload_date, file_size ON documents
+    WHEN OLD.status IS NOT NEW.status
+        OR date(OLD.upload_date) IS NOT date(NEW.upload_date)
+        OR OLD.file_size IS NOT NEW.file_size
+    BEGIN {_sqlite_apply("OLD", "-")} {_sqlite_apply("NEW", "+")} END
+    """,
+]
+
+BACKFILL = [
+    """
+    INSERT INTO daily_document_stats (day, status, document_count, total_bytes)
+    SELECT date(upload_date), status, count(*), sum(file_size)
+    FROM documents
+    GROUP BY date(upload_date), status
+    """,
+    """
+    INSERT INTO document_status_counts (status, document_count)
+    SELECT status, count(*) FROM documents GROUP BY status
+    """,
+]
+
+
+def upgrade():
+    op.create_table(
+        "daily_document_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("document_count", sa.Integer(), nullable=False),
+        sa.Column("total_bytes", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "status"),
+    )
+    op.create_table(
+        "document_status_counts",
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("document_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("status"),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Hold off writers so the backfill and the triggers see the same rows
+        op.execute("LOCK TABLE documents IN SHARE MODE")
+        triggers = POSTGRES_TRIGGERS
+    else:
+        triggers = SQLITE_TRIGGERS
+
+    for statement in BACKFILL + triggers:
+        op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS documents_stats_update ON documents")
+        op.execute("DROP TRIGGER IF EXISTS documents_stats_insert_delete ON documents")
+        op.execute("DROP FUNCTION IF EXISTS documents_stats_trigger()")
+        op.execute(
+            "DROP FUNCTION IF EXISTS document_stats_apply(date, text, integer, bigint)"
+        )
+    else:
+        op.execute("DROP TRIGGER IF EXISTS documents_stats_update")
+        op.execute("DROP TRIGGER IF EXISTS documents_stats_delete")
+        op.execute("DROP TRIGGER IF EXISTS documents_stats_insert")
+
+    op.drop_table("document_status_counts")
+    op.drop_table("daily_document_stats")
@@ -0,0 +1,40 @@
+"""Add a unique scorecard per document so scorecards can be bulk upserted
+
+Revision ID: e5c3a9f1b742
+Revises: d2b7e9a4c1f8
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e5c3a9f1b742"
+down_revision = "d2b7e9a4c1f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the newest scorecard of any document that was evaluated twice
+    op.execute(
+        """
+        DELETE FROM document_scorecards
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM document_scorecards GROUP BY document_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_document_scorecards_document_id",
+        "document_scorecards",
+        ["document_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "uq_document_scorecards_document_id", table_name="document_scorecards"
+    )
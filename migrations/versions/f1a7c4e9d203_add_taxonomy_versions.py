@@ -0,0 +1,36 @@
+"""Add taxonomy_versions to track bulk taxonomy loads
+
+Revision ID: f1a7c4e9d203
+Revises: e5c3a9f1b742
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f1a7c4e9d203"
+down_revision = "e5c3a9f1b742"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "taxonomy_versions",
+        sa.Column("version", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("source", sa.Text(), nullable=True),
+        sa.Column("terms_inserted", sa.Integer(), nullable=False),
+        sa.Column("terms_updated", sa.Integer(), nullable=False),
+        sa.Column("terms_deleted", sa.Integer(), nullable=False),
+        sa.Column("synonyms_inserted", sa.Integer(), nullable=False),
+        sa.Column("synonyms_deleted", sa.Integer(), nullable=False),
+        sa.Column("loaded_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("version"),
+    )
+
+
+def downgrade():
+    op.drop_table("taxonomy_versions")
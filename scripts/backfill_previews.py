@@ -0,0 +1,92 @@
+import os
+import sys
+import logging
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.catalog import create_app
+from src.catalog.constants import PREVIEW_SETTINGS
+from src.catalog.models import Document
+from src.catalog.utils.query_builders import get_missing_previews_query
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def missing_preview_batches(batch_size, include_outdated=False, limit=None):
+    """Yield lists of document ids without previews, walking ids in order"""
+    last_id = 0
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        ids = [
+            row.id
+            for row in get_missing_previews_query(include_outdated)
+            .filter(Document.id > last_id)
+            .limit(size)
+        ]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+        if remaining is not None:
+            remaining -= len(ids)
+
+
+def main():
+    """Generate previews for every document that is missing one"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=PREVIEW_SETTINGS["BATCH_SIZE"]
+    )
+    parser.add_argument("--limit", type=int, help="stop after this many documents")
+    parser.add_argument(
+        "--include-outdated",
+        action="store_true",
+        help="also regenerate previews not under current content-hash keys",
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="render in this process (with a process pool) instead of queueing",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.inline:
+            from src.catalog.services.preview_batch import PreviewBatchGenerator
+
+            generator = PreviewBatchGenerator()
+        else:
+            from src.catalog.tasks.preview_tasks import generate_previews_batch
+
+        documents = batches = 0
+        for ids in missing_preview_batches(
+            args.batch_size, args.include_outdated, args.limit
+        ):
+            documents += len(ids)
+            batches += 1
+            if args.dry_run:
+                continue
+            if args.inline:
+                result = generator.run(ids)
+                logger.info(
+                    f"Batch {batches} ({ids[0]}..{ids[-1]}): "
+                    f"{result['succeeded']} succeeded, {result['failed']} failed"
+                )
+            else:
+                generate_previews_batch.delay(ids)
+
+        if args.dry_run:
+            action = "Would process"
+        else:
+            action = "Processed" if args.inline else "Queued"
+        logger.info(f"{action} {documents} documents in {batches} batches")
+
+
+if __name__ == "__main__":
+    main()
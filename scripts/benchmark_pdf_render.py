@@ -0,0 +1,119 @@
+import os
+import sys
+import glob
+import time
+import logging
+import argparse
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.catalog.constants import PREVIEW_SETTINGS, RENDER_SETTINGS
+from src.catalog.services.pdf_renderer import BACKENDS
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def generate_corpus(directory, count):
+    """Write count synthetic multi-page PDFs (text, vector art, an image)"""
+    import fitz
+
+    paths = []
+    for index in range(count):
+        document = fitz.open()
+        for page_number in range(3):
+            page = document.new_page(width=612, height=792)
+            page.insert_text(
+                (72, 72),
+                f"Fixture document {index}, page {page_number + 1}",
+                fontsize=24,
+            )
+            for row in range(20):
+                page.draw_rect(
+                    fitz.Rect(72, 120 + row * 30, 540, 140 + row * 30),
+                    color=(0.2, 0.3, 0.6),
+                    fill=(0.9, 0.9 - row * 0.02, 0.8),
+                )
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), 0)
+            pixmap.set_rect(pixmap.irect, (index * 37 % 255, 120, 200))
+            page.insert_image(fitz.Rect(300, 500, 556, 756), pixmap=pixmap)
+        path = os.path.join(directory, f"fixture_{index:03d}.pdf")
+        document.save(path)
+        document.close()
+        paths.append(path)
+    return paths
+
+
+def run(renderer, paths, repeat, widths):
+    """Returns (renders, seconds); a thumbnail set counts as one render"""
+    renders = 0
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            if len(widths) == 1:
+                renderer.render_first_page(path, width=widths[0])
+            else:
+                renderer.render_first_page_widths(path, widths)
+            renders += 1
+    return renders, time.perf_counter() - start_time
+
+
+def main():
+    """Measure first-page renders/sec for each PDF rendering backend"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--corpus", help="directory of PDFs (default: generate a fixture corpus)"
+    )
+    parser.add_argument("--generate", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=PREVIEW_SETTINGS["DEFAULT_WIDTH"],
+        help="target width of a single render",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS)
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        if args.corpus:
+            paths = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+        else:
+            paths = generate_corpus(fixture_dir, args.generate)
+        if not paths:
+            print("No PDFs to render")
+            return
+
+        print(
+            f"{len(paths)} PDFs x {args.repeat}, poppler timeout "
+            f"{RENDER_SETTINGS['POPPLER_TIMEOUT']}s"
+        )
+        for name in args.backends:
+            backend = BACKENDS[name]
+            if not backend.available():
+                print(f"  {name:8} not installed")
+                continue
+            renderer = backend()
+            # Warm up imports and caches outside the timing
+            renderer.render_first_page(paths[0], width=args.width)
+
+            for label, widths in (
+                (f"page 1 at {args.width}px", [args.width]),
+                (
+                    f"thumbnail set {PREVIEW_SETTINGS['WIDTHS']}",
+                    PREVIEW_SETTINGS["WIDTHS"],
+                ),
+            ):
+                renders, seconds = run(renderer, paths, args.repeat, widths)
+                print(
+                    f"  {name:8} {label:28} {renders / seconds:8.1f} renders/s "
+                    f"({seconds / renders * 1000:.1f} ms each)"
+                )
+
+
+if __name__ == "__main__":
+    main()
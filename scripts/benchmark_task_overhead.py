@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from celery import Task
+
+from src.catalog import create_app
+from src.catalog.tasks.celery_app import celery_app
+from src.catalog.tasks.worker_context import get_worker_app
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="benchmark.noop_create_app", base=Task)
+def noop_create_app():
+    """Previous pattern: build a Flask app inside every task"""
+    app = create_app()
+    with app.app_context():
+        pass
+
+
+@celery_app.task(name="benchmark.noop_worker_app")
+def noop_worker_app():
+    """Current pattern: AppContextTask pushes the per-process app"""
+    pass
+
+
+def run(task, count):
+    start_time = time.perf_counter()
+    for _ in range(count):
+        # apply() executes in-process, so only task overhead is measured
+        task.apply()
+    return time.perf_counter() - start_time
+
+
+def main():
+    """Compare per-task overhead of create_app() vs. the per-worker app"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Equivalent of worker_process_init, done once before timing
+    get_worker_app()
+
+    before = run(noop_create_app, args.count)
+    after = run(noop_worker_app, args.count)
+
+    print(f"{args.count} no-op tasks")
+    print(
+        f"  create_app() per task: {before:.3f}s total, "
+        f"{before / args.count * 1000:.3f} ms/task"
+    )
+    print(
+        f"  per-worker app:        {after:.3f}s total, "
+        f"{after / args.count * 1000:.3f} ms/task"
+    )
+    if after:
+        print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,84 @@
 import os
 import sys
 import logging
-from flask import current_app
+import argparse
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.catalog import create_app, db
-from src.catalog.services.taxonomy_service import TaxonomyService
-from src.catalog.models.keyword import KeywordTaxonomy, KeywordSynonym
+from src.catalog import create_app
+from src.catalog.services.keyword_remapper import KeywordRemapper
+from src.catalog.services.taxonomy_loader import TaxonomyLoader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def main():
-    """Main function to load taxonomy from CSV."""
-    app = create_app()
-    with app.app_context():
-        logger.info("Starting taxonomy loading process...")
-
-        # Path to the canonical taxonomy file
-        # Check if running in Docker (APP_SETTINGS contains Docker) or locally
-        app_settings = os.getenv("APP_SETTINGS", "")
-        if "Docker" in app_settings:
-            # Docker environment - use absolute path
-            file_path = "/app/data/taxonomy.csv"
-        else:
-            # Local environment - use relative path
-            file_path = os.path.join(
-                os.path.dirname(__file__), "..", "data", "taxonomy.csv"
-            )
+def default_taxonomy_path():
+    # Check if running in Docker (APP_SETTINGS contains Docker) or locally
+    if "Docker" in os.getenv("APP_SETTINGS", ""):
+        return "/app/data/taxonomy.csv"
+    return os.path.join(os.path.dirname(__file__), "..", "data", "taxonomy.csv")
 
-        if not os.path.exists(file_path):
-            logger.error(f"Taxonomy file not found at: {file_path}")
-            return
 
-        logger.info(f"Loading taxonomy from: {file_path}")
+def main():
+    """Load the taxonomy CSV, applying only what differs from the database"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--file", default=default_taxonomy_path())
+    parser.add_argument(
+        "--keep-missing",
+        action="store_true",
+        help="keep stored terms that are not in the CSV",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report the diff without writing it"
+    )
+    parser.add_argument(
+        "--no-remap",
+        action="store_true",
+        help="leave stored keyword links as they are",
+    )
+    parser.add_argument(
+        "--remap-unmapped",
+        action="store_true",
+        help="re-resolve every unmapped keyword, not only exact matches",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        logger.error(f"Taxonomy file not found at: {args.file}")
+        sys.exit(1)
 
-        # Clear existing taxonomy data
-        db.session.query(KeywordSynonym).delete()
-        db.session.query(KeywordTaxonomy).delete()
-        db.session.commit()
-        logger.info("Cleared existing taxonomy data.")
+    app = create_app()
+    with app.app_context():
+        logger.info(f"Loading taxonomy from: {args.file}")
+        result = TaxonomyLoader.load(
+            args.file, delete_missing=not args.keep_missing, dry_run=args.dry_run
+        )
 
-        # Initialize taxonomy from the CSV file
-        success, message = TaxonomyService.initialize_taxonomy_from_file(file_path)
+        prefix = "Would apply" if args.dry_run else "Applied"
+        logger.info(
+            f"{prefix}: {result['terms_inserted']} terms inserted, "
+            f"{result['terms_updated']} updated, {result['terms_deleted']} deleted; "
+            f"{result['synonyms_inserted']} synonyms inserted, "
+            f"{result['synonyms_deleted']} deleted ({result['terms']} terms in CSV, "
+            f"{result['errors']} rows skipped)"
+        )
+        logger.info(f"Taxonomy version: {result['version']}")
 
-        if success:
-            logger.info(f"Taxonomy loading successful: {message}")
-        else:
-            logger.error(f"Taxonomy loading failed: {message}")
+        if args.dry_run or args.no_remap:
+            return
+        if result["changed"] or args.remap_unmapped:
+            remapped = KeywordRemapper.remap(
+                result["remap"]["names"],
+                result["remap"]["keyword_ids"],
+                include_unmapped=args.remap_unmapped,
+            )
+            logger.info(
+                f"Keywords: {remapped['remapped']} remapped, "
+                f"{remapped['unmapped']} unmapped of {remapped['candidates']} "
+                f"candidates across {remapped['documents']} documents"
+            )
 
 
 if __name__ == "__main__":
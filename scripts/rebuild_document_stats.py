@@ -0,0 +1,46 @@
+import os
+import sys
+import logging
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.catalog import create_app
+from src.catalog.services.stats_rollup import DocumentStatsRollup
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Recompute the document statistics rollup tables from documents"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report day/status cells that disagree with documents",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        drift = DocumentStatsRollup.drift()
+        for cell in drift:
+            logger.info(
+                f"{cell['day']} {cell['status']}: rollup has {cell['actual']}, "
+                f"documents have {cell['expected']}"
+            )
+        if args.check:
+            logger.info(f"{len(drift)} cells out of date")
+            sys.exit(1 if drift else 0)
+
+        result = DocumentStatsRollup.rebuild()
+        logger.info(
+            f"Rebuilt {result['daily_rows']} daily rows and "
+            f"{result['statuses']} status counters ({len(drift)} cells corrected)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import logging
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.catalog import create_app, db
+from src.catalog.models import Document
+from src.catalog.services.keyword_manager import (
+    PAYLOAD_CHUNK_SIZE,
+    DocumentKeywordManager,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def document_batches(batch_size, missing_only=False):
+    """Yield lists of document ids, walking ids in order"""
+    last_id = 0
+    while True:
+        query = db.session.query(Document.id).filter(Document.id > last_id)
+        if missing_only:
+            query = query.filter(Document.keyword_payload.is_(None))
+        ids = [row.id for row in query.order_by(Document.id).limit(batch_size)]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def main():
+    """Rebuild the precomputed keyword payload of documents"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=PAYLOAD_CHUNK_SIZE)
+    parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="only documents whose payload has never been built",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        documents = batches = 0
+        for ids in document_batches(args.batch_size, args.missing_only):
+            try:
+                documents += DocumentKeywordManager.refresh_keyword_payloads(ids)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            batches += 1
+            logger.info(f"Batch {batches} ({ids[0]}..{ids[-1]}): {len(ids)} documents")
+
+        logger.info(f"Rebuilt keyword payloads of {documents} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import logging
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.catalog import create_app
+from src.catalog.constants import DOCUMENT_STATUSES, SCORECARD_SETTINGS
+from src.catalog.services.bulk_evaluation import BulkScorecardEvaluator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Score (or re-score) document quality scorecards in bulk"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--chunk-size", type=int, default=SCORECARD_SETTINGS["CHUNK_SIZE"]
+    )
+    parser.add_argument(
+        "--status",
+        default=DOCUMENT_STATUSES["COMPLETED"],
+        help="only documents with this status ('all' for every document)",
+    )
+    parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="skip documents that already have a scorecard",
+    )
+    parser.add_argument("--ids", type=int, nargs="+", help="score only these documents")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = BulkScorecardEvaluator(args.chunk_size).run(
+            document_ids=args.ids,
+            status=None if args.status == "all" else args.status,
+            only_missing=args.missing_only,
+        )
+        logger.info(
+            f"Scored {result['documents']} documents in {result['chunks']} chunks "
+            f"({result['seconds']}s); {result['requires_review']} need review"
+        )
+
+
+if __name__ == "__main__":
+    main()
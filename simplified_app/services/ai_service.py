@@ -22,6 +22,7 @@ from config import get_settings
 from services.storage_service import StorageService
 from services.taxonomy_service import TaxonomyService
 from services.prompt_manager import PromptManager
+from services.json_extractor import extract_json
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -633,22 +634,11 @@ class AIService:
     def _extract_json_from_response(self, response_text: str) -> Dict[str, Any]:
         """Try to extract JSON from a response that may contain additional text"""
         try:
-            # Look for JSON blocks in the response
-            import re
-
-            json_pattern = r"```json\s*(.*?)\s*```"
-            matches = re.findall(json_pattern, response_text, re.DOTALL)
-
-            if matches:
-                return json.loads(matches[0])
-
-            # Try to find JSON-like content
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}")
-
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx : end_idx + 1]
-                return json.loads(json_str)
+            # Single linear pass that skips prose/code fences and repairs
+            # a truncated tail instead of giving up on the whole response
+            result = extract_json(response_text)
+            if result:
+                return result
 
             # If all else fails, return raw response
             return {"raw_response": response_text}
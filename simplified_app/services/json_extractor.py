@@ -0,0 +1,231 @@
+# simplified_app/services/json_extractor.py
+# Vendored copy of src/catalog/services/json_extractor.py, so this app can be
+# deployed without the src tree. Change both files together;
+# test_json_extractor.py checks that they match.
+import json
+import re
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class IncrementalJSONExtractor:
+    """
+    Tolerant, single-pass JSON extractor for LLM output.
+
+    Text can be fed in arbitrary chunks (e.g. SSE text deltas). The extractor
+    skips any prose before the first top-level object and emits each
+    top-level key as soon as its value closes, so callers can start parsing
+    components before the response has finished. A truncated or malformed
+    tail is repaired in finish() instead of re-requesting the completion.
+    """
+
+    def __init__(self, on_component: Optional[Callable[[str, Any], None]] = None):
+        self.on_component = on_component
+        self.components: Dict[str, Any] = {}
+        self.done = False
+        self._reset_root()
+
+    def _reset_root(self):
+        self._root_open = False
+        self._stack = []
+        self._phase = "key"
+        self._in_string = False
+        self._escape = False
+        self._key_chars = []
+        self._value_chars = []
+        self._key = None
+        self._safe_point = None
+
+    def _abort_root(self, char: str):
+        """Discard a '{' that turned out not to start a JSON object"""
+        self._reset_root()
+        if char == "{":
+            self._open_root()
+
+    def _open_root(self):
+        self._root_open = True
+        self._stack = ["{"]
+        self._phase = "key"
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of model output"""
+        if self.done or not chunk:
+            return
+
+        for char in chunk:
+            if self.done:
+                return
+
+            if not self._root_open:
+                if char == "{":
+                    self._open_root()
+                continue
+
+            if self._in_string:
+                self._consume_string_char(char)
+                continue
+
+            if self._phase == "key":
+                if char == '"':
+                    self._in_string = True
+                    self._phase = "in_key"
+                    self._key_chars = []
+                elif char == "}":
+                    self._close_root()
+                elif not (char.isspace() or char == ","):
+                    self._abort_root(char)
+            elif self._phase == "colon":
+                if char == ":":
+                    self._phase = "value"
+                    self._value_chars = []
+                    self._safe_point = None
+                elif not char.isspace():
+                    self._abort_root(char)
+            elif self._phase == "value":
+                self._consume_value_char(char)
+
+    def _consume_string_char(self, char: str):
+        target = self._key_chars if self._phase == "in_key" else self._value_chars
+
+        if self._escape:
+            self._escape = False
+            target.append(char)
+            return
+
+        if char == "\\":
+            self._escape = True
+            target.append(char)
+            return
+
+        if char == '"':
+            self._in_string = False
+            if self._phase == "in_key":
+                try:
+                    self._key = json.loads('"' + "".join(self._key_chars) + '"')
+                except json.JSONDecodeError:
+                    self._key = "".join(self._key_chars)
+                self._phase = "colon"
+                return
+
+        target.append(char)
+
+    def _consume_value_char(self, char: str):
+        # Top-level value (not inside a nested container)
+        if len(self._stack) == 1:
+            if char in ",}":
+                self._emit(self._key, "".join(self._value_chars))
+                if char == "}":
+                    self._close_root()
+                else:
+                    self._phase = "key"
+                return
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+            self._value_chars.append(char)
+            return
+
+        self._value_chars.append(char)
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._stack.append(char)
+        elif char in "}]":
+            self._stack.pop()
+        elif char == ",":
+            # Everything before this comma is a complete element, which makes
+            # it a safe place to cut a truncated value during repair.
+            self._safe_point = (len(self._value_chars) - 1, tuple(self._stack[1:]))
+
+    def _close_root(self):
+        if self.components:
+            self.done = True
+        else:
+            self._reset_root()
+
+    def _emit(self, key: Optional[str], raw_value: str):
+        if key is None:
+            return
+
+        value_text = raw_value.strip()
+        try:
+            value = json.loads(value_text)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(_TRAILING_COMMA.sub(r"\1", value_text))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed value for key '{key}': {str(e)}")
+                return
+
+        self.components[key] = value
+        if self.on_component:
+            try:
+                self.on_component(key, value)
+            except Exception as e:
+                logger.error(f"Component callback failed for '{key}': {str(e)}")
+
+    def _repair_tail(self) -> Optional[str]:
+        """Close a value that was cut off mid-stream"""
+        text = "".join(self._value_chars)
+        closers = "".join(_CLOSERS[c] for c in reversed(self._stack[1:]))
+        candidates = [text + ('"' if self._in_string else "") + closers]
+
+        if self._safe_point:
+            cut, stack = self._safe_point
+            candidates.append(
+                text[:cut] + "".join(_CLOSERS[c] for c in reversed(stack))
+            )
+
+        for candidate in candidates:
+            try:
+                json.loads(candidate)
+                return candidate
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Flush any truncated tail and return the collected top-level keys"""
+        if not self.done and self._root_open and self._phase == "value":
+            repaired = self._repair_tail()
+            if repaired is not None:
+                logger.info(f"Repaired truncated value for key '{self._key}'")
+                self._emit(self._key, repaired)
+            else:
+                logger.warning(f"Dropping unrecoverable tail for key '{self._key}'")
+
+        self.done = True
+        return self.components or None
+
+
+def extract_json(
+    text: str, on_component: Optional[Callable[[str, Any], None]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Extract the first JSON object from a complete LLM response.
+
+    Tries a plain json.loads first and otherwise makes a single linear pass
+    with IncrementalJSONExtractor, repairing a truncated tail if needed.
+    """
+    if not text:
+        return None
+
+    try:
+        result = json.loads(text)
+        if isinstance(result, dict):
+            if on_component:
+                for key, value in result.items():
+                    on_component(key, value)
+            return result
+    except json.JSONDecodeError:
+        pass
+
+    extractor = IncrementalJSONExtractor(on_component=on_component)
+    extractor.feed(text)
+    return extractor.finish()
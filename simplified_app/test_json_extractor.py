@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the tolerant JSON extractor used to parse LLM responses
+"""
+
+import importlib.util
+from pathlib import Path
+
+# Load the module by path: importing the services package pulls in the
+# database layer, which this test doesn't need
+_spec = importlib.util.spec_from_file_location(
+    "json_extractor", Path(__file__).parent / "services" / "json_extractor.py"
+)
+json_extractor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(json_extractor)
+
+IncrementalJSONExtractor = json_extractor.IncrementalJSONExtractor
+extract_json = json_extractor.extract_json
+
+CATALOG_COPY = (
+    Path(__file__).resolve().parent.parent
+    / "src"
+    / "catalog"
+    / "services"
+    / "json_extractor.py"
+)
+
+
+def _code(path):
+    """Source without the leading comment header"""
+    lines = path.read_text().splitlines()
+    while lines and lines[0].startswith("#"):
+        lines.pop(0)
+    return lines
+
+
+def test_matches_catalog_copy():
+    """The vendored module stays identical to the catalog app's copy"""
+    if not CATALOG_COPY.exists():
+        print("Catalog app not checked out, skipping")
+        return
+    vendored = Path(__file__).parent / "services" / "json_extractor.py"
+    assert _code(vendored) == _code(CATALOG_COPY)
+
+
+def test_plain_json():
+    """A clean response is returned unchanged"""
+    assert extract_json('{"a": 1, "b": {"c": [1, 2]}}') == {
+        "a": 1,
+        "b": {"c": [1, 2]},
+    }
+
+
+def test_prose_prefixed():
+    """Prose around the object, including stray braces, is skipped"""
+    text = 'Here is the analysis:\n{"a": 1, "b": "x"}\nLet me know if you need more.'
+    assert extract_json(text) == {"a": 1, "b": "x"}
+
+    assert extract_json('Note {not json} then {"a": 1}') == {"a": 1}
+
+
+def test_trailing_commas():
+    """Trailing commas in nested values and at the top level are dropped"""
+    text = '{"a": 1, "b": [1, 2, {"x": "y"},], "c": {"d": 1,},}'
+    assert extract_json(text) == {"a": 1, "b": [1, 2, {"x": "y"}], "c": {"d": 1}}
+
+
+def test_truncated_string():
+    """A value cut off inside a string is closed"""
+    assert extract_json('{"a": 1, "b": {"c": "hel') == {"a": 1, "b": {"c": "hel"}}
+
+
+def test_truncated_at_safe_point():
+    """A value cut off mid-token is cut back to its last complete element"""
+    assert extract_json('{"a": 1, "b": [1, 2, {"x": tru') == {"a": 1, "b": [1, 2]}
+
+
+def test_no_json():
+    """Empty responses and responses without an object give None"""
+    assert extract_json("") is None
+    assert extract_json("no json here") is None
+
+
+def test_streamed_chunks():
+    """Top-level keys are emitted as soon as their values close"""
+    seen = []
+    extractor = IncrementalJSONExtractor(
+        on_component=lambda key, value: seen.append(key)
+    )
+    extractor.feed('Sure! {"first": {"n": ')
+    assert seen == []
+    extractor.feed('1}, "second": [1,')
+    assert seen == ["first"]
+    extractor.feed(" 2]}")
+
+    assert seen == ["first", "second"]
+    assert extractor.finish() == {"first": {"n": 1}, "second": [1, 2]}
+
+
+def main():
+    """Run all tests"""
+    print("=== Testing JSON extractor ===")
+    for test in (
+        test_matches_catalog_copy,
+        test_plain_json,
+        test_prose_prefixed,
+        test_trailing_commas,
+        test_truncated_string,
+        test_truncated_at_safe_point,
+        test_no_json,
+        test_streamed_chunks,
+    ):
+        test()
+        print(f"✓ {test.__name__}")
+
+    print("All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
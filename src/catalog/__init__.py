@@ -62,6 +62,11 @@ def create_app(test_config=None):
             app.logger.error(f"Error registering blueprints: {str(e)}")
             raise
 
+    # Statement counts, DB time and N+1 warnings per request
+    from src.catalog.utils import query_metrics
+
+    query_metrics.init_app(app)
+
     # Add middleware for security headers
     @app.after_request
     def add_security_headers(response):
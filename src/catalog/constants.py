@@ -10,13 +10,22 @@ DOCUMENT_STATUSES = {
     'PENDING': 'PENDING',
     'PROCESSING': 'PROCESSING',
     'COMPLETED': 'COMPLETED',
-    'FAILED': 'FAILED'
+    'FAILED': 'FAILED',
+    'BATCH_PENDING': 'BATCH_PENDING'  # uploaded, waiting for pipeline admission
 }
 
 DROPBOX_SYNC_SETTINGS = {
     'DOCUMENT_PROCESSING_DELAY': 40,  # seconds between batches
     'DROPBOX_BATCH_SIZE': 5,          # documents per batch
-    'MAX_CONCURRENT_PROCESSING': 3    # maximum concurrent processing tasks
+    'MAX_CONCURRENT_PROCESSING': 3,   # maximum concurrent processing tasks
+    'LONGPOLL_TIMEOUT': 30,           # seconds a longpoll waits for changes
+    'LONGPOLL_JITTER': 90,            # Dropbox may answer a longpoll this much later
+    'WATCH_INTERVAL': 60,             # seconds between watch_dropbox runs
+    'SYNC_LOCK_TIMEOUT': 3600,        # seconds before a crashed sync's lock expires
+    'MAX_PARALLEL_TRANSFERS': 4,      # files streamed Dropbox -> MinIO at once
+    'TRANSFER_RETRIES': 3,            # attempts per file before giving up
+    'FAILED_RETRY_BATCH': 50,         # FAILED files retried per sync
+    'TRANSFER_STATS_TTL': 7 * 86400   # seconds to keep the last transfer's stats
 }
 
 # Cache Timeouts (in seconds)
@@ -41,9 +50,127 @@ QUEUE_NAMES = {
     'DOCUMENT_PROCESSING': 'document_processing',
     'ANALYSIS': 'analysis',
     'PREVIEWS': 'previews',
+    'EMBEDDINGS': 'embeddings',
+    'FETCH': 'pipeline_fetch',
+    'RASTERIZE': 'pipeline_rasterize',
+    'LLM': 'pipeline_llm',
+    'PERSIST': 'pipeline_persist',
     'DEFAULT': 'celery'
 }
 
+# Ingestion pipeline (see tasks/pipeline_tasks.py)
+PIPELINE_SETTINGS = {
+    # Prompts run in parallel in the analyze stage
+    'ANALYSIS_COMPONENTS': ['unified', 'text', 'design', 'keywords', 'communication'],
+    # Run after 'unified' and get its classification (taxonomy prompt pruning)
+    'CLASSIFIED_COMPONENTS': ['keywords'],
+    # At least one must succeed (they write llm_analysis and extracted_text)
+    'REQUIRED_COMPONENTS': ['unified', 'text'],
+    'RASTER_PREFIX': 'rasters/',      # object key prefix for rasterized pages
+    'METRICS_TTL': 86400              # seconds to keep per-minute stage metrics
+}
+
+# Document leases (see services/lease_service.py)
+LEASE_SETTINGS = {
+    'RUNNING_SECONDS': 60,      # lease while a stage is executing, kept alive by heartbeats
+    'HANDOFF_SECONDS': 900,     # lease while the next stage waits in its queue
+    'RECOVERY_SECONDS': 120,    # lease the sweeper holds until the run is re-queued
+    'HEARTBEAT_SECONDS': 15,
+    'SWEEP_INTERVAL': 15,       # seconds between expired-lease sweeps
+    'SWEEP_BATCH_SIZE': 100
+}
+
+# Object reads (see services/storage_service.py)
+STORAGE_SETTINGS = {
+    'SPOOL_MAX_MEMORY': 8 * 1024 * 1024,  # spooled temp files stay in memory up to this
+    'COPY_BUFFER_SIZE': 1024 * 1024,
+    'SNIFF_BYTES': 16                     # bytes read for magic-number detection
+}
+
+# PDF rasterization (see services/pdf_renderer.py)
+RENDER_SETTINGS = {
+    'BACKEND': 'pymupdf',          # in-process; 'poppler' spawns pdftoppm per call
+    'FALLBACK': 'poppler',         # used when the primary backend fails on a file
+    'RASTER_DPI': 200,             # page images sent to the model
+    'POPPLER_PATH': '/usr/bin',
+    'POPPLER_TIMEOUT': 10
+}
+
+# Thumbnails (see services/preview_service.py)
+PREVIEW_SETTINGS = {
+    'VERSION': 1,                  # bump when rendering changes; part of every preview key
+    'WIDTHS': [160, 320, 640],
+    'DEFAULT_WIDTH': 320,          # JPEG at this width is the document's s3_preview_key
+    'QUALITY': 80,
+    'CACHE_MAX_AGE': 31536000,     # preview keys are immutable, cache for a year
+    'BATCH_SIZE': 50,              # documents per generate_previews_batch task
+    'RENDER_PROCESSES': None,      # render pool size (default: CPU count)
+    'UPLOAD_THREADS': 8            # concurrent variant uploads per batch
+}
+
+# Presigned GET URLs (see MinIOStorage.get_presigned_url)
+PRESIGNED_URL_SETTINGS = {
+    'EXPIRES': 3600,          # lifetime of a signed URL, seconds
+    'REFRESH_BEFORE': 600,    # re-sign cached URLs with less life left than this
+    'MAX_ENTRIES': 10000,     # per-process cache size
+    'BATCH_LIMIT': 100        # documents per /api/previews request
+}
+
+# Node-local read-through cache of storage objects (see services/object_cache.py)
+OBJECT_CACHE_SETTINGS = {
+    'DIR': '/tmp/catalog_object_cache',
+    'MAX_BYTES': 2 * 1024 * 1024 * 1024,  # 0 disables the cache
+    'LOW_WATERMARK': 0.9,                 # eviction trims down to this fraction of MAX_BYTES
+    'STALE_TEMP_SECONDS': 3600            # abandoned partial writes older than this are removed
+}
+
+# Upload ingest (see services/upload_service.py)
+UPLOAD_SETTINGS = {
+    'MAX_PARALLEL_UPLOADS': 4,          # files streamed to storage at once
+    'PART_SIZE': 10 * 1024 * 1024,      # multipart upload part size (bytes)
+    'READ_CHUNK_SIZE': 1024 * 1024
+}
+
+# Duplicate detection (see services/dedup_service.py)
+DEDUP_SETTINGS = {
+    'HASH_SIZE': 8,                  # dHash grid; 8 -> 64-bit hash
+    'NEAR_DUPLICATE_DISTANCE': 6,    # max differing bits to flag a near-duplicate
+    'HASH_BANDS': 8,                 # indexed exact-match bands; must exceed NEAR_DUPLICATE_DISTANCE
+    'MAX_CANDIDATES': 500            # band matches compared per document
+}
+
+# Pipeline admission control (see services/admission_service.py)
+ADMISSION_SETTINGS = {
+    'MAX_IN_FLIGHT': 50,        # documents holding a live lease
+    'MAX_QUEUE_DEPTH': 200,     # messages waiting in the pipeline queues
+    'SAFETY_NET_INTERVAL': 45,  # seconds between BATCH_PENDING sweeps
+    'SAFETY_NET_BATCH_SIZE': 100
+}
+
+# Bulk scorecard evaluation (see services/bulk_evaluation.py)
+SCORECARD_SETTINGS = {
+    'CHUNK_SIZE': 500,         # documents scored and upserted per statement
+    'REVIEW_THRESHOLD': 70     # total score below which a document needs review
+}
+
+# Analysis checkpoint statuses
+CHECKPOINT_STATUSES = {
+    'RUNNING': 'RUNNING',
+    'SUCCEEDED': 'SUCCEEDED',
+    'FAILED': 'FAILED'
+}
+
+# Task name -> pipeline stage, used for throughput metrics
+PIPELINE_STAGES = {
+    'pipeline.fetch_document': 'fetch',
+    'pipeline.rasterize_document': 'rasterize',
+    'pipeline.analyze_component': 'analyze',
+    'pipeline.analyze_in_sequence': 'analyze',
+    'pipeline.persist_analysis': 'persist',
+    'tasks.generate_embeddings': 'embed',
+    'tasks.generate_preview': 'preview'
+}
+
 # Search Types
 SEARCH_TYPES = {
     'KEYWORD': 'keyword',
@@ -69,7 +196,8 @@ DEFAULTS = {
 MODEL_SETTINGS = {
     'CLAUDE': {
         'MODEL': 'claude-3-opus-20240229',
-        'MAX_TOKENS': 4096
+        'MAX_TOKENS': 4096,
+        'STREAMING': True  # consume SSE deltas and parse JSON incrementally
     },
     'EMBEDDINGS': {
         'MODEL': 'text-embedding-3-small',
@@ -85,4 +213,31 @@ ERROR_MESSAGES = {
     'SERVICE_UNAVAILABLE': 'The service is temporarily unavailable. Please try again later.',
     'AUTHENTICATION_FAILED': 'Authentication failed. Please check your credentials.',
     'API_ERROR': 'Error communicating with external API. Please try again later.'
-}
\ No newline at end of file
+}
+
+# Keyword to taxonomy mapping
+TAXONOMY_MAPPING = {
+    'MIN_SIMILARITY': 0.82,            # cosine similarity needed for a fuzzy match
+    'CATEGORY_BONUS': 0.05,            # ranking boost when the LLM's category hint matches
+    'DIMENSIONS': 512,                 # hashed n-gram embedding width
+    'NGRAM_SIZE': 3,
+    'FINGERPRINT_CHECK_SECONDS': 30    # how often to check for taxonomy changes
+}
+
+# Taxonomy section of the keyword prompt (see services/taxonomy_prompt.py)
+TAXONOMY_PROMPT = {
+    'PRUNE': False,                                 # TAXONOMY_PROMPT_PRUNE env overrides
+    'PRUNABLE_CATEGORY': 'Policy Issues & Topics',  # only topic subcategories are pruned
+    'STEM_LENGTH': 5,                               # word prefix used to match the hint
+    'VERSION_CHECK_SECONDS': 30,                    # how often to check the taxonomy version
+    'CHARS_PER_TOKEN': 4                            # for logged token estimates
+}
+
+# SQL statement instrumentation per request and task (see utils/query_metrics.py)
+QUERY_METRICS = {
+    'ENABLED': True,          # QUERY_METRICS_ENABLED env overrides
+    'REPEAT_THRESHOLD': 5,    # same statement shape this often in one unit is an N+1
+    'WARN_QUERIES': 50,       # log units issuing more statements than this
+    'WARN_SECONDS': 1.0,      # or spending longer than this in the database
+    'STACK_FRAMES': 6         # application frames logged per offender
+}
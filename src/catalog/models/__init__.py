@@ -9,6 +9,8 @@ from src.catalog.models.document import (
     Entity,
     CommunicationFocus,
     DropboxSync,
+    DropboxCursor,
+    AnalysisCheckpoint,
 )
 
 from src.catalog.models.keyword import (
@@ -16,10 +18,13 @@ from src.catalog.models.keyword import (
     KeywordSynonym,
     SearchFeedback,
     LLMKeyword,
+    TaxonomyVersion,
 )
 
 from src.catalog.models.scoring import DocumentScorecard
 
+from src.catalog.models.stats import DailyDocumentStats, DocumentStatusCount
+
 __all__ = [
     "Document",
     "BatchJob",
@@ -35,5 +40,10 @@ __all__ = [
     "SearchFeedback",
     "DocumentScorecard",
     "DropboxSync",
+    "DropboxCursor",
     "LLMKeyword",
+    "AnalysisCheckpoint",
+    "DailyDocumentStats",
+    "DocumentStatusCount",
+    "TaxonomyVersion",
 ]
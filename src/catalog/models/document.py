@@ -26,6 +26,15 @@ class Document(db.Model):
     page_count = db.Column(db.Integer, nullable=False)
     status = db.Column(db.Text, nullable=False)
     batch_jobs_id = db.Column(db.Integer, db.ForeignKey("batch_jobs.id"))
+    # Content addressing: objects are stored under their sha256 (storage_key);
+    # documents uploaded before that keep using their filename as the key
+    content_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    storage_key = db.Column(db.Text, nullable=True)
+    perceptual_hash = db.Column(db.String(16), nullable=True)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey("documents.id"), nullable=True)
+    near_duplicate_of_id = db.Column(
+        db.Integer, db.ForeignKey("documents.id"), nullable=True
+    )
     search_vector = db.Column(Vector(3072), nullable=True)
     embeddings = db.Column(Vector(1536), nullable=True)
 
@@ -44,6 +53,14 @@ class Document(db.Model):
         db.DateTime(timezone=True), nullable=True
     )  # Timestamp of successful preview generation
 
+    # Processing lease: the pipeline run currently responsible for the document
+    lease_owner = db.Column(db.Text, nullable=True)
+    lease_expires = db.Column(db.DateTime(timezone=True), nullable=True, index=True)
+
+    # Display-ready hierarchical keywords, rebuilt whenever the document's
+    # keywords or their taxonomy links are written (NULL until first built)
+    keyword_payload = db.Column(db.JSON, nullable=True)
+
     scorecard = db.relationship(
         "DocumentScorecard",
         backref="document_parent",
@@ -67,11 +84,19 @@ class Document(db.Model):
         "CommunicationFocus", backref="document", lazy="joined", uselist=False
     )
 
+    @property
+    def object_key(self):
+        """Key of the source object in storage"""
+        return self.storage_key or self.filename
+
 
 class Entity(db.Model):
     """Stores entity information from the document"""
 
     __tablename__ = "entities"
+    __table_args__ = (
+        db.Index("uq_entities_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     client_name = db.Column(db.Text)
@@ -86,6 +111,9 @@ class CommunicationFocus(db.Model):
     """Stores the communication focus and messaging strategy"""
 
     __tablename__ = "communication_focus"
+    __table_args__ = (
+        db.Index("uq_communication_focus_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     primary_issue = db.Column(db.Text)
@@ -96,6 +124,9 @@ class CommunicationFocus(db.Model):
 
 class DesignElement(db.Model):
     __tablename__ = "design_elements"
+    __table_args__ = (
+        db.Index("uq_design_elements_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     color_scheme = db.Column(db.Text)
@@ -110,6 +141,9 @@ class DesignElement(db.Model):
 
 class LLMAnalysis(db.Model):
     __tablename__ = "llm_analysis"
+    __table_args__ = (
+        db.Index("uq_llm_analysis_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     summary_description = db.Column(db.Text)
@@ -138,6 +172,9 @@ class Client(db.Model):
 
 class Classification(db.Model):
     __tablename__ = "classifications"
+    __table_args__ = (
+        db.Index("uq_classifications_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     category = db.Column(db.Text)
@@ -146,6 +183,9 @@ class Classification(db.Model):
 
 class ExtractedText(db.Model):
     __tablename__ = "extracted_text"
+    __table_args__ = (
+        db.Index("uq_extracted_text_document_id", "document_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey("documents.id"))
     page_number = db.Column(db.Integer)
@@ -165,3 +205,54 @@ class DropboxSync(db.Model):
     dropbox_path = db.Column(db.String(512))
     sync_date = db.Column(db.DateTime(timezone=True))
     status = db.Column(db.String(50), default="SYNCED")
+
+
+class DropboxCursor(db.Model):
+    """
+    Last list_folder cursor per synced folder, so each sync only fetches
+    the changes since the previous one.
+    """
+
+    __tablename__ = "dropbox_cursors"
+
+    id = db.Column(db.Integer, primary_key=True)
+    folder_path = db.Column(db.Text, nullable=False, unique=True)
+    cursor = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(
+        db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class AnalysisCheckpoint(db.Model):
+    """
+    Result of one analysis prompt for a document. Retries only resubmit
+    components without a SUCCEEDED checkpoint.
+    """
+
+    __tablename__ = "analysis_checkpoints"
+    __table_args__ = (
+        db.Index(
+            "uq_analysis_checkpoints_document_component",
+            "document_id",
+            "component",
+            unique=True,
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(
+        db.Integer, db.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    component = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Text, nullable=False)  # RUNNING, SUCCEEDED, FAILED
+    response_hash = db.Column(db.String(64))  # sha256 of the canonical result JSON
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    task_id = db.Column(db.Text)  # Celery task that last wrote this checkpoint
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<AnalysisCheckpoint document={self.document_id} {self.component}={self.status}>"
@@ -86,6 +86,14 @@ class LLMKeyword(db.Model):
     """
 
     __tablename__ = "llm_keywords"
+    __table_args__ = (
+        db.Index(
+            "uq_llm_keywords_analysis_term",
+            "llm_analysis_id",
+            "verbatim_term",
+            unique=True,
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
     llm_analysis_id = db.Column(
         db.Integer, db.ForeignKey("llm_analysis.id"), nullable=False
@@ -122,6 +130,12 @@ class LLMKeyword(db.Model):
         return f"<LLMKeyword keyword='{self.keyword}' category='{self.category}'>"
 
 
+# Remapping after taxonomy edits finds keywords by case-insensitive term
+db.Index(
+    "ix_llm_keywords_verbatim_term_lower", db.func.lower(LLMKeyword.verbatim_term)
+)
+
+
 class KeywordSynonym(db.Model):
     """
     Synonyms for taxonomy terms to support variations in search terminology.
@@ -136,6 +150,28 @@ class KeywordSynonym(db.Model):
         return f"<KeywordSynonym {self.synonym}>"
 
 
+class TaxonomyVersion(db.Model):
+    """
+    One row per taxonomy load; the highest version is the current taxonomy.
+
+    Caches derived from the taxonomy (the mapper index, prompt fragments)
+    compare against it to know when to rebuild.
+    """
+
+    __tablename__ = "taxonomy_versions"
+    version = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.Text)
+    terms_inserted = db.Column(db.Integer, nullable=False, default=0)
+    terms_updated = db.Column(db.Integer, nullable=False, default=0)
+    terms_deleted = db.Column(db.Integer, nullable=False, default=0)
+    synonyms_inserted = db.Column(db.Integer, nullable=False, default=0)
+    synonyms_deleted = db.Column(db.Integer, nullable=False, default=0)
+    loaded_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TaxonomyVersion {self.version}>"
+
+
 class SearchFeedback(db.Model):
     """
     User feedback on search results for improving search functionality.
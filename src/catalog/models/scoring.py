@@ -5,6 +5,9 @@ from src.catalog import db
 class DocumentScorecard(db.Model):
     """Stores quality assessment scores for document processing"""
     __tablename__ = 'document_scorecards'
+    __table_args__ = (
+        db.Index('uq_document_scorecards_document_id', 'document_id', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey(
@@ -0,0 +1,27 @@
+from src.catalog import db
+
+
+class DailyDocumentStats(db.Model):
+    """
+    Documents per upload day and current status.
+
+    Maintained by database triggers on documents (see migration
+    d2b7e9a4c1f8), so it changes in the same transaction as the status it
+    counts; rebuild with scripts/rebuild_document_stats.py.
+    """
+
+    __tablename__ = "daily_document_stats"
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.Text, primary_key=True)
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+    total_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class DocumentStatusCount(db.Model):
+    """Documents per current status, maintained by the same triggers"""
+
+    __tablename__ = "document_status_counts"
+
+    status = db.Column(db.Text, primary_key=True)
+    document_count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,155 @@
+# src/catalog/services/admission_service.py
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+
+from src.catalog import db
+from src.catalog.constants import ADMISSION_SETTINGS, DOCUMENT_STATUSES, QUEUE_NAMES
+from src.catalog.models import Document
+
+logger = logging.getLogger(__name__)
+
+# Queues whose backlog counts against admission
+PIPELINE_QUEUES = [
+    QUEUE_NAMES["FETCH"],
+    QUEUE_NAMES["RASTERIZE"],
+    QUEUE_NAMES["LLM"],
+    QUEUE_NAMES["PERSIST"],
+]
+
+
+class AdmissionController:
+    """
+    Decides how many BATCH_PENDING documents may enter the pipeline now.
+
+    Uploads are dispatched straight away while the pipeline has headroom;
+    anything over the limit stays BATCH_PENDING and is admitted later by
+    the process_batch_uploads safety net. Headroom is the smaller of the
+    free in-flight slots (documents holding a live lease) and the free
+    space in the pipeline queues.
+    """
+
+    @staticmethod
+    def _message_count(channel, name: str) -> int:
+        """
+        Messages waiting in one queue. The Redis transport removes the list
+        key of an empty queue, so a passive declare of an idle queue raises
+        ChannelError; that queue holds no messages.
+        """
+        from kombu.exceptions import ChannelError
+
+        try:
+            return channel.queue_declare(queue=name, passive=True).message_count
+        except ChannelError:
+            return 0
+
+    @staticmethod
+    def queue_depth() -> Optional[int]:
+        """Messages waiting in the pipeline queues, or None if unknown"""
+        from src.catalog.tasks.celery_app import celery_app
+
+        try:
+            with celery_app.connection_or_acquire() as connection:
+                channel = connection.default_channel
+                return sum(
+                    AdmissionController._message_count(channel, name)
+                    for name in PIPELINE_QUEUES
+                )
+        except Exception as e:
+            logger.warning(f"Could not read pipeline queue depth: {str(e)}")
+            return None
+
+    @staticmethod
+    def in_flight() -> int:
+        """Documents currently held by a pipeline run"""
+        return (
+            db.session.query(func.count(Document.id))
+            .filter(Document.lease_expires > datetime.utcnow())
+            .scalar()
+        )
+
+    @staticmethod
+    def capacity() -> int:
+        """How many more documents can be admitted right now"""
+        free_slots = ADMISSION_SETTINGS["MAX_IN_FLIGHT"] - AdmissionController.in_flight()
+
+        depth = AdmissionController.queue_depth()
+        if depth is None:
+            # Broker unreachable: dispatching would fail anyway
+            return 0
+
+        free_queue = ADMISSION_SETTINGS["MAX_QUEUE_DEPTH"] - depth
+        return max(0, min(free_slots, free_queue))
+
+    @staticmethod
+    def claim_batch(
+        limit: int, document_ids: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Move up to limit BATCH_PENDING documents to PENDING in one UPDATE.
+
+        Rows are selected with FOR UPDATE SKIP LOCKED so concurrent claimers
+        (upload requests and the safety net) never take the same document.
+        The claimed rows get an already-expired lease, so the sweeper picks
+        them up if dispatch fails before the pipeline claims them.
+        """
+        if limit <= 0:
+            return []
+
+        candidates = select(Document.id).where(
+            Document.status == DOCUMENT_STATUSES["BATCH_PENDING"]
+        )
+        if document_ids is not None:
+            candidates = candidates.where(Document.id.in_(list(document_ids)))
+        candidates = (
+            candidates.order_by(Document.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        stmt = (
+            update(Document)
+            .where(
+                Document.id.in_(candidates),
+                Document.status == DOCUMENT_STATUSES["BATCH_PENDING"],
+            )
+            .values(
+                status=DOCUMENT_STATUSES["PENDING"], lease_expires=datetime.utcnow()
+            )
+            .returning(Document.id, Document.filename)
+            .execution_options(synchronize_session=False)
+        )
+        rows = [(row.id, row.filename) for row in db.session.execute(stmt)]
+        db.session.commit()
+        return rows
+
+    @staticmethod
+    def dispatch(
+        document_ids: Optional[Iterable[int]] = None, limit: Optional[int] = None
+    ) -> int:
+        """
+        Admit as many BATCH_PENDING documents as capacity allows and queue
+        their pipelines. Returns the number dispatched.
+        """
+        from src.catalog.tasks.pipeline_tasks import start_document_pipeline
+
+        allowed = AdmissionController.capacity()
+        if limit is not None:
+            allowed = min(allowed, limit)
+
+        claimed = AdmissionController.claim_batch(allowed, document_ids)
+
+        dispatched = 0
+        for document_id, filename in claimed:
+            try:
+                if start_document_pipeline(document_id, filename):
+                    dispatched += 1
+            except Exception as e:
+                # Left PENDING with an expired lease for the sweeper
+                logger.error(f"Error dispatching document {document_id}: {str(e)}")
+
+        if claimed:
+            logger.info(f"Admitted {dispatched} of {len(claimed)} claimed documents")
+        return dispatched
@@ -0,0 +1,234 @@
+# src/catalog/services/analysis_store.py
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from src.catalog import db
+from src.catalog.constants import MODEL_SETTINGS
+from src.catalog.models import (
+    LLMAnalysis,
+    ExtractedText,
+    Classification,
+    DesignElement,
+    Entity,
+    CommunicationFocus,
+    LLMKeyword,
+)
+from src.catalog.services.keyword_manager import DocumentKeywordManager
+from src.catalog.services.llm_parser import LLMResponseParser
+from src.catalog.services.taxonomy_mapper import taxonomy_mapper
+from src.catalog.utils.bulk_operations import filter_columns, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+    """
+    Persistence stage for LLM analysis results.
+
+    All components and keywords of a document are written in one
+    transaction: taxonomy IDs are resolved in one in-memory batch, each
+    table gets one upsert statement, the document's keyword payload is
+    rebuilt, and there is a single commit.
+    """
+
+    # Analysis components stored as one row per document
+    COMPONENT_MODELS = {
+        "document_analysis": LLMAnalysis,
+        "extracted_text": ExtractedText,
+        "classification": Classification,
+        "design_elements": DesignElement,
+        "entities": Entity,
+        "communication_focus": CommunicationFocus,
+    }
+
+    DEFAULT_MAPPING_RELEVANCE = 0.9
+
+    @staticmethod
+    def collect_keywords(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Normalize keyword output from either prompt format into
+        one entry per verbatim term. An explicit keyword mapping always
+        wins; hierarchical keywords only add terms that have no mapping.
+        """
+        entries = {}
+
+        for mapping in response.get("keyword_mappings") or []:
+            if not isinstance(mapping, dict):
+                continue
+            verbatim_term = (mapping.get("verbatim_term") or "").strip()
+            canonical_term = (mapping.get("mapped_canonical_term") or "").strip()
+            if not verbatim_term or not canonical_term:
+                continue
+            entries[verbatim_term] = {
+                "verbatim_term": verbatim_term,
+                "lookup_term": canonical_term.lower(),
+                "primary_category": (
+                    mapping.get("mapped_primary_category") or ""
+                ).strip(),
+                "subcategory": (mapping.get("mapped_subcategory") or "").strip(),
+                "relevance_score": AnalysisStore.DEFAULT_MAPPING_RELEVANCE,
+            }
+        mapped = set(entries)
+
+        for keyword in response.get("hierarchical_keywords") or []:
+            if not isinstance(keyword, dict):
+                continue
+            verbatim_term = (keyword.get("keyword") or "").strip()
+            if not verbatim_term:
+                continue
+            try:
+                relevance_score = float(keyword.get("relevance_score") or 0.0)
+            except (TypeError, ValueError):
+                relevance_score = 0.0
+
+            if verbatim_term in mapped:
+                continue
+            existing = entries.get(verbatim_term)
+            if existing and existing["relevance_score"] >= relevance_score:
+                continue
+            entries[verbatim_term] = {
+                "verbatim_term": verbatim_term,
+                "lookup_term": verbatim_term.lower(),
+                "primary_category": (keyword.get("category") or "").strip(),
+                "subcategory": "",
+                "relevance_score": relevance_score,
+            }
+
+        return list(entries.values())
+
+    @staticmethod
+    def resolve_taxonomy_ids(keywords: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Map each verbatim term to a taxonomy ID in one batch using the
+        in-memory taxonomy mapper.
+        """
+        if not keywords:
+            return {}
+
+        matches = taxonomy_mapper.map_keywords(
+            [
+                {
+                    "term": kw["lookup_term"],
+                    "primary_category": kw["primary_category"],
+                    "subcategory": kw["subcategory"],
+                }
+                for kw in keywords
+            ]
+        )
+        return {
+            kw["verbatim_term"]: match["taxonomy_id"]
+            for kw, match in zip(keywords, matches)
+            if match
+        }
+
+    @staticmethod
+    def persist(document_id: int, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write all analysis components and keywords for a document in one
+        transaction.
+
+        Args:
+            document_id: The document ID
+            response: Raw LLM response keyed by component
+
+        Returns:
+            Stats with rows written, elapsed seconds and rows per second
+        """
+        start_time = time.perf_counter()
+        parsed = {
+            component: LLMResponseParser.parse_component(
+                component, response[component]
+            )
+            for component in AnalysisStore.COMPONENT_MODELS
+            if component in response
+        }
+
+        keywords = AnalysisStore.collect_keywords(response)
+        taxonomy_ids = AnalysisStore.resolve_taxonomy_ids(keywords)
+
+        rows_written = 0
+        try:
+            llm_analysis_id = None
+            for component, model in AnalysisStore.COMPONENT_MODELS.items():
+                data = parsed.get(component)
+                if not data:
+                    continue
+
+                row = filter_columns(model, dict(data, document_id=document_id))
+                result = upsert_rows(
+                    model, [row], index_elements=["document_id"], returning=[model.id]
+                )
+                if model is LLMAnalysis:
+                    llm_analysis_id = result.scalar_one()
+                rows_written += 1
+
+            if keywords:
+                if llm_analysis_id is None:
+                    # Keywords arrived without a document_analysis component:
+                    # reuse or create the analysis row they hang off
+                    result = upsert_rows(
+                        LLMAnalysis,
+                        [
+                            {
+                                "document_id": document_id,
+                                "analysis_date": datetime.utcnow(),
+                                "model_version": MODEL_SETTINGS["CLAUDE"]["MODEL"],
+                            }
+                        ],
+                        index_elements=["document_id"],
+                        update_columns=["document_id"],
+                        returning=[LLMAnalysis.id],
+                    )
+                    llm_analysis_id = result.scalar_one()
+
+                keyword_rows = [
+                    {
+                        "llm_analysis_id": llm_analysis_id,
+                        "taxonomy_id": taxonomy_ids.get(kw["verbatim_term"]),
+                        "verbatim_term": kw["verbatim_term"],
+                        # Stored on a 0-100 scale, see DocumentKeywordManager
+                        "relevance_score": int(kw["relevance_score"] * 100)
+                        if kw["relevance_score"] <= 1
+                        else kw["relevance_score"],
+                    }
+                    for kw in keywords
+                ]
+                upsert_rows(
+                    LLMKeyword,
+                    keyword_rows,
+                    index_elements=["llm_analysis_id", "verbatim_term"],
+                )
+
+                # Drop keywords from a previous run that are no longer present
+                db.session.query(LLMKeyword).filter(
+                    LLMKeyword.llm_analysis_id == llm_analysis_id,
+                    LLMKeyword.verbatim_term.notin_(
+                        [kw["verbatim_term"] for kw in keywords]
+                    ),
+                ).delete(synchronize_session=False)
+                rows_written += len(keyword_rows)
+
+                DocumentKeywordManager.refresh_keyword_payloads([document_id])
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "document_id": document_id,
+            "rows_written": rows_written,
+            "keywords_mapped": len(taxonomy_ids),
+            "keywords_unmapped": len(keywords) - len(taxonomy_ids),
+            "elapsed_seconds": round(elapsed, 4),
+            "rows_per_second": round(rows_written / elapsed, 1) if elapsed else 0.0,
+        }
+        logger.info(
+            f"Persisted {rows_written} rows for document {document_id} in "
+            f"{elapsed:.3f}s ({stats['rows_per_second']} rows/s, "
+            f"{stats['keywords_mapped']}/{len(keywords)} keywords mapped)"
+        )
+        return stats
@@ -0,0 +1,372 @@
+# src/catalog/services/bulk_evaluation.py
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, select
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES, SCORECARD_SETTINGS
+from src.catalog.models import (
+    Classification,
+    CommunicationFocus,
+    DesignElement,
+    Document,
+    DocumentScorecard,
+    Entity,
+    ExtractedText,
+    LLMAnalysis,
+    LLMKeyword,
+)
+from src.catalog.utils.bulk_operations import upsert_rows
+
+logger = logging.getLogger(__name__)
+
+# Scorecard columns a re-score overwrites; review notes and created_date stay
+SCORED_COLUMNS = [
+    "metadata_score",
+    "text_extraction_score",
+    "classification_score",
+    "entity_score",
+    "design_score",
+    "keyword_score",
+    "communication_score",
+    "total_score",
+    "requires_review",
+    "review_reason",
+    "batch1_success",
+    "batch2_success",
+    "batch3_success",
+    "metadata_flags",
+    "text_flags",
+    "classification_flags",
+    "entity_flags",
+    "design_flags",
+    "keyword_flags",
+    "communication_flags",
+    "updated_date",
+]
+
+# Minimum points per batch, as in EvaluationService.evaluate_batch1/2/3
+BATCH_MINIMUMS = {"batch1": 20, "batch2": 18, "batch3": 15}
+
+
+def _length(column, label: str):
+    """Length of a text column, 0 when NULL, so rules never fetch the text"""
+    return func.coalesce(func.length(column), 0).label(label)
+
+
+def _award(
+    scores: List[int],
+    flags: List[List[str]],
+    present: Sequence[bool],
+    values: Sequence[int],
+    minimum: int,
+    points: int,
+    flag: str,
+):
+    """Apply one rule to a whole column: points where value > minimum"""
+    for i, value in enumerate(values):
+        if not present[i]:
+            continue
+        if value > minimum:
+            scores[i] += points
+        else:
+            flags[i].append(flag)
+
+
+def _component(
+    columns: Dict[str, list],
+    present_column: str,
+    missing_flag: str,
+    rules: Sequence[tuple],
+):
+    """Score one scorecard component column-wise; returns (scores, flags)"""
+    present = [value is not None for value in columns[present_column]]
+    scores = [0] * len(present)
+    flags = [[] if p else [missing_flag] for p in present]
+    for column, minimum, points, flag in rules:
+        _award(scores, flags, present, columns[column], minimum, points, flag)
+    return scores, flags
+
+
+class BulkScorecardEvaluator:
+    """
+    Scores documents a chunk at a time with the EvaluationService rules.
+
+    Each chunk is one outer-joined query over the analysis component tables
+    (one row per document, text columns reduced to their lengths in SQL,
+    keywords pre-aggregated), the rules are applied column-wise over the
+    fetched values, and the scorecards are written with a single
+    INSERT ... ON CONFLICT (document_id) and one commit. Review notes on
+    existing scorecards are preserved.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or SCORECARD_SETTINGS["CHUNK_SIZE"]
+
+    @staticmethod
+    def _fetch_columns(document_ids: List[int]) -> Dict[str, list]:
+        """Per-rule inputs for document_ids as parallel column lists"""
+        analyses = select(LLMAnalysis.id).where(
+            LLMAnalysis.document_id.in_(document_ids)
+        )
+        keyword_counts = (
+            select(
+                LLMKeyword.llm_analysis_id,
+                func.count().label("keyword_count"),
+                func.count(LLMKeyword.taxonomy_id).label("mapped_count"),
+            )
+            .where(LLMKeyword.llm_analysis_id.in_(analyses))
+            .group_by(LLMKeyword.llm_analysis_id)
+            .subquery()
+        )
+
+        rows = (
+            db.session.query(
+                Document.id.label("document_id"),
+                LLMAnalysis.id.label("analysis_id"),
+                _length(LLMAnalysis.summary_description, "summary"),
+                _length(LLMAnalysis.campaign_type, "campaign_type"),
+                _length(LLMAnalysis.document_tone, "document_tone"),
+                _length(LLMAnalysis.visual_analysis, "visual_analysis"),
+                func.coalesce(keyword_counts.c.keyword_count, 0).label("keywords"),
+                func.coalesce(keyword_counts.c.mapped_count, 0).label("mapped"),
+                ExtractedText.id.label("text_id"),
+                _length(ExtractedText.text_content, "text_content"),
+                _length(ExtractedText.main_message, "main_message"),
+                _length(ExtractedText.call_to_action, "call_to_action"),
+                Classification.id.label("classification_id"),
+                _length(Classification.category, "category"),
+                Entity.id.label("entity_id"),
+                _length(Entity.client_name, "client_name"),
+                _length(Entity.opponent_name, "opponent_name"),
+                DesignElement.id.label("design_id"),
+                _length(DesignElement.color_scheme, "color_scheme"),
+                _length(DesignElement.geographic_location, "geographic_location"),
+                _length(DesignElement.target_audience, "target_audience"),
+                CommunicationFocus.id.label("communication_id"),
+                _length(CommunicationFocus.primary_issue, "primary_issue"),
+                _length(CommunicationFocus.messaging_strategy, "messaging_strategy"),
+            )
+            .outerjoin(LLMAnalysis, LLMAnalysis.document_id == Document.id)
+            .outerjoin(
+                keyword_counts, keyword_counts.c.llm_analysis_id == LLMAnalysis.id
+            )
+            .outerjoin(ExtractedText, ExtractedText.document_id == Document.id)
+            .outerjoin(Classification, Classification.document_id == Document.id)
+            .outerjoin(Entity, Entity.document_id == Document.id)
+            .outerjoin(DesignElement, DesignElement.document_id == Document.id)
+            .outerjoin(
+                CommunicationFocus, CommunicationFocus.document_id == Document.id
+            )
+            .filter(Document.id.in_(document_ids))
+            .order_by(Document.id)
+            .all()
+        )
+
+        names = rows[0]._fields if rows else ()
+        return {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+    @staticmethod
+    def score(columns: Dict[str, list]) -> List[Dict[str, Any]]:
+        """Scorecard rows for the documents in columns"""
+        if not columns:
+            return []
+
+        metadata, metadata_flags = _component(
+            columns,
+            "analysis_id",
+            "No LLM analysis found",
+            [
+                ("summary", 20, 5, "Missing or incomplete summary"),
+                ("campaign_type", 0, 5, "Missing campaign type"),
+                ("document_tone", 0, 5, "Missing document tone"),
+                ("visual_analysis", 20, 5, "Missing or incomplete visual analysis"),
+            ],
+        )
+        text, text_flags = _component(
+            columns,
+            "text_id",
+            "No extracted text found",
+            [
+                ("text_content", 50, 10, "Missing or incomplete text content"),
+                ("main_message", 10, 5, "Missing or incomplete main message"),
+                ("call_to_action", 0, 5, "Missing call to action"),
+            ],
+        )
+        classification, classification_flags = _component(
+            columns,
+            "classification_id",
+            "No classification data found",
+            [("category", 0, 5, "Missing classification category")],
+        )
+        # classifications has no confidence column, so the confidence points
+        # are never awarded (evaluate_batch2 fails on the attribute instead)
+        for i, classification_id in enumerate(columns["classification_id"]):
+            if classification_id is not None:
+                classification_flags[i].append("Low classification confidence")
+        entity, entity_flags = _component(
+            columns,
+            "entity_id",
+            "No entity data found",
+            [
+                ("client_name", 0, 5, "Missing client name"),
+                ("opponent_name", 0, 5, "Missing opponent name"),
+            ],
+        )
+        design, design_flags = _component(
+            columns,
+            "design_id",
+            "No design element data found",
+            [
+                ("color_scheme", 0, 5, "Missing color scheme"),
+                ("geographic_location", 0, 5, "Missing geographic location"),
+                ("target_audience", 0, 5, "Missing target audience"),
+            ],
+        )
+        communication, communication_flags = _component(
+            columns,
+            "communication_id",
+            "No communication focus data found",
+            [
+                ("primary_issue", 0, 5, "Missing primary issue"),
+                ("messaging_strategy", 0, 5, "Missing messaging strategy"),
+            ],
+        )
+
+        # Keywords: 5 for any, 5 more for at least 3, 5 for taxonomy-mapped
+        keyword, keyword_flags = [], []
+        for count, mapped in zip(columns["keywords"], columns["mapped"]):
+            points, flags = 0, []
+            if count > 0:
+                points += 10 if count >= 3 else 5
+                if count < 3:
+                    flags.append("Less than 3 keywords")
+            else:
+                flags.append("No LLM keywords found")
+            if mapped > 0:
+                points += 5
+            else:
+                flags.append("No hierarchical keywords found")
+            keyword.append(points)
+            keyword_flags.append(flags)
+
+        batch1 = [a + b for a, b in zip(metadata, text)]
+        batch2 = [a + b + c for a, b, c in zip(classification, entity, design)]
+        batch3 = [a + b for a, b in zip(keyword, communication)]
+        total = [a + b + c for a, b, c in zip(batch1, batch2, batch3)]
+
+        threshold = SCORECARD_SETTINGS["REVIEW_THRESHOLD"]
+        now = datetime.utcnow()
+        return [
+            {
+                "document_id": columns["document_id"][i],
+                "metadata_score": metadata[i],
+                "text_extraction_score": text[i],
+                "classification_score": classification[i],
+                "entity_score": entity[i],
+                "design_score": design[i],
+                "keyword_score": keyword[i],
+                "communication_score": communication[i],
+                "total_score": total[i],
+                "requires_review": total[i] < threshold,
+                "review_reason": (
+                    f"Total score below threshold ({threshold})"
+                    if total[i] < threshold
+                    else None
+                ),
+                "batch1_success": batch1[i] >= BATCH_MINIMUMS["batch1"],
+                "batch2_success": batch2[i] >= BATCH_MINIMUMS["batch2"],
+                "batch3_success": batch3[i] >= BATCH_MINIMUMS["batch3"],
+                "metadata_flags": json.dumps(metadata_flags[i]),
+                "text_flags": json.dumps(text_flags[i]),
+                "classification_flags": json.dumps(classification_flags[i]),
+                "entity_flags": json.dumps(entity_flags[i]),
+                "design_flags": json.dumps(design_flags[i]),
+                "keyword_flags": json.dumps(keyword_flags[i]),
+                "communication_flags": json.dumps(communication_flags[i]),
+                "created_date": now,
+                "updated_date": now,
+            }
+            for i in range(len(total))
+        ]
+
+    def evaluate_chunk(self, document_ids: List[int]) -> List[Dict[str, Any]]:
+        """Score and upsert the scorecards of document_ids in one commit"""
+        try:
+            rows = self.score(self._fetch_columns(list(document_ids)))
+            upsert_rows(
+                DocumentScorecard,
+                rows,
+                index_elements=["document_id"],
+                update_columns=SCORED_COLUMNS,
+            )
+            db.session.commit()
+            return rows
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _chunks(
+        self, status: Optional[str], only_missing: bool
+    ) -> Iterator[List[int]]:
+        """Document ids in keyset-paginated chunks"""
+        last_id = 0
+        while True:
+            query = db.session.query(Document.id).filter(Document.id > last_id)
+            if status:
+                query = query.filter(Document.status == status)
+            if only_missing:
+                query = query.filter(
+                    ~Document.id.in_(select(DocumentScorecard.document_id))
+                )
+            ids = [
+                row.id
+                for row in query.order_by(Document.id).limit(self.chunk_size)
+            ]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    def run(
+        self,
+        document_ids: Optional[Sequence[int]] = None,
+        status: Optional[str] = DOCUMENT_STATUSES["COMPLETED"],
+        only_missing: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Score document_ids, or every document with status (all documents if
+        status is None), optionally only those without a scorecard.
+        """
+        start_time = time.perf_counter()
+        if document_ids is not None:
+            ids = sorted(set(document_ids))
+            chunks = (
+                ids[i:i + self.chunk_size]
+                for i in range(0, len(ids), self.chunk_size)
+            )
+        else:
+            chunks = self._chunks(status, only_missing)
+
+        documents = review = batches = 0
+        for chunk in chunks:
+            rows = self.evaluate_chunk(chunk)
+            documents += len(rows)
+            review += sum(1 for row in rows if row["requires_review"])
+            batches += 1
+
+        seconds = time.perf_counter() - start_time
+        logger.info(
+            f"Scored {documents} documents in {batches} chunks "
+            f"({seconds:.2f}s, {review} need review)"
+        )
+        return {
+            "documents": documents,
+            "chunks": batches,
+            "requires_review": review,
+            "seconds": round(seconds, 3),
+        }
@@ -0,0 +1,141 @@
+# src/catalog/services/checkpoint_service.py
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from src.catalog import db
+from src.catalog.constants import CHECKPOINT_STATUSES, PIPELINE_SETTINGS
+from src.catalog.models import AnalysisCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCheckpointService:
+    """
+    Per-document, per-component analysis checkpoints.
+
+    The (document_id, component) pair is the idempotency key for an analysis
+    prompt: once a component has SUCCEEDED, redelivered or retried tasks
+    reuse the stored result instead of calling the LLM again.
+    """
+
+    @staticmethod
+    def response_hash(result: Dict[str, Any]) -> str:
+        """sha256 of the canonical JSON form of a result"""
+        canonical = json.dumps(result, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def begin(document_id: int, component: str, task_id: str) -> AnalysisCheckpoint:
+        """
+        Mark a component RUNNING for this task, unless it already SUCCEEDED.
+        The returned checkpoint's status tells the caller whether to run.
+        """
+        for _ in range(2):
+            checkpoint = (
+                AnalysisCheckpoint.query.filter_by(
+                    document_id=document_id, component=component
+                )
+                .with_for_update()
+                .first()
+            )
+            if checkpoint and checkpoint.status == CHECKPOINT_STATUSES["SUCCEEDED"]:
+                db.session.commit()
+                return checkpoint
+
+            if checkpoint is None:
+                checkpoint = AnalysisCheckpoint(
+                    document_id=document_id, component=component, attempts=0
+                )
+                db.session.add(checkpoint)
+
+            checkpoint.status = CHECKPOINT_STATUSES["RUNNING"]
+            checkpoint.task_id = task_id
+            checkpoint.error = None
+            checkpoint.attempts = (checkpoint.attempts or 0) + 1
+            try:
+                db.session.commit()
+                return checkpoint
+            except IntegrityError:
+                # Another task created the row first; re-read it
+                db.session.rollback()
+
+        raise RuntimeError(
+            f"Could not create checkpoint for document {document_id}/{component}"
+        )
+
+    @staticmethod
+    def succeed(document_id: int, component: str, result: Dict[str, Any]):
+        """Store a component's result"""
+        checkpoint = AnalysisCheckpoint.query.filter_by(
+            document_id=document_id, component=component
+        ).first()
+        new_hash = AnalysisCheckpointService.response_hash(result)
+        if checkpoint.response_hash != new_hash:
+            checkpoint.result = result
+            checkpoint.response_hash = new_hash
+        checkpoint.status = CHECKPOINT_STATUSES["SUCCEEDED"]
+        checkpoint.error = None
+        db.session.commit()
+
+    @staticmethod
+    def fail(document_id: int, component: str, error: str):
+        """Record a failed attempt so a retry resubmits this component"""
+        checkpoint = AnalysisCheckpoint.query.filter_by(
+            document_id=document_id, component=component
+        ).first()
+        checkpoint.status = CHECKPOINT_STATUSES["FAILED"]
+        checkpoint.error = error[:1024]
+        db.session.commit()
+
+    @staticmethod
+    def missing_components(
+        document_id: int, components: Optional[List[str]] = None
+    ) -> List[str]:
+        """Components (in pipeline order) without a SUCCEEDED checkpoint"""
+        components = components or PIPELINE_SETTINGS["ANALYSIS_COMPONENTS"]
+        succeeded = {
+            component
+            for (component,) in db.session.query(AnalysisCheckpoint.component).filter(
+                AnalysisCheckpoint.document_id == document_id,
+                AnalysisCheckpoint.status == CHECKPOINT_STATUSES["SUCCEEDED"],
+            )
+        }
+        return [c for c in components if c not in succeeded]
+
+    @staticmethod
+    def succeeded_result(document_id: int, component: str) -> Optional[Dict[str, Any]]:
+        """A component's stored result, if it has SUCCEEDED"""
+        checkpoint = AnalysisCheckpoint.query.filter_by(
+            document_id=document_id,
+            component=component,
+            status=CHECKPOINT_STATUSES["SUCCEEDED"],
+        ).first()
+        return checkpoint.result if checkpoint else None
+
+    @staticmethod
+    def merged_results(document_id: int) -> Dict[str, Any]:
+        """Combine all SUCCEEDED results into one analysis response"""
+        order = {c: i for i, c in enumerate(PIPELINE_SETTINGS["ANALYSIS_COMPONENTS"])}
+        checkpoints = AnalysisCheckpoint.query.filter_by(
+            document_id=document_id, status=CHECKPOINT_STATUSES["SUCCEEDED"]
+        ).all()
+
+        response = {}
+        for checkpoint in sorted(
+            checkpoints, key=lambda c: order.get(c.component, len(order))
+        ):
+            response.update(checkpoint.result or {})
+        return response
+
+    @staticmethod
+    def reset(document_id: int):
+        """Drop all checkpoints so the next run re-analyzes every component"""
+        deleted = AnalysisCheckpoint.query.filter_by(document_id=document_id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        logger.info(f"Cleared {deleted} analysis checkpoints for document {document_id}")
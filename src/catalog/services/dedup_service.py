@@ -0,0 +1,168 @@
+# src/catalog/services/dedup_service.py
+import logging
+from typing import Optional
+
+from sqlalchemy import func, literal_column, or_
+
+from src.catalog import db
+from src.catalog.constants import DEDUP_SETTINGS, DOCUMENT_STATUSES
+from src.catalog.models import Document
+from src.catalog.services.analysis_store import AnalysisStore
+from src.catalog.services.checkpoint_service import AnalysisCheckpointService
+
+logger = logging.getLogger(__name__)
+
+# Columns a duplicate takes over from its original instead of recomputing
+INHERITED_COLUMNS = [
+    "page_count",
+    "perceptual_hash",
+    "embeddings",
+    "search_vector",
+    "preview_status",
+    "s3_preview_key",
+    "preview_generated_at",
+]
+
+
+class DuplicateDetector:
+    """
+    Exact and near-duplicate detection for ingested files.
+
+    Exact duplicates share a sha256 (and therefore a storage object); they
+    reuse the original's checkpointed analysis, embeddings and preview
+    instead of going through the pipeline. Near-duplicates (revisions,
+    rescans) are found by the Hamming distance between perceptual hashes of
+    the first page and flagged for review; they are still analyzed.
+    """
+
+    @staticmethod
+    def perceptual_hash(image) -> str:
+        """64-bit difference hash (dHash) of a PIL image, as 16 hex chars"""
+        from PIL import Image
+
+        size = DEDUP_SETTINGS["HASH_SIZE"]
+        pixels = list(
+            image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata()
+        )
+        bits = 0
+        for row in range(size):
+            offset = row * (size + 1)
+            for col in range(size):
+                bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        return f"{bits:0{size * size // 4}x}"
+
+    @staticmethod
+    def open_image(source, key: str):
+        """PIL image from a readable file object, or None"""
+        from PIL import Image
+
+        try:
+            return Image.open(source)
+        except Exception as e:
+            logger.warning(f"Could not open image {key}: {str(e)}")
+            return None
+
+    @staticmethod
+    def hamming(a: str, b: str) -> int:
+        return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+    @staticmethod
+    def find_original(document: Document) -> Optional[Document]:
+        """Earliest completed document with the same content, if any"""
+        if not document.content_sha256:
+            return None
+        return (
+            Document.query.filter(
+                Document.content_sha256 == document.content_sha256,
+                Document.id != document.id,
+                Document.status == DOCUMENT_STATUSES["COMPLETED"],
+                Document.duplicate_of_id.is_(None),
+            )
+            .order_by(Document.id)
+            .first()
+        )
+
+    @staticmethod
+    def link_duplicate(document_id: int, original: Document) -> bool:
+        """
+        Complete a document from its original's results.
+
+        Returns False if the original has no checkpointed analysis to reuse
+        (it predates checkpoints); the caller should run the pipeline.
+        """
+        response = AnalysisCheckpointService.merged_results(original.id)
+        if not response:
+            return False
+
+        AnalysisStore.persist(document_id, response)
+
+        doc = db.session.get(Document, document_id)
+        for column in INHERITED_COLUMNS:
+            setattr(doc, column, getattr(original, column))
+        doc.duplicate_of_id = original.id
+        doc.status = DOCUMENT_STATUSES["COMPLETED"]
+        db.session.commit()
+
+        logger.info(
+            f"Document {document_id} is an exact duplicate of {original.id}; "
+            "reused its analysis"
+        )
+        return True
+
+    @staticmethod
+    def band_matches(phash: str) -> list:
+        """
+        Conditions matching hashes that share a band with phash. Two hashes
+        within NEAR_DUPLICATE_DISTANCE bits agree exactly on at least one of
+        HASH_BANDS bands, and each band has an expression index.
+        """
+        width = len(phash) // DEDUP_SETTINGS["HASH_BANDS"]
+        return [
+            # Inline positions so the expression matches the band index
+            func.substr(
+                Document.perceptual_hash,
+                literal_column(str(start + 1)),
+                literal_column(str(width)),
+            )
+            == phash[start : start + width]
+            for start in range(0, len(phash), width)
+        ]
+
+    @staticmethod
+    def flag_near_duplicate(document_id: int, phash: str) -> Optional[int]:
+        """
+        Store the document's perceptual hash and flag the closest earlier
+        document within NEAR_DUPLICATE_DISTANCE bits. Returns its id.
+
+        Only earlier documents sharing a hash band are compared, newest
+        first and at most MAX_CANDIDATES of them.
+        """
+        candidates = (
+            db.session.query(Document.id, Document.perceptual_hash)
+            .filter(
+                or_(*DuplicateDetector.band_matches(phash)),
+                Document.id < document_id,
+                Document.duplicate_of_id.is_(None),
+            )
+            .order_by(Document.id.desc())
+            .limit(DEDUP_SETTINGS["MAX_CANDIDATES"])
+        )
+
+        best_id, best_distance = None, DEDUP_SETTINGS["NEAR_DUPLICATE_DISTANCE"] + 1
+        for candidate_id, candidate_hash in candidates:
+            distance = DuplicateDetector.hamming(phash, candidate_hash)
+            if distance < best_distance:
+                best_id, best_distance = candidate_id, distance
+
+        Document.query.filter_by(id=document_id).update(
+            {"perceptual_hash": phash, "near_duplicate_of_id": best_id},
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        if best_id:
+            logger.info(
+                f"Document {document_id} flagged as near-duplicate of {best_id} "
+                f"({best_distance} bits differ)"
+            )
+        return best_id
@@ -15,12 +15,15 @@ def get_document_count(status=None):
 
 @cache.memoize(timeout=60)
 def get_document_counts_by_status():
-    """Get document counts grouped by status"""
+    """Get document counts grouped by status, from the status counters"""
+    from src.catalog.services.stats_rollup import DocumentStatsRollup
+
+    by_status = DocumentStatsRollup.status_counts()
     counts = {
-        'total': get_document_count(),
-        'completed': get_document_count('COMPLETED'),
-        'failed': get_document_count('FAILED'),
-        'pending': get_document_count('PENDING'),
-        'processing': get_document_count('PROCESSING')
+        'total': sum(by_status.values()),
+        'completed': by_status.get('COMPLETED', 0),
+        'failed': by_status.get('FAILED', 0),
+        'pending': by_status.get('PENDING', 0),
+        'processing': by_status.get('PROCESSING', 0)
     }
     return counts
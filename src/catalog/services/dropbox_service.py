@@ -5,16 +5,41 @@ import logging
 from datetime import datetime, timedelta
 import dropbox
 from dropbox.exceptions import ApiError, AuthError, RateLimitError
-from src.catalog.models import Document, DropboxSync
+from src.catalog.models import Document, DropboxSync, DropboxCursor
 from src.catalog import db
-import tempfile
+from src.catalog.constants import DROPBOX_SYNC_SETTINGS
+from src.catalog.utils.bulk_operations import upsert_rows
 import time
 
 logger = logging.getLogger(__name__)
 
+SYNC_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png')
+
+# Ids per bulk IN lookup of already-synced files
+ID_LOOKUP_CHUNK = 500
+
 
 class DropboxService:
-    def __init__(self):
+    def __init__(self, client=None):
+        """
+        Args:
+            client: Dropbox client to use instead of connecting with
+                DROPBOX_ACCESS_TOKEN (e.g. FakeDropboxClient). Setting
+                DROPBOX_FAKE_ROOT uses a fake client over that directory.
+        """
+        self._longpoll_dbx = None
+        fake_root = os.getenv('DROPBOX_FAKE_ROOT')
+        if client is None and fake_root:
+            from src.catalog.services.fake_dropbox import FakeDropboxClient
+
+            client = FakeDropboxClient(fake_root)
+
+        if client is not None:
+            self.dbx = client
+            self.folder_path = os.getenv('DROPBOX_FOLDER_PATH', '')
+            if self.folder_path and not self.folder_path.startswith('/'):
+                self.folder_path = f"/{self.folder_path}"
+            return
 
         self.access_token = os.getenv('DROPBOX_ACCESS_TOKEN')
         if not self.access_token:
@@ -108,191 +133,190 @@ class DropboxService:
                 'error': str(e)
             }
 
-    def list_new_files(self):
-        """List files in Dropbox folder that haven't been processed"""
-        try:
-
-            processed_files = {sync.dropbox_file_id
-                               for sync in DropboxSync.query.all()}
-
-            logger.info(
-                f"Found {len(processed_files)} previously processed files")
-
-            new_files = []
-
-            max_retries = 3
-            retry_count = 0
-            result = None
-
-            while retry_count < max_retries and result is None:
-                try:
-                    logger.info(f"Listing files in folder: {self.folder_path}")
-                    result = self.dbx.files_list_folder(
-                        self.folder_path,
-                        recursive=True
-                    )
-                except RateLimitError:
-                    retry_count += 1
-                    wait_time = 2 ** retry_count
-                    logger.warning(
-                        f"Rate limit hit, retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-                except Exception as e:
-                    logger.error(f"Error listing folder: {str(e)}")
+    def _with_retries(self, call, *args, **kwargs):
+        """Call the Dropbox API, backing off on rate limits"""
+        max_retries = 3
+        for attempt in range(max_retries + 1):
+            try:
+                return call(*args, **kwargs)
+            except RateLimitError as e:
+                if attempt == max_retries:
                     raise
+                wait_time = getattr(e, 'backoff', None) or 2 ** (attempt + 1)
+                logger.warning(f"Rate limit hit, retrying in {wait_time}s...")
+                time.sleep(wait_time)
 
-            if result is None:
-                logger.error("Failed to list folder after multiple attempts")
-                return []
-
-            for entry in result.entries:
-                if isinstance(entry, dropbox.files.FileMetadata):
-                    logger.info(f"Found file: {entry.name} (ID: {entry.id})")
-                    if entry.id not in processed_files:
-                        logger.info(f"File {entry.name} is new")
-                        if entry.name.lower().endswith(('.pdf', '.jpg', '.jpeg', '.png')):
-                            new_files.append(entry)
-                            logger.info(f"Added {entry.name} to process list")
-                        else:
-                            logger.info(
-                                f"Skipping {entry.name} - unsupported file type")
-
-            while result.has_more:
-                retry_count = 0
-                next_result = None
-
-                while retry_count < max_retries and next_result is None:
-                    try:
-                        logger.info("Fetching more files...")
-                        next_result = self.dbx.files_list_folder_continue(
-                            result.cursor)
-                    except RateLimitError:
-                        retry_count += 1
-                        wait_time = 2 ** retry_count
-                        logger.warning(
-                            f"Rate limit hit, retrying in {wait_time}s...")
-                        time.sleep(wait_time)
-                    except Exception as e:
-                        logger.error(f"Error fetching more files: {str(e)}")
-                        break
-
-                if next_result is None:
-                    logger.error(
-                        "Failed to continue listing folder after multiple attempts")
-                    break
-
-                result = next_result
-
-                for entry in result.entries:
-                    if isinstance(entry, dropbox.files.FileMetadata):
-                        logger.info(
-                            f"Found file: {entry.name} (ID: {entry.id})")
-                        if entry.id not in processed_files:
-                            logger.info(f"File {entry.name} is new")
-                            if entry.name.lower().endswith(('.pdf', '.jpg', '.jpeg', '.png')):
-                                new_files.append(entry)
-                                logger.info(
-                                    f"Added {entry.name} to process list")
-                            else:
-                                logger.info(
-                                    f"Skipping {entry.name} - unsupported file type")
-
-            logger.info(f"Total new files found: {len(new_files)}")
-            return new_files
-
-        except Exception as e:
-            logger.error(f"Error listing Dropbox files: {str(e)}")
-            raise
+    def get_cursor(self):
+        """Cursor saved by the last completed sync of this folder, if any"""
+        row = DropboxCursor.query.filter_by(folder_path=self.folder_path).first()
+        return row.cursor if row else None
+
+    def save_cursor(self, cursor):
+        """Persist the cursor so the next sync starts from here"""
+        upsert_rows(
+            DropboxCursor,
+            [{
+                'folder_path': self.folder_path,
+                'cursor': cursor,
+                'updated_at': datetime.utcnow(),
+            }],
+            index_elements=['folder_path'],
+        )
+        db.session.commit()
+
+    def list_changes(self, cursor=None):
+        """
+        Fetch file entries changed since the cursor.
+
+        Without a cursor (first sync, or after Dropbox reset it) the folder
+        is listed in full once. Returns (FileMetadata entries, new cursor);
+        the caller saves the cursor once the entries are handled.
+        """
+        result = None
+        if cursor:
+            try:
+                result = self._with_retries(
+                    self.dbx.files_list_folder_continue, cursor)
+            except ApiError as e:
+                if not (hasattr(e.error, 'is_reset') and e.error.is_reset()):
+                    raise
+                logger.warning("Dropbox cursor was reset, listing folder in full")
+
+        if result is None:
+            logger.info(f"Listing files in folder: {self.folder_path}")
+            result = self._with_retries(
+                self.dbx.files_list_folder, self.folder_path, recursive=True)
+
+        entries = []
+        while True:
+            entries.extend(
+                entry for entry in result.entries
+                if isinstance(entry, dropbox.files.FileMetadata)
+            )
+            if not result.has_more:
+                break
+            result = self._with_retries(
+                self.dbx.files_list_folder_continue, result.cursor)
+
+        return entries, result.cursor
+
+    @staticmethod
+    def filter_unprocessed(entries):
+        """
+        Drop entries already synced, using bulk IN lookups on the unique id.
+        Files an earlier sync recorded as FAILED are kept, so they're retried.
+        """
+        ids = [entry.id for entry in entries]
+        processed = set()
+        for start in range(0, len(ids), ID_LOOKUP_CHUNK):
+            chunk = ids[start:start + ID_LOOKUP_CHUNK]
+            processed.update(
+                file_id for (file_id,) in db.session.query(
+                    DropboxSync.dropbox_file_id
+                ).filter(
+                    DropboxSync.dropbox_file_id.in_(chunk),
+                    DropboxSync.status != 'FAILED',
+                )
+            )
+        return [entry for entry in entries if entry.id not in processed]
+
+    def list_failed_files(self, exclude=(), limit=None):
+        """
+        Current metadata of files earlier syncs gave up on, least recently
+        tried first. The cursor has already moved past them, so they would
+        otherwise only be retried when they change in Dropbox. Rows of files
+        that no longer exist are deleted.
+        """
+        limit = limit or DROPBOX_SYNC_SETTINGS['FAILED_RETRY_BATCH']
+        rows = (
+            DropboxSync.query.filter(DropboxSync.status == 'FAILED')
+            .order_by(DropboxSync.sync_date)
+            .limit(limit)
+            .all()
+        )
+
+        entries = []
+        for row in rows:
+            if row.dropbox_file_id in exclude:
+                continue
+            try:
+                entry = self._with_retries(
+                    self.dbx.files_get_metadata, row.dropbox_path)
+            except ApiError as e:
+                if e.error.is_path() and e.error.get_path().is_not_found():
+                    logger.info(f"{row.dropbox_path} was deleted, not retrying")
+                    db.session.delete(row)
+                else:
+                    logger.warning(
+                        f"Could not look up {row.dropbox_path}: {str(e)}")
+                continue
+            if (isinstance(entry, dropbox.files.FileMetadata)
+                    and entry.id == row.dropbox_file_id):
+                entries.append(entry)
+
+        db.session.commit()
+        return entries
+
+    def list_new_files(self, cursor=None):
+        """
+        List supported files changed since the cursor that haven't been
+        processed. Returns (new files, cursor to save after processing).
+        """
+        entries, new_cursor = self.list_changes(cursor)
+
+        supported = []
+        for entry in entries:
+            if entry.name.lower().endswith(SYNC_EXTENSIONS):
+                supported.append(entry)
+            else:
+                logger.info(f"Skipping {entry.name} - unsupported file type")
+
+        new_files = self.filter_unprocessed(supported)
+        logger.info(
+            f"{len(entries)} changed files, {len(new_files)} new to process")
+        return new_files, new_cursor
+
+    def longpoll_client(self):
+        """
+        Client for longpolls, whose HTTP timeout outlasts the longpoll
+        timeout plus the jitter Dropbox adds to it (the regular client
+        gives up after 30s).
+        """
+        if self._longpoll_dbx is None:
+            self._longpoll_dbx = self.dbx.clone(
+                timeout=DROPBOX_SYNC_SETTINGS['LONGPOLL_TIMEOUT']
+                + DROPBOX_SYNC_SETTINGS['LONGPOLL_JITTER'] + 10)
+        return self._longpoll_dbx
+
+    def wait_for_changes(self, cursor, timeout=None):
+        """
+        Block until the folder changes after the cursor or the timeout
+        passes (Dropbox longpoll; no API quota used). Returns (changes,
+        seconds the caller should back off before polling again).
+        """
+        timeout = timeout or DROPBOX_SYNC_SETTINGS['LONGPOLL_TIMEOUT']
+        result = self.longpoll_client().files_list_folder_longpoll(
+            cursor, timeout=timeout)
+        return result.changes, getattr(result, 'backoff', None) or 0
 
     def process_file(self, file_metadata):
         """Process a single file from Dropbox"""
-        temp_path = None
-        try:
+        from src.catalog.services.dropbox_transfer import DropboxTransferPool
 
-            existing_sync = DropboxSync.query.filter_by(
-                dropbox_file_id=file_metadata.id
-            ).first()
-
-            if existing_sync:
-                logger.info(f"File already processed: {file_metadata.name}")
-                return None, None
-
-            logger.info(f"Starting to process file: {file_metadata.name}")
-
-            with tempfile.NamedTemporaryFile(delete=False) as temp:
-                temp_path = temp.name
-
-            max_retries = 3
-            success = False
-
-            for attempt in range(max_retries):
-                try:
-                    self.dbx.files_download_to_file(
-                        temp_path, file_metadata.path_display)
-
-                    if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-                        logger.info(
-                            f"Successfully downloaded file to {temp_path} (Size: {os.path.getsize(temp_path)} bytes)")
-                        success = True
-                        break
-                    else:
-                        logger.warning(
-                            f"Download seems to have failed - empty or missing file at {temp_path}")
-                except RateLimitError:
-                    if attempt == max_retries - 1:
-                        raise
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limit hit, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                except Exception as e:
-                    logger.error(
-                        f"Download attempt {attempt+1} failed: {str(e)}")
-                    if attempt == max_retries - 1:
-                        raise
-                    time.sleep(2 ** attempt)
-
-            if not success:
-                raise Exception(
-                    f"Failed to download file after {max_retries} attempts")
-
-            from catalog.services.storage_service import MinIOStorage
-            storage = MinIOStorage()
-            minio_path = storage.upload_file(temp_path, file_metadata.name)
-            logger.info(f"Uploaded to MinIO: {minio_path}")
-
-            document = Document(
-                filename=file_metadata.name,
-                upload_date=datetime.utcnow(),
-                file_size=os.path.getsize(temp_path),
-                status='PENDING',
-                page_count=1
-            )
-            db.session.add(document)
-            db.session.flush()
-
-            sync_record = DropboxSync(
-                document_id=document.id,
-                dropbox_file_id=file_metadata.id,
-                dropbox_path=file_metadata.path_display,
-                sync_date=datetime.utcnow(),
-                status='SYNCED'
-            )
-            db.session.add(sync_record)
-            db.session.commit()
+        if not self.filter_unprocessed([file_metadata]):
+            logger.info(f"File already processed: {file_metadata.name}")
+            return None, None
 
-            logger.info(f"Successfully processed file: {file_metadata.name}")
-            return document, minio_path
+        logger.info(f"Starting to process file: {file_metadata.name}")
+        stored = DropboxTransferPool(self, max_workers=1).transfer(file_metadata)
+        document_ids = DropboxTransferPool.record_documents([stored])
+        if not document_ids:
+            logger.info(f"File claimed by another sync: {file_metadata.name}")
+            return None, None
+        document_id, = document_ids
 
-        except Exception as e:
-            logger.error(
-                f"Error processing file {file_metadata.name}: {str(e)}")
-            db.session.rollback()
-            raise
-        finally:
-
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
-                logger.debug(f"Cleaned up temporary file: {temp_path}")
+        logger.info(f"Successfully processed file: {file_metadata.name}")
+        return db.session.get(Document, document_id), stored['key']
 
     def get_sync_status(self):
         """Get information about recent syncs"""
@@ -307,11 +331,15 @@ class DropboxService:
 
             connection_status = self.test_connection()
 
+            from src.catalog.services.dropbox_transfer import DropboxTransferPool
+
             return {
                 'last_sync_time': last_sync.sync_date if last_sync else None,
                 'last_24h_files': recent_syncs,
                 'last_status': 'SUCCESS',
-                'dropbox_connected': connection_status.get('connected', False)
+                'dropbox_connected': connection_status.get('connected', False),
+                # Throughput of the last sync's Dropbox -> MinIO transfers
+                'last_transfer': DropboxTransferPool.last_stats()
             }
         except Exception as e:
             logger.error(f"Error getting sync status: {str(e)}")
@@ -0,0 +1,244 @@
+# src/catalog/services/dropbox_transfer.py
+import time
+import random
+import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dropbox.exceptions import AuthError, RateLimitError
+from sqlalchemy import update
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES, DROPBOX_SYNC_SETTINGS
+from src.catalog.models import DropboxSync
+from src.catalog.services.storage_service import MinIOStorage
+from src.catalog.services.upload_service import UploadService
+from src.catalog.utils.bulk_operations import upsert_rows
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_STATS_KEY = "dropbox_sync:last_transfer"
+
+
+class DropboxTransferPool:
+    """
+    Bounded pool of concurrent Dropbox -> MinIO transfers.
+
+    Each file's files_download response is read in chunks straight into a
+    MinIO multipart upload (via MinIOStorage.store_content), so nothing is
+    written to local disk. Failed transfers are retried per file with
+    exponential backoff and jitter, honouring Dropbox's rate-limit backoff.
+    """
+
+    def __init__(self, dropbox_service, storage=None, max_workers=None):
+        self.dropbox_service = dropbox_service
+        self.storage = storage or MinIOStorage()
+        self.max_workers = (
+            max_workers or DROPBOX_SYNC_SETTINGS["MAX_PARALLEL_TRANSFERS"]
+        )
+
+    def _stream_one(self, entry) -> Dict[str, Any]:
+        _, response = self.dropbox_service.dbx.files_download(entry.path_display)
+        try:
+            raw = response.raw
+            if hasattr(raw, "decode_content"):
+                raw.decode_content = True
+            content_type = (
+                mimetypes.guess_type(entry.name)[0] or "application/octet-stream"
+            )
+            stored = self.storage.store_content(
+                raw, entry.name, content_type=content_type
+            )
+        finally:
+            response.close()
+        return dict(stored, filename=entry.name, entry=entry)
+
+    def transfer(self, entry) -> Dict[str, Any]:
+        """Transfer one file, retrying with backoff; raises after the last attempt"""
+        retries = DROPBOX_SYNC_SETTINGS["TRANSFER_RETRIES"]
+        for attempt in range(1, retries + 1):
+            try:
+                return self._stream_one(entry)
+            except AuthError:
+                raise
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                wait_time = 2 ** attempt + random.uniform(0, 1)
+                if isinstance(e, RateLimitError) and getattr(e, "backoff", None):
+                    wait_time = max(wait_time, e.backoff)
+                logger.warning(
+                    f"Transfer of {entry.path_display} failed (attempt {attempt}/"
+                    f"{retries}): {str(e)}. Retrying in {wait_time:.1f}s"
+                )
+                time.sleep(wait_time)
+
+    def run(self, entries) -> Dict[str, Any]:
+        """
+        Transfer all entries concurrently.
+
+        Returns {"stored": [...], "failed": [(entry, error)], "stats": {...}}
+        """
+        started = time.perf_counter()
+        stored, failed = [], []
+
+        if entries:
+            workers = min(self.max_workers, len(entries))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    (entry, pool.submit(self.transfer, entry)) for entry in entries
+                ]
+                for entry, future in futures:
+                    try:
+                        stored.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Giving up on {entry.path_display}: {str(e)}")
+                        failed.append((entry, str(e)))
+
+        seconds = time.perf_counter() - started
+        total_bytes = sum(item["size"] for item in stored)
+        stats = {
+            "files": len(stored),
+            "failed": len(failed),
+            "bytes": total_bytes,
+            "seconds": round(seconds, 3),
+            "bytes_per_sec": round(total_bytes / seconds, 1) if seconds else 0.0,
+            "files_per_sec": round(len(stored) / seconds, 3) if seconds else 0.0,
+            "finished_at": datetime.utcnow().isoformat(),
+        }
+        logger.info(
+            f"Transferred {stats['files']} files ({total_bytes} bytes) in "
+            f"{stats['seconds']}s: {stats['bytes_per_sec']} B/s, "
+            f"{stats['files_per_sec']} files/s, {len(failed)} failed"
+        )
+        return {"stored": stored, "failed": failed, "stats": stats}
+
+    @staticmethod
+    def record_documents(stored: List[Dict[str, Any]]) -> List[int]:
+        """
+        Claim transferred files in dropbox_syncs and create documents for
+        the claimed ones, in one transaction.
+
+        The sync rows are inserted first, taking over only rows left FAILED
+        by an earlier sync, so a file already claimed by an overlapping sync
+        is skipped instead of getting a second document. Returns the new
+        document ids.
+        """
+        if not stored:
+            return []
+
+        now = datetime.utcnow()
+        try:
+            claimed = {
+                row.dropbox_file_id: row.id
+                for row in upsert_rows(
+                    DropboxSync,
+                    [
+                        {
+                            "dropbox_file_id": item["entry"].id,
+                            "dropbox_path": item["entry"].path_display,
+                            "sync_date": now,
+                            "status": "SYNCED",
+                        }
+                        for item in stored
+                    ],
+                    index_elements=["dropbox_file_id"],
+                    update_columns=["dropbox_path", "sync_date", "status"],
+                    returning=[DropboxSync.id, DropboxSync.dropbox_file_id],
+                    where=DropboxSync.status == "FAILED",
+                )
+            }
+            items = [item for item in stored if item["entry"].id in claimed]
+            if len(items) < len(stored):
+                logger.info(
+                    f"{len(stored) - len(items)} files were already claimed "
+                    f"by another sync"
+                )
+
+            document_ids = UploadService.create_documents(
+                items, DOCUMENT_STATUSES["BATCH_PENDING"], commit=False
+            )
+            if document_ids:
+                db.session.execute(
+                    update(DropboxSync),
+                    [
+                        {"id": claimed[item["entry"].id], "document_id": document_id}
+                        for document_id, item in zip(document_ids, items)
+                    ],
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return document_ids
+
+    @staticmethod
+    def record_failures(failed: List[Tuple[Any, str]]) -> int:
+        """
+        Mark files that could not be transferred as FAILED in dropbox_syncs,
+        so the sync cursor can advance past them instead of listing them
+        (and finding "changes") on every run. Later syncs retry FAILED files
+        (DropboxService.list_failed_files), least recently tried first.
+        """
+        if not failed:
+            return 0
+
+        now = datetime.utcnow()
+        try:
+            upsert_rows(
+                DropboxSync,
+                [
+                    {
+                        "dropbox_file_id": entry.id,
+                        "dropbox_path": entry.path_display,
+                        "sync_date": now,
+                        "status": "FAILED",
+                    }
+                    for entry, _ in failed
+                ],
+                index_elements=["dropbox_file_id"],
+                update_columns=["dropbox_path", "sync_date"],
+                where=DropboxSync.status == "FAILED",
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(failed)
+
+    @staticmethod
+    def save_stats(stats: Dict[str, Any]):
+        """Keep the last transfer's throughput for the sync status"""
+        from src.catalog.utils.stage_metrics import redis_client
+
+        try:
+            client = redis_client()
+            client.hset(
+                TRANSFER_STATS_KEY, mapping={k: str(v) for k, v in stats.items()}
+            )
+            client.expire(
+                TRANSFER_STATS_KEY, DROPBOX_SYNC_SETTINGS["TRANSFER_STATS_TTL"]
+            )
+        except Exception as e:
+            logger.warning(f"Could not save transfer stats: {str(e)}")
+
+    @staticmethod
+    def last_stats() -> Optional[Dict[str, Any]]:
+        from src.catalog.utils.stage_metrics import redis_client
+
+        try:
+            raw = redis_client().hgetall(TRANSFER_STATS_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read transfer stats: {str(e)}")
+            return None
+        if not raw:
+            return None
+
+        stats = {k.decode(): v.decode() for k, v in raw.items()}
+        for key in ("files", "failed", "bytes"):
+            stats[key] = int(stats[key])
+        for key in ("seconds", "bytes_per_sec", "files_per_sec"):
+            stats[key] = float(stats[key])
+        return stats
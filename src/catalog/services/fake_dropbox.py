@@ -0,0 +1,178 @@
+# src/catalog/services/fake_dropbox.py
+"""
+Local stand-in for the Dropbox SDK client, backed by a directory.
+
+Implements the calls DropboxService uses (list_folder, list_folder_continue,
+longpoll, get_metadata, downloads) with real dropbox.files result types, so cursor-based
+sync can be exercised without an account:
+
+    DROPBOX_FAKE_ROOT=/tmp/fake_dropbox
+
+Files under the root appear as Dropbox files; copying a new file in (or
+touching an existing one) makes it show up in the next delta. Cursors
+encode the listing time and page offset, so they stay valid across
+processes like real ones.
+
+Like the SDK client, the fake has an HTTP timeout: a longpoll whose
+timeout plus Dropbox's answer jitter exceeds it raises ReadTimeout, and
+longpoll_backoff is returned as the server's backoff hint.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import shutil
+from types import SimpleNamespace
+from typing import Optional
+
+from dropbox.exceptions import ApiError
+from dropbox.files import (
+    FileMetadata,
+    GetMetadataError,
+    ListFolderLongpollResult,
+    ListFolderResult,
+    LookupError,
+)
+from requests.exceptions import ReadTimeout
+
+from src.catalog.constants import DROPBOX_SYNC_SETTINGS
+
+
+class FakeDropboxClient:
+    PAGE_SIZE = 100
+    DEFAULT_TIMEOUT = 100  # dropbox.dropbox_client.DEFAULT_TIMEOUT
+
+    def __init__(
+        self,
+        root: str,
+        page_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        longpoll_backoff: Optional[int] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.page_size = page_size or self.PAGE_SIZE
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.longpoll_backoff = longpoll_backoff
+        os.makedirs(self.root, exist_ok=True)
+
+    def clone(self, timeout=None, **kwargs):
+        return FakeDropboxClient(
+            self.root,
+            page_size=self.page_size,
+            timeout=timeout or self.timeout,
+            longpoll_backoff=self.longpoll_backoff,
+        )
+
+    def users_get_current_account(self):
+        return SimpleNamespace(email="fake@dropbox.local")
+
+    def _local_path(self, path: str) -> str:
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def _entries(self, path: str, since: float):
+        """FileMetadata for files under path modified after since, oldest first"""
+        files = []
+        for directory, _, names in os.walk(self._local_path(path)):
+            for name in names:
+                local = os.path.join(directory, name)
+                stat = os.stat(local)
+                if stat.st_mtime > since:
+                    files.append((stat.st_mtime, local, stat.st_size))
+
+        return [
+            self._metadata(local, mtime, size) for mtime, local, size in sorted(files)
+        ]
+
+    def _metadata(self, local: str, mtime: float, size: int) -> FileMetadata:
+        display = "/" + os.path.relpath(local, self.root).replace(os.sep, "/")
+        return FileMetadata(
+            name=os.path.basename(local),
+            id="id:" + hashlib.sha1(display.lower().encode()).hexdigest()[:22],
+            path_lower=display.lower(),
+            path_display=display,
+            size=size,
+            rev=format(int(mtime), "x").rjust(9, "0"),
+        )
+
+    @staticmethod
+    def _encode(state) -> str:
+        return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+    @staticmethod
+    def _decode(cursor: str):
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+    def _page(self, state) -> ListFolderResult:
+        entries = self._entries(state["path"], state["since"])
+        page = entries[state["offset"] : state["offset"] + self.page_size]
+        has_more = state["offset"] + len(page) < len(entries)
+        if has_more:
+            next_state = dict(state, offset=state["offset"] + len(page))
+        else:
+            # Next delta starts where this listing started
+            next_state = dict(state, since=state["listed_at"], offset=0)
+        return ListFolderResult(
+            entries=page, cursor=self._encode(next_state), has_more=has_more
+        )
+
+    def files_list_folder(self, path, recursive=False, **kwargs):
+        return self._page(
+            {"path": path, "since": 0.0, "offset": 0, "listed_at": time.time()}
+        )
+
+    def files_list_folder_continue(self, cursor):
+        state = self._decode(cursor)
+        if not state["offset"]:
+            state["listed_at"] = time.time()
+        return self._page(state)
+
+    def files_list_folder_get_latest_cursor(self, path, recursive=False, **kwargs):
+        now = time.time()
+        return SimpleNamespace(
+            cursor=self._encode(
+                {"path": path, "since": now, "offset": 0, "listed_at": now}
+            )
+        )
+
+    def files_list_folder_longpoll(self, cursor, timeout=30):
+        # Dropbox may answer up to LONGPOLL_JITTER seconds after timeout;
+        # a client that stops reading earlier times out on idle folders
+        if timeout + DROPBOX_SYNC_SETTINGS["LONGPOLL_JITTER"] > self.timeout:
+            raise ReadTimeout(
+                f"longpoll of {timeout}s can outlast the {self.timeout}s "
+                f"HTTP timeout"
+            )
+
+        state = self._decode(cursor)
+        deadline = time.time() + timeout
+        changes = False
+        while time.time() < deadline:
+            if self._entries(state["path"], state["since"]):
+                changes = True
+                break
+            time.sleep(1)
+        return ListFolderLongpollResult(
+            changes=changes, backoff=self.longpoll_backoff
+        )
+
+    def files_get_metadata(self, path, **kwargs):
+        local = self._local_path(path)
+        if not os.path.isfile(local):
+            raise ApiError(
+                None, GetMetadataError.path(LookupError.not_found), None, None
+            )
+        stat = os.stat(local)
+        return self._metadata(local, stat.st_mtime, stat.st_size)
+
+    def files_download_to_file(self, download_path, path, rev=None):
+        shutil.copyfile(self._local_path(path), download_path)
+
+    def files_download(self, path, rev=None):
+        """(metadata, response) like the SDK; response.raw is a file object"""
+        local = self._local_path(path)
+        stat = os.stat(local)
+        raw = open(local, "rb")
+        response = SimpleNamespace(raw=raw, close=raw.close)
+        return self._metadata(local, stat.st_mtime, stat.st_size), response
@@ -6,13 +6,18 @@ from src.catalog.models import (
     KeywordSynonym,
     LLMAnalysis,
 )
+from src.catalog.services.taxonomy_mapper import taxonomy_mapper
 from datetime import datetime
+from sqlalchemy import update
 import logging
 import json
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Documents per payload rebuild query
+PAYLOAD_CHUNK_SIZE = 500
+
 
 class DocumentKeywordManager:
     """Manager for document keywords with improved taxonomy integration"""
@@ -86,52 +91,50 @@ class DocumentKeywordManager:
             # Limit to max_keywords
             top_keywords = valid_keywords[:max_keywords]
 
+            # Resolve all keywords against the taxonomy in one batch
+            matches = taxonomy_mapper.map_keywords(
+                [
+                    {
+                        "term": kw["term"],
+                        "primary_category": kw["primary_category"],
+                        "subcategory": kw["subcategory"],
+                    }
+                    for kw in top_keywords
+                ]
+            )
+
             # Process and store each keyword
             stored_keywords = []
-            for idx, kw in enumerate(top_keywords):
+            for kw, match in zip(top_keywords, matches):
                 try:
-                    # Find or create taxonomy term
-                    taxonomy_term = KeywordTaxonomy.query.filter(
-                        KeywordTaxonomy.term == kw["term"],
-                        KeywordTaxonomy.primary_category == kw["primary_category"],
-                    ).first()
-
-                    # If no exact match, check for similar terms
-                    if not taxonomy_term:
-                        similar_term = KeywordTaxonomy.query.filter(
-                            KeywordTaxonomy.term.ilike(f"%{kw['term']}%"),
-                            KeywordTaxonomy.primary_category == kw["primary_category"],
-                        ).first()
-
-                        if similar_term:
-                            taxonomy_term = similar_term
+                    if match:
+                        taxonomy_id = match["taxonomy_id"]
+                        if match["method"] != "exact":
                             logger.info(
-                                f"Using similar taxonomy term: {similar_term.term}"
-                            )
-                        else:
-                            # Create new term
-                            taxonomy_term = KeywordTaxonomy(
-                                term=kw["term"],
-                                primary_category=kw["primary_category"],
-                                subcategory=kw["subcategory"],
-                                specific_term=kw["term"],
+                                f"Using similar taxonomy term: {match['term']} "
+                                f"(confidence {match['confidence']})"
                             )
-                            db.session.add(taxonomy_term)
-                            db.session.flush()  # Get the ID
-
-                            # Add synonyms if provided
-                            synonyms = kw.get("synonyms", [])
-                            if synonyms:
-                                for syn_text in synonyms:
-                                    if syn_text:
-                                        synonym = KeywordSynonym(
-                                            taxonomy_id=taxonomy_term.id,
-                                            synonym=syn_text,
-                                        )
-                                        db.session.add(synonym)
-
-                    # Create LLMKeyword instance
-                    # LLMKeyword.relevance_score is BigInteger, manager uses float. Cast to int (0-100 assumed).
+                    else:
+                        # Create new term
+                        taxonomy_term = KeywordTaxonomy(
+                            term=kw["term"],
+                            primary_category=kw["primary_category"],
+                            subcategory=kw["subcategory"],
+                        )
+                        db.session.add(taxonomy_term)
+                        db.session.flush()  # Get the ID
+                        taxonomy_id = taxonomy_term.id
+
+                        # Add synonyms if provided
+                        for syn_text in kw.get("synonyms", []):
+                            if syn_text:
+                                db.session.add(
+                                    KeywordSynonym(
+                                        taxonomy_id=taxonomy_id, synonym=syn_text
+                                    )
+                                )
+
+                    # LLMKeyword.relevance_score is stored on a 0-100 scale
                     relevance_score_int = (
                         int(kw["relevance_score"] * 100)
                         if isinstance(kw["relevance_score"], float)
@@ -140,11 +143,9 @@ class DocumentKeywordManager:
 
                     llm_db_keyword = LLMKeyword(
                         llm_analysis_id=llm_analysis_id,
-                        keyword=kw["term"],  # Maps to LLMKeyword.keyword
-                        category=kw["primary_category"],  # Maps to LLMKeyword.category
+                        verbatim_term=kw["term"],
                         relevance_score=relevance_score_int,
-                        taxonomy_id=taxonomy_term.id,
-                        # LLMKeyword does not have extraction_date or display_order from original DocumentKeyword
+                        taxonomy_id=taxonomy_id,
                     )
                     db.session.add(llm_db_keyword)
                     stored_keywords.append(llm_db_keyword)
@@ -155,6 +156,10 @@ class DocumentKeywordManager:
                     )
                     continue
 
+            # Keep the denormalized keyword list in step, same transaction
+            db.session.flush()
+            DocumentKeywordManager.refresh_keyword_payloads([document_id])
+
             # Commit all changes
             db.session.commit()
             logger.info(
@@ -178,11 +183,102 @@ class DocumentKeywordManager:
             db.session.rollback()
             return False
 
+    @staticmethod
+    def build_keyword_payloads(
+        document_ids: List[int],
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Display-ready hierarchical keywords for documents, in one query
+
+        Keywords are listed most relevant first, with relevance_score
+        converted back to 0.0-1.0. Keywords not mapped to the taxonomy are
+        shown by their verbatim term, without an id or categories. Documents
+        without keywords get an empty list.
+
+        Args:
+            document_ids: List of document IDs
+
+        Returns:
+            Dictionary mapping document IDs to their keyword payload
+        """
+        payloads = {doc_id: [] for doc_id in document_ids}
+        if not payloads:
+            return payloads
+
+        rows = (
+            db.session.query(
+                LLMAnalysis.document_id,
+                LLMKeyword.relevance_score,
+                LLMKeyword.verbatim_term,
+                KeywordTaxonomy.id,
+                KeywordTaxonomy.term,
+                KeywordTaxonomy.primary_category,
+                KeywordTaxonomy.subcategory,
+            )
+            .join(LLMKeyword, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
+            .outerjoin(KeywordTaxonomy, LLMKeyword.taxonomy_id == KeywordTaxonomy.id)
+            .filter(LLMAnalysis.document_id.in_(list(payloads)))
+            .order_by(
+                LLMAnalysis.document_id,
+                LLMKeyword.relevance_score.desc(),
+                LLMKeyword.id,
+            )
+        )
+        for row in rows:
+            payloads[row.document_id].append(
+                {
+                    "id": row.id,
+                    # Fall back to the verbatim term for unmapped keywords
+                    "term": row.term if row.id is not None else row.verbatim_term,
+                    "primary_category": row.primary_category,
+                    "subcategory": row.subcategory,
+                    # LLMKeyword.relevance_score is stored on a 0-100 scale
+                    "relevance_score": (
+                        float(row.relevance_score) / 100.0
+                        if row.relevance_score is not None
+                        else 0.0
+                    ),
+                }
+            )
+        return payloads
+
+    @staticmethod
+    def refresh_keyword_payloads(document_ids: List[int]) -> int:
+        """
+        Rebuild Document.keyword_payload for documents, without committing
+
+        Called in the same transaction as the keyword writes, so readers
+        never see keywords and payload disagree. Payloads are built and
+        written with one query and one executemany UPDATE per chunk.
+
+        Args:
+            document_ids: List of document IDs
+
+        Returns:
+            Number of documents updated
+        """
+        ids = sorted(set(document_ids))
+        for i in range(0, len(ids), PAYLOAD_CHUNK_SIZE):
+            payloads = DocumentKeywordManager.build_keyword_payloads(
+                ids[i:i + PAYLOAD_CHUNK_SIZE]
+            )
+            db.session.execute(
+                update(Document),
+                [
+                    {"id": doc_id, "keyword_payload": payload}
+                    for doc_id, payload in payloads.items()
+                ],
+            )
+        return len(ids)
+
     @staticmethod
     def get_document_keywords(document_id: int) -> List[Dict[str, Any]]:
         """
         Get formatted keywords for a document
 
+        Reads the stored keyword payload; documents whose payload has not
+        been built yet fall back to the keyword tables.
+
         Args:
             document_id: The document ID
 
@@ -190,62 +286,20 @@ class DocumentKeywordManager:
             List of formatted keywords for display
         """
         try:
-            llm_analysis = LLMAnalysis.query.filter_by(document_id=document_id).first()
-            if not llm_analysis:
-                logger.warning(
-                    f"No LLMAnalysis found for document_id {document_id} when getting keywords."
-                )
-                return []
-
-            llm_analysis_id = llm_analysis.id
-
-            # Query LLMKeywords with taxonomy join, ordered by relevance_score (desc)
-            # as display_order is not in LLMKeyword
-            keywords_with_taxonomy = (
-                db.session.query(LLMKeyword, KeywordTaxonomy)
-                .join(
-                    KeywordTaxonomy,
-                    LLMKeyword.taxonomy_id == KeywordTaxonomy.id,
-                    isouter=True,  # Use outer join in case taxonomy_id is null
-                )
-                .filter(LLMKeyword.llm_analysis_id == llm_analysis_id)
-                .order_by(LLMKeyword.relevance_score.desc())  # Order by relevance
-                .all()
+            payload = (
+                db.session.query(Document.keyword_payload)
+                .filter(Document.id == document_id)
+                .scalar()
             )
+            if payload is not None:
+                return payload
 
-            # Format for display
-            result = []
-            for llm_kw, taxonomy in keywords_with_taxonomy:
-                # LLMKeyword.relevance_score is BigInteger (0-100), convert back to float (0.0-1.0)
-                relevance_score_float = (
-                    float(llm_kw.relevance_score) / 100.0
-                    if llm_kw.relevance_score is not None
-                    else 0.0
-                )
-
-                term_display = (
-                    taxonomy.term if taxonomy else llm_kw.keyword
-                )  # Fallback to LLMKeyword.keyword if no taxonomy
-                primary_cat_display = (
-                    taxonomy.primary_category if taxonomy else llm_kw.category
-                )  # Fallback
-                subcat_display = taxonomy.subcategory if taxonomy else None
-
-                result.append(
-                    {
-                        "id": taxonomy.id if taxonomy else None,
-                        "term": term_display,
-                        "primary_category": primary_cat_display,
-                        "subcategory": subcat_display,
-                        "relevance_score": relevance_score_float,
-                    }
-                )
-            return result
+            return DocumentKeywordManager.build_keyword_payloads([document_id])[
+                document_id
+            ]
 
         except Exception as e:
-            logger.error(
-                f"Error getting keywords for document {document_id} (LLMAnalysis {llm_analysis_id if 'llm_analysis_id' in locals() else 'N/A'}): {str(e)}"
-            )
+            logger.error(f"Error getting keywords for document {document_id}: {str(e)}")
             return []
 
     @staticmethod
@@ -255,6 +309,9 @@ class DocumentKeywordManager:
         """
         Efficiently get keywords for multiple documents at once
 
+        One query reads the stored payloads; documents without one are
+        built from the keyword tables in one more query.
+
         Args:
             document_ids: List of document IDs
 
@@ -262,65 +319,18 @@ class DocumentKeywordManager:
             Dictionary mapping document IDs to their keywords
         """
         try:
-            # Get llm_analysis_ids for the given document_ids
-            analysis_map = {
-                analysis.document_id: analysis.id
-                for analysis in LLMAnalysis.query.filter(
-                    LLMAnalysis.document_id.in_(document_ids)
-                ).all()
-            }
-
-            llm_analysis_ids = [id for id in analysis_map.values() if id is not None]
-
-            if not llm_analysis_ids:
-                logger.warning(
-                    f"No LLMAnalysis found for document_ids: {document_ids} in get_bulk_document_keywords."
-                )
-                return {doc_id: [] for doc_id in document_ids}
-
-            # Single query to get all LLMKeywords for all relevant analyses
-            keywords_with_taxonomy = (
-                db.session.query(LLMKeyword, KeywordTaxonomy, LLMAnalysis.document_id)
-                .join(LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
-                .join(
-                    KeywordTaxonomy,
-                    LLMKeyword.taxonomy_id == KeywordTaxonomy.id,
-                    isouter=True,  # Outer join for taxonomy
-                )
-                .filter(LLMKeyword.llm_analysis_id.in_(llm_analysis_ids))
-                .order_by(
-                    LLMAnalysis.document_id,
-                    LLMKeyword.relevance_score.desc(),  # Order by relevance
-                )
-                .all()
-            )
-
-            # Organize by document ID
             results = {doc_id: [] for doc_id in document_ids}
-
-            for llm_kw, taxonomy, doc_id_from_query in keywords_with_taxonomy:
-                # LLMKeyword.relevance_score is BigInteger (0-100), convert back to float (0.0-1.0)
-                relevance_score_float = (
-                    float(llm_kw.relevance_score) / 100.0
-                    if llm_kw.relevance_score is not None
-                    else 0.0
-                )
-
-                term_display = taxonomy.term if taxonomy else llm_kw.keyword
-                primary_cat_display = (
-                    taxonomy.primary_category if taxonomy else llm_kw.category
-                )
-                subcat_display = taxonomy.subcategory if taxonomy else None
-
-                results[doc_id_from_query].append(
-                    {
-                        "id": taxonomy.id if taxonomy else None,
-                        "term": term_display,
-                        "primary_category": primary_cat_display,
-                        "subcategory": subcat_display,
-                        "relevance_score": relevance_score_float,
-                    }
-                )
+            missing = []
+            for doc_id, payload in db.session.query(
+                Document.id, Document.keyword_payload
+            ).filter(Document.id.in_(document_ids)):
+                if payload is None:
+                    missing.append(doc_id)
+                else:
+                    results[doc_id] = payload
+
+            if missing:
+                results.update(DocumentKeywordManager.build_keyword_payloads(missing))
             return results
 
         except Exception as e:
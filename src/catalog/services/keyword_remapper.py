@@ -0,0 +1,157 @@
+# src/catalog/services/keyword_remapper.py
+import time
+import logging
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import func, update
+
+from src.catalog import cache, db
+from src.catalog.models import LLMAnalysis, LLMKeyword
+from src.catalog.services.keyword_manager import DocumentKeywordManager
+from src.catalog.services.taxonomy_mapper import taxonomy_mapper
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters per IN list
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _chunks(values: List[Any], size: int = LOOKUP_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class KeywordRemapper:
+    """
+    Re-resolves stored keywords against the current taxonomy, without the LLM.
+
+    After a taxonomy change only the affected LLMKeyword rows are touched:
+    keywords that lost their term, and unmapped keywords whose verbatim
+    term equals a newly added term or synonym (found through the
+    lower(verbatim_term) index). Distinct terms are resolved in one
+    TaxonomyMapper batch and the changed links are written with one
+    executemany UPDATE, the keyword payloads of the affected documents are
+    rebuilt in the same transaction, and the keyword facet caches are
+    then invalidated.
+    """
+
+    @staticmethod
+    def affected_keywords(
+        names: Iterable[str] = (),
+        keyword_ids: Iterable[int] = (),
+        include_unmapped: bool = False,
+    ) -> List[Any]:
+        """(id, verbatim_term, taxonomy_id, document_id) rows to re-resolve"""
+        columns = (
+            LLMKeyword.id,
+            LLMKeyword.verbatim_term,
+            LLMKeyword.taxonomy_id,
+            LLMAnalysis.document_id,
+        )
+
+        def query():
+            return db.session.query(*columns).join(
+                LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id
+            )
+
+        rows = {}
+        if include_unmapped:
+            for row in query().filter(LLMKeyword.taxonomy_id.is_(None)):
+                rows[row.id] = row
+        else:
+            lowered = sorted({name.strip().lower() for name in names if name.strip()})
+            for chunk in _chunks(lowered):
+                for row in query().filter(
+                    func.lower(LLMKeyword.verbatim_term).in_(chunk),
+                    LLMKeyword.taxonomy_id.is_(None),
+                ):
+                    rows[row.id] = row
+
+        for chunk in _chunks(sorted(set(keyword_ids))):
+            for row in query().filter(LLMKeyword.id.in_(chunk)):
+                rows[row.id] = row
+
+        return list(rows.values())
+
+    @staticmethod
+    def invalidate_facets():
+        """Drop memoized keyword facets"""
+        try:
+            from src.catalog.services.search_service import SearchService
+            from src.catalog.web import main_routes
+
+            cache.delete_memoized(SearchService.generate_taxonomy_facets)
+            cache.delete_memoized(main_routes.generate_taxonomy_facets)
+        except Exception as e:
+            logger.warning(f"Could not invalidate keyword facet caches: {str(e)}")
+
+    @classmethod
+    def remap(
+        cls,
+        names: Iterable[str] = (),
+        keyword_ids: Iterable[int] = (),
+        include_unmapped: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Re-resolve the keywords affected by a taxonomy change.
+
+        Args:
+            names: Terms and synonyms added to the taxonomy
+            keyword_ids: Keywords whose taxonomy term was removed
+            include_unmapped: Re-resolve every unmapped keyword instead of
+                only those matching names exactly
+
+        Returns:
+            Counts of candidate, remapped and still-unmapped keywords and of
+            affected documents
+        """
+        start_time = time.perf_counter()
+        keyword_ids = list(keyword_ids)
+        rows = cls.affected_keywords(names, keyword_ids, include_unmapped)
+        if not rows:
+            return {"candidates": 0, "remapped": 0, "unmapped": 0, "documents": 0}
+
+        # Each distinct term is resolved once, in one batch
+        taxonomy_mapper.invalidate()
+        terms = sorted({row.verbatim_term for row in rows})
+        matches = taxonomy_mapper.map_keywords(
+            [{"term": term.lower()} for term in terms]
+        )
+        resolved = {
+            term: match["taxonomy_id"] if match else None
+            for term, match in zip(terms, matches)
+        }
+
+        changes = [
+            {"id": row.id, "taxonomy_id": resolved[row.verbatim_term]}
+            for row in rows
+            if resolved[row.verbatim_term] != row.taxonomy_id
+        ]
+        # Keywords that lost their term change the payload even when they
+        # stay unmapped
+        changed_ids = {change["id"] for change in changes} | set(keyword_ids)
+        documents = sorted(
+            {row.document_id for row in rows if row.id in changed_ids}
+        )
+
+        try:
+            if changes:
+                db.session.execute(update(LLMKeyword), changes)
+            DocumentKeywordManager.refresh_keyword_payloads(documents)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        cls.invalidate_facets()
+
+        result = {
+            "candidates": len(rows),
+            "remapped": sum(1 for change in changes if change["taxonomy_id"]),
+            "unmapped": sum(1 for row in rows if not resolved[row.verbatim_term]),
+            "documents": len(documents),
+        }
+        logger.info(
+            f"Remapped keywords in {time.perf_counter() - start_time:.2f}s: {result}"
+        )
+        return result
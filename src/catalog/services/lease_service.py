@@ -0,0 +1,180 @@
+# src/catalog/services/lease_service.py
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES, LEASE_SETTINGS
+from src.catalog.models import Document
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentLease:
+    """
+    Time-bounded ownership of a document by one pipeline run.
+
+    A run claims the document with a single conditional UPDATE ... RETURNING
+    (only free or expired leases can be claimed), keeps it alive with
+    heartbeats while a stage executes, and releases it when done. Anything
+    whose lease expires is re-queued by the sweeper, so a dead worker is
+    noticed within RUNNING_SECONDS instead of after a fixed number of hours,
+    and a live one is never picked up twice.
+    """
+
+    @staticmethod
+    def new_owner() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _expiry(seconds: int) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=seconds)
+
+    @staticmethod
+    def claim(
+        document_id: int, owner: str, seconds: Optional[int] = None
+    ) -> bool:
+        """Take the lease if it is free or expired"""
+        now = datetime.utcnow()
+        stmt = (
+            update(Document)
+            .where(
+                Document.id == document_id,
+                or_(Document.lease_expires.is_(None), Document.lease_expires < now),
+            )
+            .values(
+                lease_owner=owner,
+                lease_expires=DocumentLease._expiry(
+                    seconds or LEASE_SETTINGS["HANDOFF_SECONDS"]
+                ),
+            )
+            .returning(Document.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = db.session.execute(stmt).first() is not None
+        db.session.commit()
+        return claimed
+
+    @staticmethod
+    def _renew_stmt(document_id: int, owner: str, seconds: int):
+        return (
+            update(Document)
+            .where(Document.id == document_id, Document.lease_owner == owner)
+            .values(lease_expires=DocumentLease._expiry(seconds))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def renew(document_id: int, owner: str, seconds: Optional[int] = None) -> bool:
+        """Extend a lease this owner still holds; False if it was lost"""
+        result = db.session.execute(
+            DocumentLease._renew_stmt(
+                document_id, owner, seconds or LEASE_SETTINGS["RUNNING_SECONDS"]
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def release(document_id: int, owner: str):
+        """Give up the lease (no-op if another owner has it)"""
+        db.session.execute(
+            update(Document)
+            .where(Document.id == document_id, Document.lease_owner == owner)
+            .values(lease_owner=None, lease_expires=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    @contextmanager
+    def heartbeat(document_id: int, owner: str):
+        """
+        Renew the lease in the background while a long stage runs.
+
+        Yields an Event that is set if the lease was lost, so the caller can
+        discard its work instead of racing the run that took over.
+        """
+        engine = db.engine
+        interval = LEASE_SETTINGS["HEARTBEAT_SECONDS"]
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    with engine.begin() as connection:
+                        result = connection.execute(
+                            DocumentLease._renew_stmt(
+                                document_id, owner, LEASE_SETTINGS["RUNNING_SECONDS"]
+                            )
+                        )
+                    if result.rowcount != 1:
+                        logger.warning(f"Lost lease on document {document_id}")
+                        lost.set()
+                        return
+                except Exception as e:
+                    logger.error(f"Heartbeat failed for document {document_id}: {e}")
+
+        thread = threading.Thread(
+            target=beat, name=f"lease-heartbeat-{document_id}", daemon=True
+        )
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join(timeout=interval)
+
+    @staticmethod
+    def expired_query(now: Optional[datetime] = None):
+        """Documents in flight whose lease has run out"""
+        now = now or datetime.utcnow()
+        return Document.query.filter(
+            Document.status.in_(
+                [DOCUMENT_STATUSES["PENDING"], DOCUMENT_STATUSES["PROCESSING"]]
+            ),
+            Document.lease_expires < now,
+        )
+
+    @staticmethod
+    def sweep_expired(
+        owner: str, limit: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Re-claim expired leases for owner in one UPDATE and return the
+        (id, filename) pairs that need to be re-queued.
+
+        The new lease only lasts RECOVERY_SECONDS, so documents the caller
+        fails to re-queue (it dies, or a dispatch raises) expire again and
+        are picked up by a later sweep.
+        """
+        now = datetime.utcnow()
+        expired_ids = (
+            select(Document.id)
+            .where(
+                Document.status.in_(
+                    [DOCUMENT_STATUSES["PENDING"], DOCUMENT_STATUSES["PROCESSING"]]
+                ),
+                Document.lease_expires < now,
+            )
+            .limit(limit or LEASE_SETTINGS["SWEEP_BATCH_SIZE"])
+        )
+        stmt = (
+            update(Document)
+            .where(Document.id.in_(expired_ids), Document.lease_expires < now)
+            .values(
+                lease_owner=owner,
+                lease_expires=DocumentLease._expiry(LEASE_SETTINGS["RECOVERY_SECONDS"]),
+            )
+            .returning(Document.id, Document.filename)
+            .execution_options(synchronize_session=False)
+        )
+        rows = [(row.id, row.filename) for row in db.session.execute(stmt)]
+        db.session.commit()
+        return rows
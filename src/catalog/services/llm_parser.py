@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 from datetime import datetime
 import logging
@@ -58,6 +58,28 @@ class LLMResponseParser:
 
         return str(value)
 
+    @staticmethod
+    def parse_component(component: str, value: Any) -> Optional[Dict[str, Any]]:
+        """
+        Parse a single top-level component as soon as it is available.
+        Returns None for components that need database context
+        (keywords) or that have no parser.
+        """
+        parsers = {
+            "document_analysis": LLMResponseParser.parse_llm_analysis,
+            "extracted_text": LLMResponseParser.parse_extracted_text,
+            "classification": LLMResponseParser.parse_classification,
+            "design_elements": LLMResponseParser.parse_design_elements,
+            "entities": LLMResponseParser.parse_entity_info,
+            "communication_focus": LLMResponseParser.parse_communication_focus,
+        }
+
+        parser = parsers.get(component)
+        if not parser:
+            return None
+
+        return parser({component: value})
+
     @staticmethod
     def parse_llm_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse and validate basic LLM analysis data"""
@@ -6,9 +6,11 @@ import time
 import base64
 from typing import Dict, Any, List, Optional
 from src.catalog.services.prompt_manager import PromptManager
+from src.catalog.services.json_extractor import IncrementalJSONExtractor, extract_json
 import logging
 import traceback
-from src.catalog.constants import MODEL_SETTINGS, ERROR_MESSAGES
+from src.catalog.constants import MODEL_SETTINGS, ERROR_MESSAGES, RENDER_SETTINGS
+from src.catalog.services.pdf_renderer import get_renderer
 
 logger = logging.getLogger(__name__)
 
@@ -32,107 +34,52 @@ class LLMService:
         self.model = os.getenv("CLAUDE_MODEL", MODEL_SETTINGS["CLAUDE"]["MODEL"])
         logger.info(f"Using Claude model: {self.model}")
 
+        # Stream responses and parse them incrementally unless disabled
+        self.streaming = os.getenv(
+            "CLAUDE_STREAMING", str(MODEL_SETTINGS["CLAUDE"]["STREAMING"])
+        ).lower() in ["true", "1", "yes"]
+
         # Initialize prompt manager
         self.prompt_manager = PromptManager()
 
-    def _get_file_data(self, filename: str) -> dict:
-        """Get file data and path from storage if available"""
-        try:
-            from src.catalog.services.storage_service import MinIOStorage
-
-            storage = MinIOStorage()
-
-            # Check if file exists in storage
-            logger.info(f"Retrieving file from MinIO: {filename}")
-            temp_path = f"/tmp/{filename}"
-
-            # Get file from MinIO and save to temp path
-            try:
-                file_data = storage.get_file(filename)
-                if file_data:
-                    with open(temp_path, "wb") as f:
-                        f.write(file_data)
-                    logger.info(f"File retrieved and saved to {temp_path}")
-                    return {"path": temp_path, "exists": True}
-            except Exception as e:
-                logger.error(f"Failed to retrieve file from MinIO: {str(e)}")
-
-            return {"path": None, "exists": False}
-        except Exception as e:
-            logger.error(f"Error getting file data: {str(e)}")
-            return {"path": None, "exists": False}
-
-    def analyze_document(
-        self, filename: str, document_path: Optional[str] = None
-    ) -> Dict[Any, Any]:
+    def analyze_component(
+        self,
+        component: str,
+        filename: str,
+        image_data: Optional[Dict[str, str]] = None,
+        metadata: Optional[Dict] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
-        Synchronous analysis with a unified prompt for core components.
+        Run a single analysis prompt.
 
         Args:
+            component: "unified" or one of the component prompts
+                (text, design, keywords, communication, ...)
             filename: Document filename
-            document_path: Path to document file (optional)
+            image_data: Prepared image data (see encode_image_bytes)
+            metadata: Prior document_analysis used as prompt context (optional)
 
         Returns:
-            Combined analysis results
+            Parsed JSON response, or None
         """
-        logger.info(f"Starting unified analysis for {filename}")
-
-        if not document_path:
-            file_info = self._get_file_data(filename)
-            if file_info and file_info.get("exists"):
-                document_path = file_info.get("path")
-                logger.info(f"Using document path from storage: {document_path}")
-
-        image_data = self._prepare_image_data(document_path)
-        if not image_data:
-            logger.warning(f"Could not prepare image data for {filename}")
-
-        results = {}
-        try:
-            # Use the unified prompt for metadata, classification, and entities
+        if component == "unified":
             prompt = self.prompt_manager.get_unified_analysis_prompt(filename)
-            unified_result = self._call_claude_api_sync(
-                prompt, image_data, max_retries=3
-            )
-
-            if unified_result:
-                results.update(unified_result)
-                logger.info(
-                    f"Successfully processed unified components: {list(unified_result.keys())}"
-                )
-            else:
-                logger.warning("Unified analysis returned no result.")
-
-            # Sequentially process other components that are not in the unified prompt
-            metadata = results.get("document_analysis")
-            other_components = ["text", "design", "keywords", "communication"]
-            for component in other_components:
-                try:
-                    prompt = self._get_component_prompt(component, filename, metadata)
-                    if not prompt:
-                        logger.warning(f"No prompt for component: {component}")
-                        continue
+        else:
+            prompt = self._get_component_prompt(component, filename, metadata)
 
-                    component_result = self._call_claude_api_sync(
-                        prompt, image_data, max_retries=3
-                    )
-                    if component_result:
-                        results.update(component_result)
-                        logger.info(f"Successfully processed component: {component}")
-                    else:
-                        logger.warning(f"No result for component: {component}")
-                except Exception as e:
-                    logger.error(
-                        f"Error processing component {component}: {str(e)}",
-                        exc_info=True,
-                    )
+        if not prompt:
+            logger.warning(f"No prompt for component: {component}")
+            return None
 
-        except Exception as e:
-            logger.error(
-                f"Error during unified analysis for {filename}: {str(e)}", exc_info=True
-            )
+        return self._call_claude_api_sync(prompt, image_data, max_retries=3)
 
-        return results
+    @staticmethod
+    def encode_image_bytes(data: bytes, media_type: str) -> Dict[str, str]:
+        """Prepare in-memory image bytes for API calls"""
+        return {
+            "base64": base64.b64encode(data).decode("utf-8"),
+            "media_type": media_type,
+        }
 
     def _prepare_image_data(
         self, document_path: Optional[str]
@@ -155,17 +102,17 @@ class LLMService:
             # Handle PDF files - convert first page to image
             elif file_ext == ".pdf":
                 try:
-                    from pdf2image import convert_from_path
-
                     logger.info(
                         f"Converting first page of PDF to image: {document_path}"
                     )
-                    images = convert_from_path(document_path, first_page=1, last_page=1)
+                    page = get_renderer().render_first_page(
+                        document_path, dpi=RENDER_SETTINGS["RASTER_DPI"]
+                    )
 
-                    if images:
+                    if page is not None:
                         # Save first page as temporary image
                         temp_image_path = f"{document_path}_page1.jpg"
-                        images[0].save(temp_image_path, "JPEG")
+                        page.save(temp_image_path, "JPEG")
                         logger.info(f"PDF first page converted to: {temp_image_path}")
 
                         # Encode the converted image
@@ -239,180 +186,184 @@ class LLMService:
 
         return None
 
+    def _build_request_payload(self, prompt, image_data=None) -> Dict[str, Any]:
+        """Build the Messages API payload for a prompt and optional image"""
+        request_payload = {
+            "model": self.model,
+            "max_tokens": MODEL_SETTINGS["CLAUDE"]["MAX_TOKENS"],
+            "temperature": 0,
+            "messages": [],
+        }
+
+        # Handle system message properly as a top-level parameter
+        if isinstance(prompt, dict) and "system" in prompt:
+            request_payload["system"] = prompt["system"]
+            logger.info(f"Using system prompt: {prompt['system'][:100]}...")
+
+        # Add user message with optional image
+        user_content = []
+
+        # Handle different prompt formats
+        if isinstance(prompt, dict) and "user" in prompt:
+            user_text = prompt["user"]
+            logger.info(f"Using user prompt: {user_text[:100]}...")
+        elif isinstance(prompt, str):
+            user_text = prompt
+            logger.info(f"Using string prompt: {user_text[:100]}...")
+        else:
+            user_text = str(prompt)
+            logger.info(f"Using converted prompt: {user_text[:100]}...")
+
+        user_content.append({"type": "text", "text": user_text})
+
+        # Add image if available
+        if image_data and isinstance(image_data, dict) and "base64" in image_data:
+            logger.info("Adding image data to request")
+            user_content.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": image_data.get("media_type", "image/jpeg"),
+                        "data": image_data["base64"],
+                    },
+                }
+            )
+
+        # Add user message to the messages array
+        request_payload["messages"].append({"role": "user", "content": user_content})
+        return request_payload
+
+    def _raise_for_api_error(self, response):
+        """Raise with the API error message if the response is not a 200"""
+        if response.status_code == 200:
+            return
+
+        error_detail = "No details available"
+        try:
+            error_json = response.json()
+            error_detail = error_json.get("error", {}).get(
+                "message", "No details available"
+            )
+        except:
+            pass
+        logger.error(f"API returned {response.status_code}: {error_detail}")
+        raise Exception(f"API error: {response.status_code} - {error_detail}")
+
+    @staticmethod
+    def _log_usage(usage: Optional[Dict[str, Any]]):
+        """Log the input and output token counts the API billed for a request"""
+        if usage:
+            logger.info(
+                f"Claude usage: {usage.get('input_tokens')} input tokens, "
+                f"{usage.get('output_tokens')} output tokens"
+            )
+
+    def _stream_claude_response(
+        self, client, request_payload
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Consume the SSE stream and feed text deltas to the incremental
+        extractor, which repairs a truncated tail when the stream ends.
+        """
+        extractor = IncrementalJSONExtractor()
+        request_payload = dict(request_payload, stream=True)
+        # message_start carries the input tokens and a placeholder output
+        # count; the final output count arrives with message_delta
+        usage = {}
+
+        with client.stream(
+            "POST",
+            "https://api.anthropic.com/v1/messages",
+            headers=self.headers,
+            json=request_payload,
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                self._raise_for_api_error(response)
+
+            for line in response.iter_lines():
+                if not line or not line.startswith("data:"):
+                    continue
+
+                try:
+                    event = json.loads(line[len("data:") :].strip())
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed SSE event: {line[:100]}")
+                    continue
+
+                event_type = event.get("type")
+                if event_type == "message_start":
+                    usage.update(event.get("message", {}).get("usage") or {})
+                elif event_type == "content_block_delta":
+                    delta = event.get("delta", {})
+                    if delta.get("type") == "text_delta":
+                        extractor.feed(delta.get("text", ""))
+                elif event_type == "message_delta":
+                    usage.update(event.get("usage") or {})
+                    stop_reason = event.get("delta", {}).get("stop_reason")
+                    if stop_reason == "max_tokens":
+                        logger.warning("Claude stream hit max_tokens, repairing tail")
+                elif event_type == "error":
+                    error = event.get("error", {})
+                    raise Exception(f"Stream error: {error.get('message', error)}")
+                elif event_type == "message_stop":
+                    break
+
+        self._log_usage(usage)
+        return extractor.finish()
+
     def _call_claude_api_sync(self, prompt, image_data=None, max_retries=3):
-        """Synchronous wrapper for Claude API calls with correct message formatting"""
+        """
+        Synchronous Claude API call. In streaming mode the response is parsed
+        incrementally as it arrives.
+        """
         retry_count = 0
         last_error = None
+        request_payload = self._build_request_payload(prompt, image_data)
 
         while retry_count < max_retries:
             try:
                 # Create client with timeout
                 with httpx.Client(timeout=60.0) as client:
-                    # Prepare request payload
-                    request_payload = {
-                        "model": self.model,
-                        "max_tokens": 4096,
-                        "temperature": 0,
-                        "messages": [],
-                    }
-
-                    # Handle system message properly as a top-level parameter
-                    if isinstance(prompt, dict) and "system" in prompt:
-                        request_payload["system"] = prompt["system"]
-                        logger.info(f"Using system prompt: {prompt['system'][:100]}...")
-
-                    # Add user message with optional image
-                    user_content = []
-
-                    # Handle different prompt formats
-                    if isinstance(prompt, dict) and "user" in prompt:
-                        user_text = prompt["user"]
-                        logger.info(f"Using user prompt: {user_text[:100]}...")
-                    elif isinstance(prompt, str):
-                        user_text = prompt
-                        logger.info(f"Using string prompt: {user_text[:100]}...")
+                    logger.info(f"Sending request to Claude API for {self.model}")
+
+                    if self.streaming:
+                        result = self._stream_claude_response(client, request_payload)
                     else:
-                        user_text = str(prompt)
-                        logger.info(f"Using converted prompt: {user_text[:100]}...")
-
-                    user_content.append({"type": "text", "text": user_text})
-
-                    # Add image if available
-                    if (
-                        image_data
-                        and isinstance(image_data, dict)
-                        and "base64" in image_data
-                    ):
-                        logger.info("Adding image data to request")
-                        user_content.append(
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": image_data.get(
-                                        "media_type", "image/jpeg"
-                                    ),
-                                    "data": image_data["base64"],
-                                },
-                            }
+                        response = client.post(
+                            "https://api.anthropic.com/v1/messages",
+                            headers=self.headers,
+                            json=request_payload,
                         )
+                        self._raise_for_api_error(response)
 
-                    # Add user message to the messages array
-                    request_payload["messages"].append(
-                        {"role": "user", "content": user_content}
-                    )
+                        # Process response
+                        data = response.json()
+                        logger.info(f"Received response with keys: {list(data.keys())}")
+                        self._log_usage(data.get("usage"))
 
-                    # Make request
-                    logger.info(f"Sending request to Claude API for {self.model}")
-                    response = client.post(
-                        "https://api.anthropic.com/v1/messages",
-                        headers=self.headers,
-                        json=request_payload,
-                    )
+                        message_text = ""
+                        for block in data.get("content", []):
+                            if block.get("type") == "text":
+                                message_text += block.get("text", "")
 
-                    # If error response, try to get more details
-                    if response.status_code != 200:
-                        error_detail = "No details available"
-                        try:
-                            error_json = response.json()
-                            error_detail = error_json.get("error", {}).get(
-                                "message", "No details available"
-                            )
-                        except:
-                            pass
-                        logger.error(
-                            f"API returned {response.status_code}: {error_detail}"
-                        )
-                        raise Exception(
-                            f"API error: {response.status_code} - {error_detail}"
-                        )
+                        if not message_text:
+                            logger.warning("Received empty response from Claude")
 
-                    # Process response
-                    data = response.json()
-                    logger.info(f"Received response with keys: {list(data.keys())}")
-
-                    # Process response content
-                    content = data.get("content", [])
-                    message_text = ""
-                    for block in content:
-                        if block.get("type") == "text":
-                            message_text += block.get("text", "")
-
-                    # Log response summary for debugging
-                    if message_text:
-                        preview = (
-                            message_text[:200] + "..."
-                            if len(message_text) > 200
-                            else message_text
-                        )
+                        result = extract_json(message_text)
+
+                    if result:
                         logger.info(
-                            f"Received response from Claude (preview): {preview}"
+                            f"Successfully extracted JSON with keys: {list(result.keys())}"
                         )
-                    else:
-                        logger.warning("Received empty response from Claude")
-
-                    # Extract JSON
-                    try:
-                        # Try to find valid JSON in the response
-                        json_matches = []
+                        return result
 
-                        # Look for JSON within the entire text first
-                        try:
-                            result = json.loads(message_text)
-                            logger.info(
-                                f"Successfully parsed full response as JSON with keys: {list(result.keys())}"
-                            )
-                            return result
-                        except json.JSONDecodeError as e:
-                            logger.warning(
-                                f"Could not parse full response as JSON: {str(e)}"
-                            )
-                            # Not valid JSON, continue with partial extraction
-                            pass
-
-                        # Find all potential JSON objects
-                        depth = 0
-                        start_idx = None
-
-                        for i, char in enumerate(message_text):
-                            if char == "{" and start_idx is None:
-                                start_idx = i
-                                depth = 1
-                            elif char == "{" and start_idx is not None:
-                                depth += 1
-                            elif char == "}" and start_idx is not None:
-                                depth -= 1
-                                if depth == 0:
-                                    json_candidate = message_text[start_idx : i + 1]
-                                    try:
-                                        json_obj = json.loads(json_candidate)
-                                        json_matches.append(json_obj)
-                                        logger.info(
-                                            f"Found valid JSON object with keys: {list(json_obj.keys())}"
-                                        )
-                                    except:
-                                        pass
-                                    start_idx = None
-
-                        # If we found any valid JSON objects
-                        if json_matches:
-                            # Return the first valid match
-                            logger.info(
-                                f"Returning first valid JSON match with keys: {list(json_matches[0].keys())}"
-                            )
-                            return json_matches[0]
-
-                        # If we get here, no valid JSON was found
-                        logger.error("No valid JSON found in response")
-                        retry_count += 1
-                        time.sleep(2)
-                        continue
-
-                    except Exception as e:
-                        logger.error(f"Error extracting JSON: {str(e)}")
-                        retry_count += 1
-                        time.sleep(2)
-                        continue
+                    # If we get here, no valid JSON was found
+                    logger.error("No valid JSON found in response")
+                    retry_count += 1
+                    time.sleep(2)
+                    continue
 
             except httpx.HTTPStatusError as e:
                 logger.error(f"API call error: {str(e)}")
@@ -0,0 +1,232 @@
+# src/catalog/services/object_cache.py
+import os
+import re
+import time
+import fcntl
+import socket
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from src.catalog.constants import OBJECT_CACHE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "object_cache:"
+CONTENT_KEY_PATTERN = re.compile(r"^content/[0-9a-f]{2}/([0-9a-f]{64})")
+LOCK_SUFFIX = ".lock"
+TEMP_PREFIX = ".tmp-"
+
+
+class ObjectDiskCache:
+    """
+    Size-bounded LRU cache of storage objects on local disk.
+
+    Entries are named by content hash: the sha256 embedded in content/ keys,
+    or for legacy keys a hash of the key and its ETag, so a replaced object
+    never serves stale bytes. Entries are written to a temp file and
+    renamed into place, so readers only ever see complete files; a per-entry
+    flock makes concurrent workers on the node wait for one download instead
+    of each fetching the object. Recency is the entry's mtime, bumped on
+    every hit, and the oldest entries are evicted once the cache grows past
+    MAX_BYTES.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: Optional[int] = None
+    ):
+        self.directory = directory or os.getenv(
+            "OBJECT_CACHE_DIR", OBJECT_CACHE_SETTINGS["DIR"]
+        )
+        if max_bytes is None:
+            max_bytes = int(
+                os.getenv("OBJECT_CACHE_MAX_BYTES", OBJECT_CACHE_SETTINGS["MAX_BYTES"])
+            )
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        if self.enabled:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError as e:
+                logger.warning(
+                    f"Object cache disabled, cannot create {self.directory}: {str(e)}"
+                )
+                self.enabled = False
+
+    @staticmethod
+    def is_content_addressed(object_name: str) -> bool:
+        return CONTENT_KEY_PATTERN.match(object_name) is not None
+
+    @staticmethod
+    def cache_key(object_name: str, etag: Optional[str] = None) -> str:
+        """Content hash naming the entry for an object"""
+        match = CONTENT_KEY_PATTERN.match(object_name)
+        if match:
+            return match.group(1)
+        return hashlib.sha256(f"{object_name}:{etag or ''}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    @staticmethod
+    @contextmanager
+    def _flock(path: str, blocking: bool = True):
+        """Exclusive flock on path; yields False if non-blocking and held"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _open_entry(self, path: str):
+        """Open an entry and mark it recently used, or None if absent"""
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return handle
+
+    def open(self, key: str, fill: Callable[[Any], int]):
+        """
+        Open the entry for key, filling it on a miss.
+
+        fill(file) writes the object into the given file and returns the
+        number of bytes written. The returned handle stays valid even if
+        the entry is evicted while it is being read.
+        """
+        path = self._path(key)
+        handle = self._open_entry(path)
+        if handle is not None:
+            self._record("hits", os.fstat(handle.fileno()).st_size)
+            return handle
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._flock(path + LOCK_SUFFIX):
+            # Another process may have filled it while we waited
+            handle = self._open_entry(path)
+            if handle is not None:
+                self._record("hits", os.fstat(handle.fileno()).st_size)
+                return handle
+
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path), prefix=TEMP_PREFIX
+            )
+            try:
+                with os.fdopen(fd, "wb") as destination:
+                    size = fill(destination)
+                os.replace(temp_path, path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            handle = open(path, "rb")
+
+        self._record("misses", size)
+        self.evict()
+        return handle
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache is under
+        LOW_WATERMARK * MAX_BYTES. Skipped if another process is already
+        evicting. Returns the number of entries removed.
+        """
+        if not self.enabled:
+            return 0
+
+        evict_lock = os.path.join(self.directory, ".evict" + LOCK_SUFFIX)
+        with self._flock(evict_lock, blocking=False) as locked:
+            if not locked:
+                return 0
+
+            entries, total = [], 0
+            stale_before = time.time() - OBJECT_CACHE_SETTINGS["STALE_TEMP_SECONDS"]
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(LOCK_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.startswith(TEMP_PREFIX):
+                        if stat.st_mtime < stale_before:
+                            self._remove(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * OBJECT_CACHE_SETTINGS["LOW_WATERMARK"])
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._remove(path)
+                self._remove(path + LOCK_SUFFIX)
+                total -= size
+                removed += 1
+
+        self._record("evictions", count=removed)
+        logger.info(f"Object cache evicted {removed} entries, {total} bytes remain")
+        return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _record(event: str, size: int = 0, count: int = 1):
+        """Count a cache event in this node's Redis hash"""
+        from src.catalog.utils.stage_metrics import redis_client
+
+        try:
+            pipe = redis_client().pipeline()
+            key = METRICS_KEY_PREFIX + socket.gethostname()
+            pipe.hincrby(key, event, count)
+            if size:
+                pipe.hincrby(key, f"{event}_bytes", size)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Could not record object cache {event}: {str(e)}")
+
+    @staticmethod
+    def get_stats() -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters and hit rate per node"""
+        from src.catalog.utils.stage_metrics import redis_client
+
+        stats = {}
+        try:
+            client = redis_client()
+            for key in client.scan_iter(match=METRICS_KEY_PREFIX + "*"):
+                raw = client.hgetall(key)
+                node = {k.decode(): int(v) for k, v in raw.items()}
+                hits, misses = node.get("hits", 0), node.get("misses", 0)
+                lookups = hits + misses
+                node["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+                stats[key.decode()[len(METRICS_KEY_PREFIX):]] = node
+        except Exception as e:
+            logger.warning(f"Could not read object cache stats: {str(e)}")
+        return stats
@@ -0,0 +1,179 @@
+# src/catalog/services/pdf_renderer.py
+import os
+import logging
+from typing import Dict, Iterable, Optional
+
+from PIL import Image
+
+from src.catalog.constants import RENDER_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_INCH = 72
+
+
+class PopplerRenderer:
+    """pdf2image / pdftoppm: one subprocess per call"""
+
+    name = "poppler"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import pdf2image  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def render_first_page(
+        self, pdf_path: str, width: Optional[int] = None, dpi: Optional[int] = None
+    ) -> Image.Image:
+        from pdf2image import convert_from_path
+
+        options = {"size": (width, None)} if width else {"dpi": dpi or 200}
+        images = convert_from_path(
+            pdf_path,
+            first_page=1,
+            last_page=1,
+            poppler_path=RENDER_SETTINGS["POPPLER_PATH"],
+            timeout=RENDER_SETTINGS["POPPLER_TIMEOUT"],
+            **options,
+        )
+        if not images:
+            raise ValueError(f"poppler rendered no pages from {pdf_path}")
+        return images[0]
+
+    def render_first_page_widths(
+        self, pdf_path: str, widths: Iterable[int]
+    ) -> Dict[int, Image.Image]:
+        # One pdftoppm run at the largest width; smaller sizes are downscaled
+        widths = sorted(set(widths), reverse=True)
+        image = self.render_first_page(pdf_path, width=widths[0])
+        return downscaled(image, widths)
+
+
+class PyMuPDFRenderer:
+    """
+    PyMuPDF (fitz): renders in-process, straight to the requested size.
+
+    The page is rasterized once per target width from the open document,
+    so each thumbnail is drawn at its own resolution rather than resampled.
+    """
+
+    name = "pymupdf"
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import fitz  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _to_image(page, zoom: float) -> Image.Image:
+        import fitz
+
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    def render_first_page(
+        self, pdf_path: str, width: Optional[int] = None, dpi: Optional[int] = None
+    ) -> Image.Image:
+        import fitz
+
+        with fitz.open(pdf_path) as document:
+            page = document.load_page(0)
+            if width:
+                zoom = width / page.rect.width
+            else:
+                zoom = (dpi or 200) / POINTS_PER_INCH
+            return self._to_image(page, zoom)
+
+    def render_first_page_widths(
+        self, pdf_path: str, widths: Iterable[int]
+    ) -> Dict[int, Image.Image]:
+        import fitz
+
+        with fitz.open(pdf_path) as document:
+            page = document.load_page(0)
+            return {
+                width: self._to_image(page, width / page.rect.width)
+                for width in sorted(set(widths), reverse=True)
+            }
+
+
+BACKENDS = {
+    PopplerRenderer.name: PopplerRenderer,
+    PyMuPDFRenderer.name: PyMuPDFRenderer,
+}
+
+
+def downscaled(image: Image.Image, widths: Iterable[int]) -> Dict[int, Image.Image]:
+    """Image reduced to each width (largest first), preserving aspect ratio"""
+    variants = {}
+    for width in sorted(set(widths), reverse=True):
+        image = image.copy()
+        image.thumbnail((width, width * 10), Image.LANCZOS)
+        variants[width] = image
+    return variants
+
+
+class PdfRenderer:
+    """
+    First-page rasterizer with a primary backend and a fallback.
+
+    The primary backend (RENDER_SETTINGS["BACKEND"], overridable with the
+    PDF_RENDER_BACKEND env var) handles every file; the fallback only runs
+    when the primary raises, e.g. on a PDF that PyMuPDF cannot parse.
+    """
+
+    def __init__(
+        self, backend: Optional[str] = None, fallback: Optional[str] = None
+    ):
+        backend = backend or os.getenv(
+            "PDF_RENDER_BACKEND", RENDER_SETTINGS["BACKEND"]
+        )
+        fallback = fallback or RENDER_SETTINGS["FALLBACK"]
+
+        if not BACKENDS[backend].available():
+            logger.warning(f"PDF backend {backend} is not installed; using {fallback}")
+            backend = fallback
+
+        self.primary = BACKENDS[backend]()
+        self.fallback = BACKENDS[fallback]() if fallback != backend else None
+
+    def _run(self, method: str, pdf_path: str, *args, **kwargs):
+        try:
+            return getattr(self.primary, method)(pdf_path, *args, **kwargs)
+        except Exception as e:
+            if not self.fallback:
+                raise
+            logger.warning(
+                f"{self.primary.name} failed to render {pdf_path} ({str(e)}); "
+                f"falling back to {self.fallback.name}"
+            )
+            return getattr(self.fallback, method)(pdf_path, *args, **kwargs)
+
+    def render_first_page(
+        self, pdf_path: str, width: Optional[int] = None, dpi: Optional[int] = None
+    ) -> Image.Image:
+        """First page at a target width, or at dpi if no width is given"""
+        return self._run("render_first_page", pdf_path, width=width, dpi=dpi)
+
+    def render_first_page_widths(
+        self, pdf_path: str, widths: Iterable[int]
+    ) -> Dict[int, Image.Image]:
+        """First page at each of several widths, from one open document"""
+        return self._run("render_first_page_widths", pdf_path, list(widths))
+
+
+_renderer = None
+
+
+def get_renderer() -> PdfRenderer:
+    """Process-wide renderer with the configured backends"""
+    global _renderer
+    if _renderer is None:
+        _renderer = PdfRenderer()
+    return _renderer
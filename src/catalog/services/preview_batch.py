@@ -0,0 +1,230 @@
+# src/catalog/services/preview_batch.py
+import io
+import os
+import hashlib
+import logging
+import multiprocessing
+import tempfile
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import update
+
+from src.catalog import db
+from src.catalog.constants import PREVIEW_SETTINGS, STORAGE_SETTINGS
+from src.catalog.models import Document
+from src.catalog.services.storage_service import MinIOStorage, copy_stream
+
+logger = logging.getLogger(__name__)
+
+
+def render_variants(
+    path: str, content_sha256: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Render and encode every preview variant of one local file.
+
+    Runs in a pool process, so it takes and returns only picklable values:
+    {"sha256", "variants": [(key, bytes, mimetype)]}.
+    """
+    from PIL import Image
+
+    from src.catalog.services.pdf_renderer import downscaled, get_renderer
+    from src.catalog.services.preview_service import PreviewService
+
+    if not content_sha256:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            size = STORAGE_SETTINGS["COPY_BUFFER_SIZE"]
+            for chunk in iter(lambda: f.read(size), b""):
+                digest.update(chunk)
+        content_sha256 = digest.hexdigest()
+
+    with open(path, "rb") as f:
+        is_pdf = f.read(5) == b"%PDF-"
+
+    widths = PREVIEW_SETTINGS["WIDTHS"]
+    if is_pdf:
+        images = get_renderer().render_first_page_widths(path, widths)
+    else:
+        with Image.open(path) as image:
+            image.load()
+            images = downscaled(PreviewService._to_rgb(image), widths)
+
+    return {
+        "sha256": content_sha256,
+        "variants": PreviewService.encode_variants(images, content_sha256),
+    }
+
+
+class PreviewBatchGenerator:
+    """
+    Generates previews for many documents per task.
+
+    Originals are fetched concurrently to a scratch directory, rendered in
+    a process pool (PyMuPDF and PIL encoding are CPU-bound), the encoded
+    variants are uploaded by a thread pool as each render finishes, and
+    every document's outcome is written with one bulk UPDATE and a single
+    commit. Documents whose content already has previews are only
+    recorded.
+    """
+
+    def __init__(self, storage=None, processes=None, upload_threads=None):
+        self.storage = storage or MinIOStorage()
+        self.processes = processes or PREVIEW_SETTINGS["RENDER_PROCESSES"]
+        self.upload_threads = upload_threads or PREVIEW_SETTINGS["UPLOAD_THREADS"]
+
+    def _render_pool(self):
+        # Celery prefork children are daemonic and cannot fork a process
+        # pool, and PyMuPDF is not thread-safe, so render one file at a
+        # time there (the previews worker runs with --pool=solo to get
+        # processes)
+        if multiprocessing.current_process().daemon:
+            logger.info("Daemonic worker process; rendering previews sequentially")
+            return ThreadPoolExecutor(max_workers=1)
+        return ProcessPoolExecutor(max_workers=self.processes)
+
+    def _fetch(self, object_key: str, path: str):
+        with self.storage.open_stream(object_key) as stream, open(path, "wb") as f:
+            copy_stream(stream, f)
+
+    def _upload(self, variants):
+        from src.catalog.services.preview_service import PREVIEW_CACHE_CONTROL
+
+        for key, data, mimetype in variants:
+            self.storage.upload_stream(
+                io.BytesIO(data),
+                key,
+                content_type=mimetype,
+                cache_control=PREVIEW_CACHE_CONTROL,
+            )
+
+    def run(self, document_ids: List[int]) -> Dict[str, int]:
+        """Generate previews for document_ids; returns succeeded/failed counts"""
+        from src.catalog.services.preview_service import PreviewService
+
+        rows = (
+            db.session.query(
+                Document.id,
+                Document.filename,
+                Document.storage_key,
+                Document.content_sha256,
+                Document.s3_preview_key,
+            )
+            .filter(Document.id.in_(list(document_ids)))
+            .all()
+        )
+
+        outcomes = {}
+        pending = []
+        for row in rows:
+            if row.content_sha256:
+                key = PreviewService.default_key(row.content_sha256)
+                if self.storage.object_exists(key):
+                    outcomes[row.id] = (key, None)
+                    continue
+            pending.append(row)
+
+        with tempfile.TemporaryDirectory(prefix="previews-") as scratch:
+            paths = {}
+            with ThreadPoolExecutor(max_workers=self.upload_threads) as io_pool:
+                fetches = {
+                    io_pool.submit(
+                        self._fetch,
+                        row.storage_key or row.filename,
+                        os.path.join(scratch, str(row.id)),
+                    ): row
+                    for row in pending
+                }
+                for future in as_completed(fetches):
+                    row = fetches[future]
+                    try:
+                        future.result()
+                        paths[row.id] = os.path.join(scratch, str(row.id))
+                    except Exception as e:
+                        outcomes[row.id] = (None, f"could not fetch: {str(e)}")
+
+                uploads = {}
+                with self._render_pool() as render_pool:
+                    renders = {
+                        render_pool.submit(
+                            render_variants, paths[row.id], row.content_sha256
+                        ): row
+                        for row in pending
+                        if row.id in paths
+                    }
+                    for future in as_completed(renders):
+                        row = renders[future]
+                        try:
+                            rendered = future.result()
+                        except Exception as e:
+                            outcomes[row.id] = (None, f"render failed: {str(e)}")
+                            continue
+                        upload = io_pool.submit(self._upload, rendered["variants"])
+                        uploads[upload] = (
+                            row,
+                            PreviewService.default_key(rendered["sha256"]),
+                        )
+
+                for future in as_completed(uploads):
+                    row, key = uploads[future]
+                    try:
+                        future.result()
+                        outcomes[row.id] = (key, None)
+                    except Exception as e:
+                        outcomes[row.id] = (None, f"upload failed: {str(e)}")
+
+        for document_id in set(document_ids) - {row.id for row in rows}:
+            logger.warning(f"Preview batch: document {document_id} not found")
+
+        self._record(outcomes, {row.id for row in rows if row.s3_preview_key})
+        succeeded = sum(1 for key, _ in outcomes.values() if key)
+        logger.info(
+            f"Preview batch: {succeeded} succeeded, "
+            f"{len(outcomes) - succeeded} failed of {len(rows)} documents"
+        )
+        return {"succeeded": succeeded, "failed": len(outcomes) - succeeded}
+
+    @staticmethod
+    def _record(outcomes: Dict[int, tuple], previewed: Set[int]):
+        """
+        Write every document's preview status with bulk UPDATEs. A failed
+        re-render of a document in previewed (one that already has a working
+        preview) only records the error and keeps the existing preview.
+        """
+        if not outcomes:
+            return
+        now = datetime.utcnow()
+        succeeded, failed, kept = [], [], []
+        for document_id, (key, error) in outcomes.items():
+            if key:
+                succeeded.append(
+                    {
+                        "id": document_id,
+                        "preview_status": "SUCCESS",
+                        "s3_preview_key": key,
+                        "preview_generated_at": now,
+                        "preview_error_message": None,
+                    }
+                )
+            elif document_id in previewed:
+                kept.append({"id": document_id, "preview_error_message": error[:1024]})
+            else:
+                failed.append(
+                    {
+                        "id": document_id,
+                        "preview_status": "FAILED",
+                        "preview_error_message": error[:1024],
+                    }
+                )
+
+        for params in (succeeded, failed, kept):
+            if params:
+                db.session.execute(update(Document), params)
+        db.session.commit()
+
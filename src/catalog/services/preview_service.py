@@ -1,18 +1,118 @@
 import os
-from pdf2image import convert_from_bytes
+import re
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import io
 import base64
-from src.catalog.services.storage_service import MinIOStorage
+from src.catalog.services.storage_service import (
+    HashingReader,
+    MinIOStorage,
+    copy_stream,
+)
+from src.catalog.services.pdf_renderer import downscaled, get_renderer
 import logging
-import tempfile
-from werkzeug.utils import secure_filename
 import traceback
 from src.catalog import cache, db
-from src.catalog.constants import CACHE_TIMEOUTS, SUPPORTED_FILE_TYPES
+from src.catalog.constants import (
+    CACHE_TIMEOUTS,
+    PREVIEW_SETTINGS,
+    STORAGE_SETTINGS,
+    SUPPORTED_FILE_TYPES,
+)
 from pathlib import Path
 
 
+PREVIEW_KEY_PREFIX = "previews/"
+# Preview keys change with the content and renderer, so objects never change
+PREVIEW_CACHE_CONTROL = f"public, max-age={PREVIEW_SETTINGS['CACHE_MAX_AGE']}, immutable"
+PREVIEW_URL_PREFIX = "/previews/"
+PREVIEW_KEY_PATTERN = re.compile(
+    r"^previews/v(?P<version>\d+)/(?P<sha>[0-9a-f]{64})/(?P<width>\d+)\.(?:webp|jpg)$"
+)
+PREVIEW_FORMATS = {
+    "webp": {
+        "pil_format": "WEBP",
+        "mimetype": "image/webp",
+        "ext": ".webp",
+        "save_options": {"method": 4},
+    },
+    "jpeg": {
+        "pil_format": "JPEG",
+        "mimetype": "image/jpeg",
+        "ext": ".jpg",
+        "save_options": {"optimize": True, "progressive": True},
+    },
+}
+
+
+@lru_cache(maxsize=32)
+def placeholder_png(message="No preview available"):
+    """
+    PNG bytes of the placeholder image for a message.
+
+    Messages come from a small fixed set, so each is drawn with PIL once
+    per process and reused.
+    """
+    try:
+        # Create a blank image with text
+        width, height = 300, 300
+        image = Image.new("RGB", (width, height), color=(240, 240, 240))
+        draw = ImageDraw.Draw(image)
+
+        # Draw a document icon
+        icon_box = [
+            (width / 2 - 50, height / 2 - 60),
+            (width / 2 + 50, height / 2 + 30),
+        ]
+        draw.rectangle(icon_box, fill=(220, 220, 220), outline=(180, 180, 180), width=2)
+
+        # Add lines to represent text
+        for i in range(3):
+            line_y = height / 2 - 30 + i * 15
+            draw.line(
+                [(width / 2 - 30, line_y), (width / 2 + 30, line_y)],
+                fill=(180, 180, 180),
+                width=2,
+            )
+
+        # Add message text
+        try:
+            # Try to use a system font
+            font = ImageFont.truetype("Arial", 12)
+        except Exception:
+            # Fall back to default font
+            font = ImageFont.load_default()
+
+        text_width = draw.textlength(message, font=font)
+        text_position = ((width - text_width) / 2, height / 2 + 50)
+        draw.text(text_position, message, font=font, fill=(100, 100, 100))
+
+        buffered = io.BytesIO()
+        image.save(buffered, format="PNG", optimize=True)
+        return buffered.getvalue()
+
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error generating placeholder: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=32)
+def placeholder_data_uri(message="No preview available"):
+    png = placeholder_png(message)
+    if png:
+        return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+
+    # Return a data URI for a very simple SVG as ultimate fallback
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" width="300" height="300">'
+    svg += '<rect width="300" height="300" fill="#f0f0f0"/>'
+    svg += '<text x="150" y="150" font-family="sans-serif" font-size="12" text-anchor="middle" fill="#646464">'
+    svg += "No preview available"
+    svg += "</text></svg>"
+    return f"data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"
+
+
 class LocalStorageFallback:
     """Local storage fallback when MinIO is not available"""
 
@@ -35,6 +135,21 @@ class LocalStorageFallback:
             self.logger.error(f"Error reading file from local storage: {e}")
             return None
 
+    def read_range(self, filename, offset=0, length=None):
+        """Read part of a local file"""
+        with open(self.storage_path / filename, "rb") as f:
+            f.seek(offset)
+            return f.read(length or STORAGE_SETTINGS["SNIFF_BYTES"])
+
+    def fetch_to_tempfile(self, filename, max_memory=None):
+        """Open a local file for reading (it is already on disk)"""
+        return open(self.storage_path / filename, "rb")
+
+    @contextmanager
+    def fetch_to_path(self, filename, suffix=None):
+        """Path of a local file (it is already on disk)"""
+        yield str(self.storage_path / filename)
+
     def get_presigned_url(self, filename, bucket_name=None):
         """Get URL for local file"""
         file_path = self.storage_path / filename
@@ -42,6 +157,26 @@ class LocalStorageFallback:
             return f"/api/files/{filename}"
         return None
 
+    def upload_stream(
+        self,
+        stream,
+        object_name,
+        content_type="application/octet-stream",
+        part_size=10 * 1024 * 1024,
+        cache_control=None,
+    ):
+        """Write a file-like object under the storage path"""
+        file_path = self.storage_path / object_name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        reader = HashingReader(stream)
+        with open(file_path, "wb") as f:
+            copy_stream(reader, f)
+        return {"key": object_name, "sha256": reader.sha256, "size": reader.size}
+
+    def object_exists(self, object_name, bucket_name=None):
+        """Check whether a local file exists"""
+        return (self.storage_path / object_name).is_file()
+
 
 class PreviewService:
     def __init__(self):
@@ -115,10 +250,12 @@ class PreviewService:
                 f"Synchronous _generate_preview_internal for doc_id {document_id} returned: {type(synchronous_preview)}"
             )
 
-            # If a dictionary is returned, it contains an s3_key, which the frontend
-            # is not equipped to handle directly. Return a placeholder and let the
-            # async polling handle fetching the S3 URL.
+            # A dictionary carries the stored preview's s3_key; hand back its
+            # cacheable URL so pages reference the image instead of inlining it
             if isinstance(synchronous_preview, dict):
+                links = self.preview_links(synchronous_preview["s3_key"])
+                if links:
+                    return links["url"]
                 return self._generate_placeholder_preview("Generating preview...")
 
             return synchronous_preview
@@ -130,191 +267,197 @@ class PreviewService:
             )
             return self._generate_placeholder_preview("Error generating preview")
 
-    def _generate_image_preview(self, file_data, filename):
-        """Generate preview for image files"""
+    def _generate_image_preview(self, source, filename, content_sha256=None):
+        """Generate previews for image files (source is a readable file object)"""
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-                temp_path = temp_file.name
-                temp_file.write(file_data)
-
             try:
-                # Open the image file
-                image = Image.open(temp_path)
-
-                # Convert RGBA to RGB if necessary
-                if image.mode in ("RGBA", "LA"):
-                    background = Image.new("RGB", image.size, (255, 255, 255))
-                    background.paste(image, mask=image.split()[-1])
-                    image = background
-
-                # Resize maintaining aspect ratio
-                max_size = (300, 300)
-                image.thumbnail(max_size, Image.LANCZOS)
-
-                # Save as JPEG for smaller size
-                buffered = io.BytesIO()
-                image.save(buffered, format="JPEG", quality=85, optimize=True)
-                img_str = base64.b64encode(buffered.getvalue()).decode()
-
-                self.logger.info(
-                    f"Successfully generated image preview, size: {len(img_str)} chars"
-                )
-                return f"data:image/jpeg;base64,{img_str}"
+                # Open the image straight from the fetched object
+                image = Image.open(source)
+                image.load()
             except Exception as e:
                 self.logger.error(f"Error processing image: {str(e)}")
-                return self._generate_placeholder_preview(
-                    f"Error processing: {os.path.basename(filename)}"
-                )
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                return self._generate_placeholder_preview("Error processing image")
+
+            variants = downscaled(self._to_rgb(image), PREVIEW_SETTINGS["WIDTHS"])
+            return self._store_variants(
+                variants, content_sha256 or self._file_sha256(source)
+            )
 
         except Exception as e:
             self.logger.error(
                 f"Image preview generation error: {str(e)}", exc_info=True
             )
-            return self._generate_placeholder_preview(
-                f"Error: {os.path.basename(filename)}"
-            )
+            return self._generate_placeholder_preview("Error generating preview")
 
-    def _generate_pdf_preview(self, file_data, filename):
-        """Generate preview for PDF files"""
+    def _generate_pdf_preview(self, pdf_path, filename, content_sha256=None):
+        """Generate previews for PDF files (pdf_path is a local copy)"""
         try:
-            self.logger.info(
-                f"Starting PDF preview for {filename}. File data type: {type(file_data)}, Length: {len(file_data) if file_data else 'N/A'}"
-            )
-            if file_data and len(file_data) > 8:
-                self.logger.info(
-                    f"First 8 bytes of file_data for {filename}: {file_data[:8]}"
-                )
-            elif file_data:
-                self.logger.info(f"File_data for {filename} is too short: {file_data}")
-            else:
+            file_size = os.path.getsize(pdf_path) if pdf_path else 0
+            self.logger.info(f"Starting PDF preview for {filename} ({file_size} bytes)")
+            if not file_size:
                 self.logger.warning(
-                    f"File_data for {filename} is None or empty. Triggering fallback."
+                    f"File for {filename} is missing or empty. Triggering fallback."
                 )
                 return "fallback_to_direct_url"  # Fallback for empty file data
 
-            # Create a temporary file for the PDF - This is actually not needed if using convert_from_bytes
-            # with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            #     temp_path = temp_file.name
-            #     temp_file.write(file_data)
-            # temp_path is not used with convert_from_bytes, so removing related logic.
-
+            # Render the first page at every preview width from one open
+            # document; the renderer reads the local copy itself
             try:
-                # Convert first page only with lower DPI for speed
-                try:
-                    self.logger.info(f"Attempting convert_from_bytes for {filename}")
-                    images = convert_from_bytes(
-                        file_data,  # Pass bytes directly
-                        first_page=1,
-                        last_page=1,
-                        dpi=72,  # Lower DPI for preview
-                        size=(300, None),
-                        poppler_path="/usr/bin",  # Explicitly set Poppler path
-                        timeout=10,  # Add a timeout
-                    )
-                    self.logger.info(
-                        f"convert_from_bytes successful for {filename}, images found: {len(images)}"
-                    )
-                except Exception as e_convert:
-                    self.logger.error(
-                        f"PDF conversion (convert_from_bytes) failed for {filename}: {str(e_convert)}",
-                        exc_info=True,
-                    )
-                    # Log specific pdf2image errors if possible
-                    if hasattr(e_convert, "stdout") and e_convert.stdout:
-                        self.logger.error(
-                            f"pdf2image stdout for {filename}: {e_convert.stdout.decode(errors='ignore')}"
-                        )
-                    if hasattr(e_convert, "stderr") and e_convert.stderr:
-                        self.logger.error(
-                            f"pdf2image stderr for {filename}: {e_convert.stderr.decode(errors='ignore')}"
-                        )
-                    # If PDF conversion fails, signal to fallback to direct URL
-                    return "fallback_to_direct_url"
-
-                if not images:
+                variants = get_renderer().render_first_page_widths(
+                    pdf_path, PREVIEW_SETTINGS["WIDTHS"]
+                )
+            except Exception as e_convert:
+                self.logger.error(
+                    f"PDF rendering failed for {filename}: {str(e_convert)}",
+                    exc_info=True,
+                )
+                # Log specific pdf2image errors if possible
+                if hasattr(e_convert, "stderr") and e_convert.stderr:
                     self.logger.error(
-                        f"No images extracted from PDF for {filename}. Triggering fallback."
+                        f"pdf2image stderr for {filename}: {e_convert.stderr.decode(errors='ignore')}"
                     )
-                    return "fallback_to_direct_url"  # Fallback if no images extracted
-
-                image = images[0]
-
-                # Save as JPEG for smaller size
-                buffered = io.BytesIO()
-                image.save(buffered, format="JPEG", quality=85, optimize=True)
-                preview_image_bytes = buffered.getvalue()
+                # If PDF conversion fails, signal to fallback to direct URL
+                return "fallback_to_direct_url"
 
-                preview_image_bytes = buffered.getvalue()
+            if not content_sha256:
+                with open(pdf_path, "rb") as f:
+                    content_sha256 = self._file_sha256(f)
 
-                # Define S3 object name for the preview
-                base, ext = os.path.splitext(filename)
-                s3_object_name_base = secure_filename(
-                    base
-                )  # Original filename base, sanitized
-                s3_object_name = f"previews/{s3_object_name_base}.jpg"  # This is the key within the bucket
-
-                # Save bytes to a temporary file to use with storage.upload_file
-                temp_preview_filepath = (
-                    None  # Initialize to ensure it's defined for finally
-                )
-                try:
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix=".jpg"
-                    ) as temp_preview_file:
-                        temp_preview_file.write(preview_image_bytes)
-                        temp_preview_filepath = temp_preview_file.name
-                    self.logger.info(
-                        f"PDF preview temporary file created at: {temp_preview_filepath} for {filename}"
-                    )
-
-                    # upload_file expects filepath and the object name (key in bucket)
-                    self.logger.info(
-                        f"Attempting to upload PDF preview {temp_preview_filepath} to S3 as {s3_object_name} for {filename}"
-                    )
-                    self.storage.upload_file(temp_preview_filepath, s3_object_name)
-                    self.logger.info(
-                        f"Successfully generated and uploaded PDF preview for {filename} to S3 object: {s3_object_name}"
-                    )
-                    # The Celery task expects just the S3 key (object name)
-                    return {"s3_key": s3_object_name}
-                except Exception as e_s3_upload:
-                    self.logger.error(
-                        f"Failed to upload PDF preview for {filename} to S3: {str(e_s3_upload)}",
-                        exc_info=True,
-                    )
-                    return "fallback_to_direct_url"
-                finally:
-                    if temp_preview_filepath and os.path.exists(temp_preview_filepath):
-                        os.remove(temp_preview_filepath)
-
-            except (
-                Exception
-            ) as e_process:  # More specific exception for image processing part
+            try:
+                return self._store_variants(variants, content_sha256)
+            except Exception as e_s3_upload:
                 self.logger.error(
-                    f"Error processing extracted image for PDF {filename}: {str(e_process)}",
+                    f"Failed to upload PDF preview for {filename}: {str(e_s3_upload)}",
                     exc_info=True,
                 )
-                self.logger.warning(
-                    f"Error processing PDF image for {filename}. Triggering fallback."
-                )
-                return "fallback_to_direct_url"  # Fallback for image processing error
-            # Removed the finally block as temp_path is no longer used with convert_from_bytes
+                return "fallback_to_direct_url"
 
         except Exception as e_outer:  # Catch-all for the outer try block
             self.logger.error(
                 f"Outer PDF preview generation error for {filename}: {str(e_outer)}",
                 exc_info=True,
             )
-            self.logger.warning(
-                f"Outer PDF preview error for {filename}. Triggering fallback."
-            )
             return "fallback_to_direct_url"  # Fallback for any other outer error
 
+    @staticmethod
+    def _file_sha256(source):
+        """sha256 of a file object's content; rewinds it afterwards"""
+        source.seek(0)
+        digest = hashlib.sha256()
+        size = STORAGE_SETTINGS["COPY_BUFFER_SIZE"]
+        for chunk in iter(lambda: source.read(size), b""):
+            digest.update(chunk)
+        source.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def variant_key(content_sha256, width, fmt):
+        """Object key of one preview variant; immutable for a given content"""
+        return (
+            f"{PREVIEW_KEY_PREFIX}v{PREVIEW_SETTINGS['VERSION']}/"
+            f"{content_sha256}/{width}{PREVIEW_FORMATS[fmt]['ext']}"
+        )
+
+    @staticmethod
+    def _to_rgb(image):
+        """Flatten transparency onto white and convert to RGB"""
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            return background
+        if image.mode != "RGB":
+            return image.convert("RGB")
+        return image
+
+    @staticmethod
+    def encode_variants(variants, content_sha256):
+        """
+        Encode {width: image} as WebP and JPEG.
+        Returns [(object key, bytes, mimetype)] under content-hash keys.
+        """
+        encoded = []
+        for width, image in variants.items():
+            image = PreviewService._to_rgb(image)
+            for fmt, spec in PREVIEW_FORMATS.items():
+                buffered = io.BytesIO()
+                image.save(
+                    buffered,
+                    format=spec["pil_format"],
+                    quality=PREVIEW_SETTINGS["QUALITY"],
+                    **spec["save_options"],
+                )
+                encoded.append(
+                    (
+                        PreviewService.variant_key(content_sha256, width, fmt),
+                        buffered.getvalue(),
+                        spec["mimetype"],
+                    )
+                )
+        return encoded
+
+    @staticmethod
+    def default_key(content_sha256):
+        """The variant recorded as a document's s3_preview_key"""
+        return PreviewService.variant_key(
+            content_sha256, PREVIEW_SETTINGS["DEFAULT_WIDTH"], "jpeg"
+        )
+
+    def _store_variants(self, variants, content_sha256):
+        """
+        Upload {width: image} as WebP and JPEG under content-hash keys.
+        Returns {"s3_key": <default-width JPEG key>}.
+        """
+        for key, data, mimetype in self.encode_variants(variants, content_sha256):
+            self.storage.upload_stream(
+                io.BytesIO(data),
+                key,
+                content_type=mimetype,
+                cache_control=PREVIEW_CACHE_CONTROL,
+            )
+
+        s3_key = self.default_key(content_sha256)
+        self.logger.info(f"Stored preview variants for {content_sha256}: {s3_key}")
+        return {"s3_key": s3_key}
+
+    @staticmethod
+    def preview_links(s3_key):
+        """
+        URL and srcsets for a stored preview key.
+
+        Content-hash keys are served by the /previews/ route with immutable
+        caching; legacy keys return None and are presigned by the caller.
+        """
+        match = PREVIEW_KEY_PATTERN.match(s3_key or "")
+        if not match:
+            return None
+        version, content_sha256 = match.group("version"), match.group("sha")
+
+        def url(width, fmt):
+            return (
+                f"{PREVIEW_URL_PREFIX}v{version}/{content_sha256}/"
+                f"{width}{PREVIEW_FORMATS[fmt]['ext']}"
+            )
+
+        def srcset(fmt):
+            return ", ".join(
+                f"{url(width, fmt)} {width}w" for width in PREVIEW_SETTINGS["WIDTHS"]
+            )
+
+        return {
+            "url": url(PREVIEW_SETTINGS["DEFAULT_WIDTH"], "jpeg"),
+            "srcset": srcset("jpeg"),
+            "srcset_webp": srcset("webp"),
+        }
+
+    def _image_preview_from_storage(self, filename, content_sha256=None):
+        with self.storage.fetch_to_tempfile(filename) as source:
+            return self._generate_image_preview(source, filename, content_sha256)
+
+    def _pdf_preview_from_storage(self, filename, content_sha256=None):
+        with self.storage.fetch_to_path(filename, suffix=".pdf") as pdf_path:
+            return self._generate_pdf_preview(pdf_path, filename, content_sha256)
+
     def _get_real_file_type(self, file_data):
         """Detects file type based on magic numbers."""
         if not file_data:
@@ -334,62 +477,8 @@ class PreviewService:
         return None
 
     def _generate_placeholder_preview(self, message="No preview available"):
-        """Generate a placeholder image when preview generation fails"""
-        try:
-            # Create a blank image with text
-            width, height = 300, 300
-            image = Image.new("RGB", (width, height), color=(240, 240, 240))
-            draw = ImageDraw.Draw(image)
-
-            # Draw a document icon
-            icon_box = [
-                (width / 2 - 50, height / 2 - 60),
-                (width / 2 + 50, height / 2 + 30),
-            ]
-            draw.rectangle(
-                icon_box, fill=(220, 220, 220), outline=(180, 180, 180), width=2
-            )
-
-            # Add lines to represent text
-            for i in range(3):
-                line_y = height / 2 - 30 + i * 15
-                draw.line(
-                    [(width / 2 - 30, line_y), (width / 2 + 30, line_y)],
-                    fill=(180, 180, 180),
-                    width=2,
-                )
-
-            # Add message text
-            try:
-                # Try to use a system font
-                font = ImageFont.truetype("Arial", 12)
-            except:
-                # Fall back to default font
-                font = ImageFont.load_default()
-
-            text_width = draw.textlength(message, font=font)
-            text_position = ((width - text_width) / 2, height / 2 + 50)
-            draw.text(text_position, message, font=font, fill=(100, 100, 100))
-
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-
-            return f"data:image/png;base64,{img_str}"
-
-        except Exception as e:
-            self.logger.error(f"Error generating placeholder: {str(e)}")
-            # Return a data URI for a very simple SVG as ultimate fallback
-            svg = '<svg xmlns="http://www.w3.org/2000/svg" width="300" height="300">'
-            svg += '<rect width="300" height="300" fill="#f0f0f0"/>'
-            svg += '<text x="150" y="150" font-family="sans-serif" font-size="12" text-anchor="middle" fill="#646464">'
-            svg += "No preview available"
-            svg += "</text></svg>"
-
-            return (
-                f"data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"
-            )
+        """Placeholder image data URI for a status message (drawn once per message)"""
+        return placeholder_data_uri(message)
 
     def _generate_preview_internal(self, filename, document_id=None):
         """
@@ -400,13 +489,36 @@ class PreviewService:
             document_id (int, optional): The ID of the document. Defaults to None.
 
         Returns:
-            A string containing a data URI or a dictionary with an s3_key.
+            A dictionary with the default preview's s3_key, a placeholder
+            data URI, or "fallback_to_direct_url".
         """
         try:
-            # Get the file data from storage
-            file_data = self.storage.get_file(filename)
+            content_sha256 = None
+            if document_id:
+                # Content-addressed documents are not stored under their filename
+                from src.catalog.models import Document
+
+                doc = Document.query.get(document_id)
+                if doc:
+                    filename = doc.object_key
+                    content_sha256 = doc.content_sha256
+
+            if content_sha256:
+                # Previews are keyed by content, so duplicates share them
+                s3_key = self.default_key(content_sha256)
+                if self.storage.object_exists(s3_key):
+                    return {"s3_key": s3_key}
+
+            # Sniff the type from the first bytes only (ranged read)
+            try:
+                header = self.storage.read_range(
+                    filename, 0, STORAGE_SETTINGS["SNIFF_BYTES"]
+                )
+            except Exception as e:
+                self.logger.warning(f"Could not read {filename}: {str(e)}")
+                header = None
 
-            if not file_data:
+            if not header:
                 self.logger.error(f"File not found in storage: {filename}")
                 # Check if this is a new document that hasn't been uploaded to S3 yet
                 if document_id:
@@ -418,10 +530,10 @@ class PreviewService:
                             "File is being processed"
                         )
 
-                return self._generate_placeholder_preview(f"File not found: {filename}")
+                return self._generate_placeholder_preview("File not found")
 
             # Determine file type and generate preview
-            real_file_type = self._get_real_file_type(file_data)
+            real_file_type = self._get_real_file_type(header)
             ext = os.path.splitext(filename.lower())[1]
 
             # Use real file type if detected, otherwise fall back to extension
@@ -429,28 +541,26 @@ class PreviewService:
                 self.logger.info(
                     f"Detected file type by content: {real_file_type} for {filename}"
                 )
-                return self._generate_image_preview(file_data, filename)
+                return self._image_preview_from_storage(filename, content_sha256)
             elif real_file_type == "pdf":
                 self.logger.info(
                     f"File {filename} is a PDF (by content), attempting server-side image conversion."
                 )
-                return self._generate_pdf_preview(file_data, filename)
+                return self._pdf_preview_from_storage(filename, content_sha256)
 
             # Fallback to extension if content sniffing fails
             self.logger.warning(
                 f"Could not detect file type for {filename} by content, falling back to extension '{ext}'"
             )
             if ext in self.supported_images:
-                return self._generate_image_preview(file_data, filename)
+                return self._image_preview_from_storage(filename, content_sha256)
             elif ext in self.supported_pdfs:
                 self.logger.info(
                     f"File {filename} is a PDF (by extension), attempting server-side image conversion."
                 )
-                return self._generate_pdf_preview(file_data, filename)
+                return self._pdf_preview_from_storage(filename, content_sha256)
             else:
-                return self._generate_placeholder_preview(
-                    f"Unsupported file type: {ext}"
-                )
+                return self._generate_placeholder_preview("Unsupported file type")
 
         except Exception as e:
             self.logger.error(
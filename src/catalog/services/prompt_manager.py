@@ -1,8 +1,7 @@
 # app/services/prompt_manager.py
 import os
-import json
 from datetime import datetime
-from catalog.services.taxonomy_service import TaxonomyService
+from src.catalog.services.taxonomy_prompt import taxonomy_prompt_fragment
 
 
 class PromptManager:
@@ -214,8 +213,10 @@ Your response MUST be valid JSON formatted exactly as requested above.
 from {metadata.get('election_year', '')} that appears to be {metadata.get('document_tone', '')}.
 """
 
-        canonical_taxonomy_structure = TaxonomyService.get_taxonomy_for_prompt()
-        taxonomy_for_prompt = json.dumps(canonical_taxonomy_structure, indent=2)
+        # Compiled once per taxonomy version; optionally pruned to the
+        # unified pass's classification
+        classification = (metadata or {}).get("classification")
+        taxonomy_for_prompt = taxonomy_prompt_fragment.get(classification)
 
         return {
             "system": self.base_system_prompt,
@@ -229,7 +230,8 @@ Identify 10-15 of the most important and specific keywords or keyphrases mention
 For each verbatim keyphrase you extracted, map it to the single most relevant canonical term from the official taxonomy provided below.
 
 **Official Canonical Taxonomy:**
-```json
+Each "## " heading is a primary category; each line under it is "- Subcategory: canonical term | canonical term | ...".
+```
 {taxonomy_for_prompt}
 ```
 
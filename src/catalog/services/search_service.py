@@ -1000,7 +1000,11 @@ class SearchService:
             List of hierarchical keyword dictionaries
         """
         try:
-            # Use the DocumentKeywordManager for consistent keyword retrieval
+            # The payload is loaded with the document row
+            if doc.keyword_payload is not None:
+                return doc.keyword_payload
+
+            # Not built yet: fall back to the keyword tables
             from src.catalog.services.keyword_manager import DocumentKeywordManager
 
             keywords = DocumentKeywordManager.get_document_keywords(doc.id)
@@ -0,0 +1,149 @@
+# src/catalog/services/stats_rollup.py
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, insert, select
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES
+from src.catalog.models import DailyDocumentStats, Document, DocumentStatusCount
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentStatsRollup:
+    """
+    Dashboard statistics read from the trigger-maintained rollup tables.
+
+    Every read touches at most one row per (day, status) in the window
+    instead of scanning documents; rebuild() recomputes both tables from
+    documents if they ever drift (e.g. after a restore or manual SQL).
+    """
+
+    @staticmethod
+    def status_counts() -> Dict[str, int]:
+        """Current document count per status"""
+        return {
+            row.status: row.document_count
+            for row in db.session.query(
+                DocumentStatusCount.status, DocumentStatusCount.document_count
+            )
+        }
+
+    @staticmethod
+    def statistics(days: int = 30) -> Dict[str, Any]:
+        """Document counts, success rate and daily volume for the last days"""
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        rows = (
+            db.session.query(
+                DailyDocumentStats.day,
+                DailyDocumentStats.status,
+                DailyDocumentStats.document_count,
+            )
+            .filter(DailyDocumentStats.day >= since)
+            .order_by(DailyDocumentStats.day)
+            .all()
+        )
+
+        counts = {status: 0 for status in DOCUMENT_STATUSES.values()}
+        daily = {}
+        for day, status, count in rows:
+            counts[status] = counts.get(status, 0) + count
+            totals = daily.setdefault(day, {'total': 0, 'completed': 0, 'failed': 0})
+            totals['total'] += count
+            if status == DOCUMENT_STATUSES['COMPLETED']:
+                totals['completed'] += count
+            elif status == DOCUMENT_STATUSES['FAILED']:
+                totals['failed'] += count
+
+        total_docs = sum(counts.values())
+        completed = counts[DOCUMENT_STATUSES['COMPLETED']]
+        daily_data = [
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'total': totals['total'],
+                'completed': totals['completed'],
+                'failed': totals['failed'],
+                'success_rate': (totals['completed'] / totals['total'] * 100)
+                if totals['total'] > 0 else 0,
+            }
+            for day, totals in daily.items()
+            if totals['total'] > 0
+        ]
+
+        return {
+            'document_counts': {
+                'total': total_docs,
+                'completed': completed,
+                'failed': counts[DOCUMENT_STATUSES['FAILED']],
+                'pending': counts[DOCUMENT_STATUSES['PENDING']],
+                'processing': counts[DOCUMENT_STATUSES['PROCESSING']],
+            },
+            'processing_success_rate': (completed / total_docs * 100)
+            if total_docs > 0 else 0,
+            'daily_processing': daily_data,
+        }
+
+    @staticmethod
+    def _expected_daily():
+        day = func.date(Document.upload_date)
+        return select(
+            day, Document.status, func.count(), func.sum(Document.file_size)
+        ).group_by(day, Document.status)
+
+    @classmethod
+    def drift(cls) -> List[Dict[str, Any]]:
+        """(day, status) cells where the rollup disagrees with documents"""
+        expected = {
+            (str(day), status): count
+            for day, status, count, _ in db.session.execute(cls._expected_daily())
+        }
+        actual = {
+            (str(row.day), row.status): row.document_count
+            for row in db.session.query(DailyDocumentStats)
+        }
+        return [
+            {
+                'day': day,
+                'status': status,
+                'expected': expected.get((day, status), 0),
+                'actual': actual.get((day, status), 0),
+            }
+            for day, status in sorted(set(expected) | set(actual))
+            if expected.get((day, status), 0) != actual.get((day, status), 0)
+        ]
+
+    @classmethod
+    def rebuild(cls) -> Dict[str, int]:
+        """Recompute both rollup tables from documents in one transaction"""
+        try:
+            if db.engine.dialect.name == 'postgresql':
+                # Block writers (and so the triggers) until the new totals commit
+                db.session.execute(db.text('LOCK TABLE documents IN SHARE MODE'))
+
+            db.session.execute(delete(DailyDocumentStats))
+            db.session.execute(delete(DocumentStatusCount))
+            db.session.execute(
+                insert(DailyDocumentStats).from_select(
+                    ['day', 'status', 'document_count', 'total_bytes'],
+                    cls._expected_daily(),
+                )
+            )
+            db.session.execute(
+                insert(DocumentStatusCount).from_select(
+                    ['status', 'document_count'],
+                    select(Document.status, func.count()).group_by(Document.status),
+                )
+            )
+            days = db.session.query(func.count()).select_from(DailyDocumentStats).scalar()
+            statuses = (
+                db.session.query(func.count()).select_from(DocumentStatusCount).scalar()
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logger.info(f"Rebuilt document stats: {days} day/status rows, {statuses} statuses")
+        return {'daily_rows': days, 'statuses': statuses}
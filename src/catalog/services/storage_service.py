@@ -4,9 +4,109 @@ import os
 import shutil
 from urllib3 import PoolManager
 import io
+import hashlib
 import logging
+import tempfile
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import timedelta
 
+from src.catalog.constants import PRESIGNED_URL_SETTINGS, STORAGE_SETTINGS
+from src.catalog.services.object_cache import ObjectDiskCache
+
+
+def copy_stream(source, destination, buffer_size=None):
+    """
+    Copy between file-like objects through one reusable buffer.
+
+    Uses readinto() into a memoryview when the source supports it, so large
+    objects are moved without allocating a new bytes object per chunk.
+    Returns the number of bytes copied.
+    """
+    buffer = bytearray(buffer_size or STORAGE_SETTINGS["COPY_BUFFER_SIZE"])
+    view = memoryview(buffer)
+    copied = 0
+    readinto = getattr(source, "readinto", None)
+    while True:
+        if readinto:
+            count = readinto(buffer)
+            if not count:
+                break
+            destination.write(view[:count])
+        else:
+            chunk = source.read(len(buffer))
+            if not chunk:
+                break
+            count = len(chunk)
+            destination.write(chunk)
+        copied += count
+    return copied
+
+
+class HashingReader:
+    """
+    File-like wrapper that computes sha256 and size of everything read
+    through it, so a stream can be hashed while it is being uploaded.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        chunk = self._stream.read(size)
+        if chunk:
+            self._hash.update(chunk)
+            self.size += len(chunk)
+        return chunk
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+
+class PresignedUrlCache:
+    """
+    Per-process LRU of presigned GET URLs keyed by (bucket, key).
+
+    A cached URL is handed out again while it has more than REFRESH_BEFORE
+    seconds of life left, so clients always get a usable URL and a page of
+    thumbnails does not re-sign every object on every request.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or PRESIGNED_URL_SETTINGS["MAX_ENTRIES"]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket_name, object_name):
+        key = (bucket_name, object_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            remaining = expires_at - time.monotonic()
+            if remaining <= PRESIGNED_URL_SETTINGS["REFRESH_BEFORE"]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def put(self, bucket_name, object_name, url, expires_seconds):
+        with self._lock:
+            self._entries[(bucket_name, object_name)] = (
+                url,
+                time.monotonic() + expires_seconds,
+            )
+            self._entries.move_to_end((bucket_name, object_name))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
 
 class LocalFileStorage:
     def __init__(self, base_path="/tmp/mock_storage"):
@@ -40,19 +140,63 @@ class LocalFileStorage:
         os.makedirs(os.path.dirname(dest_path), exist_ok=True)
         shutil.copy(file_path, dest_path)
 
-    def get_file(self, filename):
-        self.logger.info(f"Local storage: Getting file '{filename}'.")
+    def put_stream(self, bucket_name, object_name, stream, chunk_size):
+        self.logger.info(f"Local storage: Streaming upload to '{object_name}'.")
+        dest_path = os.path.join(self.base_path, bucket_name, object_name)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        # Write under a unique name and rename, so readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(dest_path), delete=False
+        ) as temp_file:
+            shutil.copyfileobj(stream, temp_file, chunk_size)
+        os.replace(temp_file.name, dest_path)
+        return dest_path
+
+    def move_object(self, bucket_name, source_name, object_name):
+        self.logger.info(
+            f"Local storage: Moving '{source_name}' to '{object_name}'."
+        )
+        source_path = os.path.join(self.base_path, bucket_name, source_name)
+        dest_path = os.path.join(self.base_path, bucket_name, object_name)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        os.replace(source_path, dest_path)
+
+    def remove_object(self, bucket_name, object_name):
+        self.logger.info(f"Local storage: Removing '{object_name}'.")
+        file_path = os.path.join(self.base_path, bucket_name, object_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def _resolve(self, filename):
         # Try both with and without bucket prefix
         file_path = os.path.join(self.base_path, filename)
         if not os.path.exists(file_path):
             # Try with documents bucket prefix
             file_path = os.path.join(self.base_path, "documents", filename)
             if not os.path.exists(file_path):
-                self.logger.error(f"File not found in storage: {filename}")
                 return None
+        return file_path
+
+    def get_file(self, filename):
+        self.logger.info(f"Local storage: Getting file '{filename}'.")
+        file_path = self._resolve(filename)
+        if not file_path:
+            self.logger.error(f"File not found in storage: {filename}")
+            return None
         with open(file_path, "rb") as f:
             return f.read()
 
+    def open_file(self, filename):
+        file_path = self._resolve(filename)
+        if not file_path:
+            raise FileNotFoundError(f"File not found: {filename}")
+        return open(file_path, "rb")
+
+    def read_range(self, filename, offset, length):
+        with self.open_file(filename) as f:
+            f.seek(offset)
+            return f.read(length)
+
     def get_object(self, bucket_name, object_name):
         self.logger.info(
             f"Local storage: get_object for '{object_name}' in bucket '{bucket_name}'."
@@ -120,6 +264,8 @@ class LocalFileStorage:
 class MinIOStorage:
     _instance = None
     _client = None
+    _object_cache = None
+    _url_cache = PresignedUrlCache()
 
     def __new__(cls):
         if cls._instance is None:
@@ -221,6 +367,89 @@ class MinIOStorage:
             # LocalFileStorage
             return self._client.upload_file(filepath, filename)
 
+    def upload_stream(
+        self,
+        stream,
+        object_name,
+        content_type="application/octet-stream",
+        part_size=10 * 1024 * 1024,
+        cache_control=None,
+    ):
+        """
+        Upload a file-like object without spooling it to disk first.
+
+        Real MinIO receives a multipart upload of part_size chunks. The
+        content is hashed on the fly; returns {"key", "sha256", "size"}.
+        cache_control is stored with the object and sent with every GET.
+        """
+        reader = HashingReader(stream)
+        if hasattr(self._client, "put_object"):
+            # Real MinIO client; length=-1 switches to multipart
+            self._client.put_object(
+                self.bucket,
+                object_name,
+                reader,
+                length=-1,
+                part_size=part_size,
+                content_type=content_type,
+                metadata={"Cache-Control": cache_control} if cache_control else None,
+            )
+        else:
+            # LocalFileStorage
+            self._client.put_stream(self.bucket, object_name, reader, part_size)
+
+        return {"key": object_name, "sha256": reader.sha256, "size": reader.size}
+
+    @staticmethod
+    def content_key(sha256, filename):
+        """Content-addressed object key; keeps the extension for type sniffing"""
+        ext = os.path.splitext(filename)[1].lower()
+        return f"content/{sha256[:2]}/{sha256}{ext}"
+
+    def object_exists(self, object_name, bucket_name=None):
+        """Check whether an object exists"""
+        try:
+            self._client.stat_object(bucket_name or self.bucket, object_name)
+            return True
+        except Exception:
+            return False
+
+    def store_content(
+        self,
+        stream,
+        filename,
+        content_type="application/octet-stream",
+        part_size=10 * 1024 * 1024,
+    ):
+        """
+        Store a stream under its content hash.
+
+        The data is streamed to a unique incoming key while it is hashed, then
+        moved to content/<aa>/<sha256><ext>. If that object already exists
+        the upload is an exact duplicate and the incoming copy is dropped.
+        Returns {"key", "sha256", "size", "existed"}.
+        """
+        incoming_key = f"incoming/{uuid.uuid4().hex}"
+        stored = self.upload_stream(stream, incoming_key, content_type, part_size)
+        key = self.content_key(stored["sha256"], filename)
+
+        existed = self.object_exists(key)
+        if existed:
+            self._client.remove_object(self.bucket, incoming_key)
+        elif hasattr(self._client, "copy_object"):
+            # Real MinIO client: server-side copy, no data through this process
+            from minio.commonconfig import CopySource
+
+            self._client.copy_object(
+                self.bucket, key, CopySource(self.bucket, incoming_key)
+            )
+            self._client.remove_object(self.bucket, incoming_key)
+        else:
+            # LocalFileStorage
+            self._client.move_object(self.bucket, incoming_key, key)
+
+        return dict(stored, key=key, existed=existed)
+
     def fput_object(self, bucket_name, object_name, file_path):
         """Upload file using fput_object interface"""
         if hasattr(self._client, "fput_object"):
@@ -228,11 +457,48 @@ class MinIOStorage:
         else:
             return self._client.fput_object(bucket_name, object_name, file_path)
 
+    @property
+    def object_cache(self):
+        """Node-local disk cache for reads from real MinIO, or None"""
+        if isinstance(self._client, LocalFileStorage):
+            return None
+        if self._object_cache is None:
+            self._object_cache = ObjectDiskCache()
+        return self._object_cache if self._object_cache.enabled else None
+
+    def _open_cached(self, object_name):
+        """
+        Open an object through the disk cache, downloading it on a miss.
+        Returns an open binary file, or None when there is no cache.
+        """
+        cache = self.object_cache
+        if cache is None:
+            return None
+
+        etag = None
+        if not cache.is_content_addressed(object_name):
+            # Legacy keys can be overwritten; key the entry by their ETag too
+            etag = self._client.stat_object(self.bucket, object_name).etag
+
+        def fill(destination):
+            response = self._client.get_object(self.bucket, object_name)
+            try:
+                return copy_stream(response, destination)
+            finally:
+                response.close()
+                response.release_conn()
+
+        return cache.open(cache.cache_key(object_name, etag), fill)
+
     def get_file(self, filename):
         """Get file data from storage"""
         if hasattr(self._client, "get_object"):
             # Real MinIO client
             try:
+                cached = self._open_cached(filename)
+                if cached is not None:
+                    with cached:
+                        return cached.read()
                 response = self._client.get_object(self.bucket, filename)
                 return response.read()
             except Exception as e:
@@ -242,6 +508,87 @@ class MinIOStorage:
             # LocalFileStorage
             return self._client.get_file(filename)
 
+    @contextmanager
+    def open_stream(self, object_name):
+        """
+        Open an object for sequential reading without loading it into memory.
+
+        Use as a context manager; the HTTP connection (or local file) is
+        released on exit. With real MinIO the object is read through the
+        node-local disk cache when it is enabled.
+        """
+        if isinstance(self._client, LocalFileStorage):
+            with self._client.open_file(object_name) as f:
+                yield f
+            return
+
+        # Real MinIO client
+        cached = self._open_cached(object_name)
+        if cached is not None:
+            with cached:
+                yield cached
+            return
+
+        response = self._client.get_object(self.bucket, object_name)
+        try:
+            yield response
+        finally:
+            response.close()
+            response.release_conn()
+
+    def read_range(self, object_name, offset=0, length=None):
+        """Read length bytes starting at offset (HTTP Range request on MinIO)"""
+        length = length or STORAGE_SETTINGS["SNIFF_BYTES"]
+        if isinstance(self._client, LocalFileStorage):
+            return self._client.read_range(object_name, offset, length)
+
+        response = self._client.get_object(
+            self.bucket, object_name, offset=offset, length=length
+        )
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def fetch_to_tempfile(self, object_name, max_memory=None):
+        """
+        Copy an object into a SpooledTemporaryFile, rewound and ready to read.
+
+        Small objects stay in memory; larger ones roll over to an anonymous
+        temp file, so there is one copy of the data and no name to collide
+        with. The caller closes it (use it as a context manager).
+        """
+        spooled = tempfile.SpooledTemporaryFile(
+            max_size=max_memory or STORAGE_SETTINGS["SPOOL_MAX_MEMORY"]
+        )
+        try:
+            with self.open_stream(object_name) as stream:
+                copy_stream(stream, spooled)
+        except Exception:
+            spooled.close()
+            raise
+        spooled.seek(0)
+        return spooled
+
+    @contextmanager
+    def fetch_to_path(self, object_name, suffix=None):
+        """
+        Copy an object to a uniquely named temp file for tools that need a
+        path (poppler, PIL on disk); the file is removed on exit.
+        """
+        if suffix is None:
+            suffix = os.path.splitext(object_name)[1]
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as destination:
+                with self.open_stream(object_name) as stream:
+                    copy_stream(stream, destination)
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
     def get_object(self, bucket_name, object_name):
         """Get object from storage"""
         if hasattr(self._client, "get_object"):
@@ -260,7 +607,12 @@ class MinIOStorage:
         """Download file from storage to a local path"""
         if hasattr(self._client, "fget_object"):
             # Real MinIO client
-            self._client.fget_object(self.bucket, filename, download_path)
+            cached = self._open_cached(filename)
+            if cached is None:
+                self._client.fget_object(self.bucket, filename, download_path)
+                return download_path
+            with cached, open(download_path, "wb") as destination:
+                copy_stream(cached, destination)
             return download_path
         else:
             # LocalFileStorage
@@ -276,20 +628,33 @@ class MinIOStorage:
             # LocalFileStorage
             return self._client.list_files()
 
-    def get_presigned_url(self, object_name, bucket_name=None, expires_seconds=3600):
-        """Get a presigned URL for an object"""
+    def get_presigned_url(self, object_name, bucket_name=None, expires_seconds=None):
+        """
+        Get a presigned URL for an object.
+
+        URLs signed with the default lifetime are cached by (bucket, key)
+        and reused until they are close to expiry.
+        """
         if bucket_name is None:
             bucket_name = self.bucket
+        cacheable = expires_seconds is None
+        if cacheable:
+            url = self._url_cache.get(bucket_name, object_name)
+            if url:
+                return url
+            expires_seconds = PRESIGNED_URL_SETTINGS["EXPIRES"]
 
         if hasattr(self._client, "presigned_get_object"):
             # Real MinIO client
-            from datetime import timedelta
-
-            return self._client.presigned_get_object(
+            url = self._client.presigned_get_object(
                 bucket_name, object_name, expires=timedelta(seconds=expires_seconds)
             )
         else:
             # LocalFileStorage
-            return self._client.get_presigned_url(
+            url = self._client.get_presigned_url(
                 object_name, bucket_name, expires_seconds
             )
+
+        if cacheable and url:
+            self._url_cache.put(bucket_name, object_name, url, expires_seconds)
+        return url
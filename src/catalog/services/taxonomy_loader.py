@@ -0,0 +1,326 @@
+# src/catalog/services/taxonomy_loader.py
+import csv
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, update
+
+from src.catalog import db
+from src.catalog.models import (
+    KeywordSynonym,
+    KeywordTaxonomy,
+    LLMKeyword,
+    TaxonomyVersion,
+)
+
+logger = logging.getLogger(__name__)
+
+TermKey = Tuple[str, str, str]
+
+
+def term_key(primary_category, subcategory, term) -> TermKey:
+    """Natural key of a taxonomy term: (primary_category, subcategory, term)"""
+    return (
+        (primary_category or "").strip(),
+        (subcategory or "").strip(),
+        (term or "").strip(),
+    )
+
+
+def split_synonyms(value: Optional[str]) -> set:
+    """Synonyms cell as written by export_taxonomy_to_csv ("a, b, c")"""
+    return {s.strip() for s in (value or "").split(",") if s.strip()}
+
+
+class TaxonomyLoader:
+    """
+    Loads a taxonomy CSV by diffing it against keyword_taxonomy in memory.
+
+    The CSV is parsed once, the current terms and synonyms are read in two
+    queries, and only the differences are written: new terms with one
+    executemany INSERT, changed descriptions with one executemany UPDATE,
+    and removed terms with one DELETE, all in a single transaction that
+    also records a new TaxonomyVersion. Keywords pointing at a removed
+    term are unmapped and keywords pointing at a duplicate row are moved
+    to the surviving one.
+
+    The description and synonyms columns are optional; when the CSV has
+    no such column, that part of the stored taxonomy is left as is.
+    """
+
+    @staticmethod
+    def current_version() -> int:
+        """Highest loaded taxonomy version (0 before the first load)"""
+        return db.session.query(func.max(TaxonomyVersion.version)).scalar() or 0
+
+    @staticmethod
+    def parse(file_path: str) -> Dict[str, Any]:
+        """Read the CSV into {"entries": {key: entry}, "errors", flags}"""
+        with open(file_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fields = set(reader.fieldnames or [])
+            entries, errors = {}, 0
+            for row in reader:
+                key = term_key(
+                    row.get("primary_category"), row.get("subcategory"), row.get("term")
+                )
+                if not key[0] or not key[2]:
+                    errors += 1
+                    continue
+                entries[key] = {
+                    "description": (row.get("description") or "").strip() or None,
+                    "synonyms": split_synonyms(row.get("synonyms")),
+                }
+
+        return {
+            "entries": entries,
+            "errors": errors,
+            "has_description": "description" in fields,
+            "has_synonyms": "synonyms" in fields,
+        }
+
+    @staticmethod
+    def diff(parsed: Dict[str, Any], delete_missing: bool = True) -> Dict[str, Any]:
+        """Compare parsed CSV entries with the stored taxonomy"""
+        entries = parsed["entries"]
+
+        existing: Dict[TermKey, Dict[str, Any]] = {}
+        duplicates: Dict[int, int] = {}
+        for row in db.session.query(
+            KeywordTaxonomy.id,
+            KeywordTaxonomy.primary_category,
+            KeywordTaxonomy.subcategory,
+            KeywordTaxonomy.term,
+            KeywordTaxonomy.description,
+        ).order_by(KeywordTaxonomy.id):
+            key = term_key(row.primary_category, row.subcategory, row.term)
+            if key in existing:
+                # Earlier row-by-row loads could store a term twice
+                duplicates[row.id] = existing[key]["id"]
+            else:
+                existing[key] = {"id": row.id, "description": row.description}
+
+        stored_synonyms: Dict[int, Dict[str, List[int]]] = {}
+        for synonym_id, taxonomy_id, synonym in db.session.query(
+            KeywordSynonym.id, KeywordSynonym.taxonomy_id, KeywordSynonym.synonym
+        ):
+            stored_synonyms.setdefault(taxonomy_id, {}).setdefault(
+                synonym.strip(), []
+            ).append(synonym_id)
+
+        inserts, updates, synonym_inserts, synonym_deletes = [], [], [], []
+        for key, entry in entries.items():
+            current = existing.get(key)
+            if current is None:
+                inserts.append(key)
+                synonym_inserts.extend((key, s) for s in sorted(entry["synonyms"]))
+                continue
+
+            if (
+                parsed["has_description"]
+                and entry["description"] != current["description"]
+            ):
+                updates.append(
+                    {"id": current["id"], "description": entry["description"]}
+                )
+
+            if parsed["has_synonyms"]:
+                stored = stored_synonyms.get(current["id"], {})
+                synonym_inserts.extend(
+                    (key, s) for s in sorted(entry["synonyms"] - set(stored))
+                )
+                for synonym, ids in stored.items():
+                    if synonym in entry["synonyms"]:
+                        synonym_deletes.extend(ids[1:])
+                    else:
+                        synonym_deletes.extend(ids)
+
+        deletes = []
+        if delete_missing:
+            deletes = [
+                current["id"] for key, current in existing.items() if key not in entries
+            ]
+
+        return {
+            "entries": entries,
+            "existing_ids": {key: current["id"] for key, current in existing.items()},
+            "insert": inserts,
+            "update": updates,
+            "delete": deletes,
+            "duplicates": duplicates,
+            "synonym_insert": synonym_inserts,
+            "synonym_delete": synonym_deletes,
+        }
+
+    @staticmethod
+    def summary(diff: Dict[str, Any]) -> Dict[str, int]:
+        """Change counts of a diff, as stored on TaxonomyVersion"""
+        return {
+            "terms_inserted": len(diff["insert"]),
+            "terms_updated": len(diff["update"]),
+            "terms_deleted": len(diff["delete"]) + len(diff["duplicates"]),
+            "synonyms_inserted": len(diff["synonym_insert"]),
+            "synonyms_deleted": len(diff["synonym_delete"]),
+        }
+
+    @staticmethod
+    def _delete_terms(
+        term_ids: Iterable[int], replacements: Dict[int, int]
+    ) -> List[int]:
+        """
+        Delete terms, moving or unmapping everything that references them.
+        Returns the ids of the keywords left unmapped.
+        """
+        term_ids = list(term_ids)
+        if not term_ids:
+            return []
+
+        if replacements:
+            db.session.execute(
+                update(LLMKeyword)
+                .where(LLMKeyword.taxonomy_id.in_(list(replacements)))
+                .values(
+                    taxonomy_id=case(replacements, value=LLMKeyword.taxonomy_id)
+                )
+            )
+        unmapped = db.session.execute(
+            update(LLMKeyword)
+            .where(LLMKeyword.taxonomy_id.in_(term_ids))
+            .values(taxonomy_id=None)
+            .returning(LLMKeyword.id)
+        ).scalars().all()
+        db.session.execute(
+            update(KeywordTaxonomy)
+            .where(KeywordTaxonomy.parent_id.in_(term_ids))
+            .values(parent_id=None)
+        )
+        db.session.execute(
+            delete(KeywordSynonym).where(KeywordSynonym.taxonomy_id.in_(term_ids))
+        )
+        db.session.execute(
+            delete(KeywordTaxonomy).where(KeywordTaxonomy.id.in_(term_ids))
+        )
+        return unmapped
+
+    @classmethod
+    def apply(
+        cls, diff: Dict[str, Any], source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Write a diff and record a new taxonomy version.
+
+        Returns the version and what keyword remapping needs: the names
+        that became resolvable and the keywords that lost their term.
+        """
+        ids = dict(diff["existing_ids"])
+
+        if diff["insert"]:
+            inserted = db.session.execute(
+                insert(KeywordTaxonomy).returning(
+                    KeywordTaxonomy.id,
+                    KeywordTaxonomy.primary_category,
+                    KeywordTaxonomy.subcategory,
+                    KeywordTaxonomy.term,
+                ),
+                [
+                    {
+                        "primary_category": key[0],
+                        "subcategory": key[1] or None,
+                        "term": key[2],
+                        "description": diff["entries"][key]["description"],
+                    }
+                    for key in diff["insert"]
+                ],
+            )
+            for row in inserted:
+                ids[term_key(row.primary_category, row.subcategory, row.term)] = row.id
+
+        if diff["update"]:
+            db.session.execute(update(KeywordTaxonomy), diff["update"])
+
+        unmapped = cls._delete_terms(
+            list(diff["duplicates"]) + diff["delete"], diff["duplicates"]
+        )
+
+        if diff["synonym_delete"]:
+            db.session.execute(
+                delete(KeywordSynonym).where(
+                    KeywordSynonym.id.in_(diff["synonym_delete"])
+                )
+            )
+        if diff["synonym_insert"]:
+            db.session.execute(
+                insert(KeywordSynonym),
+                [
+                    {"taxonomy_id": ids[key], "synonym": synonym}
+                    for key, synonym in diff["synonym_insert"]
+                ],
+            )
+
+        version = TaxonomyVersion(source=source, **cls.summary(diff))
+        db.session.add(version)
+        db.session.flush()
+        return {
+            "version": version.version,
+            "remap": {
+                "names": sorted(
+                    {key[2] for key in diff["insert"]}
+                    | {synonym for _, synonym in diff["synonym_insert"]}
+                ),
+                "keyword_ids": unmapped,
+            },
+        }
+
+    @classmethod
+    def load(
+        cls,
+        file_path: str,
+        delete_missing: bool = True,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Bring the stored taxonomy in line with a CSV in one transaction.
+
+        Returns the change counts, the number of unparseable rows, the
+        resulting taxonomy version (unchanged when nothing differed or on
+        a dry run) and the "remap" input for KeywordRemapper.
+        """
+        parsed = cls.parse(file_path)
+        try:
+            if db.engine.dialect.name == "postgresql":
+                # Serialize loaders; readers are not blocked
+                db.session.execute(
+                    db.text("LOCK TABLE keyword_taxonomy IN SHARE ROW EXCLUSIVE MODE")
+                )
+
+            diff = cls.diff(parsed, delete_missing=delete_missing)
+            counts = cls.summary(diff)
+            result = dict(
+                counts, errors=parsed["errors"], terms=len(parsed["entries"])
+            )
+
+            if dry_run or not any(counts.values()):
+                db.session.rollback()
+                result["version"] = cls.current_version()
+                result["changed"] = False
+                result["remap"] = {"names": [], "keyword_ids": []}
+                return result
+
+            result.update(cls.apply(diff, source=file_path))
+            result["changed"] = True
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # Bulk statements bypass the ORM events these caches listen to
+        from src.catalog.services.taxonomy_mapper import taxonomy_mapper
+        from src.catalog.services.taxonomy_prompt import taxonomy_prompt_fragment
+
+        taxonomy_mapper.invalidate()
+        taxonomy_prompt_fragment.invalidate()
+        logger.info(
+            f"Loaded taxonomy version {result['version']}: {counts}, "
+            f"{len(result['remap']['keyword_ids'])} keywords unmapped"
+        )
+        return result
@@ -0,0 +1,310 @@
+# src/catalog/services/taxonomy_mapper.py
+import os
+import re
+import time
+import zlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import event, func
+
+from src.catalog import db
+from src.catalog.constants import TAXONOMY_MAPPING
+from src.catalog.models import KeywordTaxonomy, KeywordSynonym, TaxonomyVersion
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_term(term: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    if not term:
+        return ""
+    term = _NON_WORD.sub(" ", term.lower())
+    return _WHITESPACE.sub(" ", term).strip()
+
+
+class TaxonomyIndex:
+    """
+    One immutable build of the taxonomy index. The mapper swaps whole
+    instances, so a lookup never sees parts of two different builds.
+    """
+
+    __slots__ = ("terms", "row_term_index", "row_categories", "matrix", "exact")
+
+    def __init__(
+        self,
+        terms: List[Dict[str, Any]],
+        row_term_index: np.ndarray,
+        row_categories: np.ndarray,
+        matrix: np.ndarray,
+        exact: Dict[str, List[int]],
+    ):
+        # Per taxonomy term
+        self.terms = terms
+        # Per embedded name (terms and synonyms), pointing into terms
+        self.row_term_index = row_term_index
+        self.row_categories = row_categories
+        self.matrix = matrix
+        self.exact = exact
+
+    def category_score(self, term_index: int, primary: str, subcategory: str):
+        """Rank candidates sharing the requested category/subcategory first"""
+        term = self.terms[term_index]
+        score = 0
+        if primary and term["primary_category"].lower() == primary:
+            score += 2
+        if subcategory and term["subcategory"].lower() == subcategory:
+            score += 1
+        return score
+
+
+class TaxonomyMapper:
+    """
+    In-memory keyword to taxonomy resolver.
+
+    Holds a normalized-name hash map of every taxonomy term and synonym plus
+    a float32 matrix of term embeddings. A document's keyword list is
+    resolved with one exact-match pass over the hash map and one matrix
+    multiply for the remaining misses, instead of several ILIKE queries per
+    keyword.
+
+    Embeddings are hashed character n-gram vectors, so they are computed
+    locally and cover the spelling/plural/word-order variations the old
+    partial matches were catching. The index is rebuilt when taxonomy rows
+    change in this process (ORM events) or when the table fingerprint or
+    taxonomy version changes (checked every FINGERPRINT_CHECK_SECONDS).
+    """
+
+    def __init__(
+        self,
+        min_similarity: Optional[float] = None,
+        category_bonus: Optional[float] = None,
+        dimensions: Optional[int] = None,
+        ngram_size: Optional[int] = None,
+    ):
+        self.min_similarity = (
+            min_similarity
+            if min_similarity is not None
+            else float(
+                os.getenv(
+                    "TAXONOMY_MIN_SIMILARITY", TAXONOMY_MAPPING["MIN_SIMILARITY"]
+                )
+            )
+        )
+        self.category_bonus = (
+            category_bonus
+            if category_bonus is not None
+            else TAXONOMY_MAPPING["CATEGORY_BONUS"]
+        )
+        self.dimensions = dimensions or TAXONOMY_MAPPING["DIMENSIONS"]
+        self.ngram_size = ngram_size or TAXONOMY_MAPPING["NGRAM_SIZE"]
+        self.check_interval = TAXONOMY_MAPPING["FINGERPRINT_CHECK_SECONDS"]
+
+        self._lock = threading.Lock()
+        self._stale = True
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._index = TaxonomyIndex(
+            terms=[],
+            row_term_index=np.zeros(0, dtype=np.int64),
+            row_categories=np.zeros(0, dtype=str),
+            matrix=np.zeros((0, self.dimensions), dtype=np.float32),
+            exact={},
+        )
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup"""
+        self._stale = True
+
+    def embed(self, names: List[str]) -> np.ndarray:
+        """
+        Embed normalized names as L2-normalized hashed character n-gram
+        vectors (float32, one row per name).
+        """
+        matrix = np.zeros((len(names), self.dimensions), dtype=np.float32)
+        n = self.ngram_size
+        for row, name in enumerate(names):
+            padded = f" {name} "
+            for i in range(max(len(padded) - n + 1, 1)):
+                bucket = zlib.crc32(padded[i : i + n].encode("utf-8"))
+                matrix[row, bucket % self.dimensions] += 1.0
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _current_fingerprint(self):
+        terms = db.session.query(
+            func.count(KeywordTaxonomy.id), func.max(KeywordTaxonomy.id)
+        ).one()
+        synonyms = db.session.query(
+            func.count(KeywordSynonym.id), func.max(KeywordSynonym.id)
+        ).one()
+        # Bumped by TaxonomyLoader on every load, which also catches edits
+        # that leave the counts and max ids unchanged
+        version = db.session.query(func.max(TaxonomyVersion.version)).scalar()
+        return tuple(terms) + tuple(synonyms) + (version,)
+
+    def _ensure_index(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.check_interval:
+                return
+
+            fingerprint = self._current_fingerprint()
+            self._checked_at = now
+            if not self._stale and fingerprint == self._fingerprint:
+                return
+
+            self._build(fingerprint)
+
+    def _build(self, fingerprint):
+        start_time = time.perf_counter()
+
+        rows = db.session.query(
+            KeywordTaxonomy.id,
+            KeywordTaxonomy.term,
+            KeywordTaxonomy.primary_category,
+            KeywordTaxonomy.subcategory,
+        ).all()
+        synonym_rows = db.session.query(
+            KeywordSynonym.taxonomy_id, KeywordSynonym.synonym
+        ).all()
+
+        terms = []
+        position = {}
+        names = []
+        row_term_index = []
+        exact = {}
+
+        def add_name(name, term_index):
+            key = normalize_term(name)
+            if not key:
+                return
+            exact.setdefault(key, []).append(term_index)
+            names.append(key)
+            row_term_index.append(term_index)
+
+        for taxonomy_id, term, primary_category, subcategory in rows:
+            position[taxonomy_id] = len(terms)
+            terms.append(
+                {
+                    "taxonomy_id": taxonomy_id,
+                    "term": term,
+                    "primary_category": primary_category or "",
+                    "subcategory": subcategory or "",
+                }
+            )
+            add_name(term, position[taxonomy_id])
+
+        for taxonomy_id, synonym in synonym_rows:
+            if taxonomy_id in position:
+                add_name(synonym, position[taxonomy_id])
+
+        self._index = TaxonomyIndex(
+            terms=terms,
+            row_term_index=np.array(row_term_index, dtype=np.int64),
+            row_categories=np.array(
+                [terms[t]["primary_category"].lower() for t in row_term_index]
+            ),
+            matrix=self.embed(names),
+            exact=exact,
+        )
+        self._fingerprint = fingerprint
+        self._stale = False
+
+        logger.info(
+            f"Built taxonomy index: {len(terms)} terms, {len(names)} names in "
+            f"{time.perf_counter() - start_time:.3f}s"
+        )
+
+    def map_keywords(
+        self, keywords: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Resolve a batch of keywords to taxonomy terms.
+
+        Args:
+            keywords: Dicts with "term" and optional "primary_category"
+                and "subcategory" hints
+
+        Returns:
+            One entry per keyword: None for no match, otherwise the taxonomy
+            term with "confidence" and "method" ("exact" or "embedding")
+        """
+        self._ensure_index()
+        # A rebuild on another thread swaps _index; keep using this one
+        index = self._index
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keywords)
+        misses = []
+
+        # Pass 1: exact normalized-name lookups
+        for i, kw in enumerate(keywords):
+            name = normalize_term(kw.get("term"))
+            if not name:
+                continue
+            primary = (kw.get("primary_category") or "").lower()
+            subcategory = (kw.get("subcategory") or "").lower()
+
+            candidates = index.exact.get(name)
+            if candidates:
+                best = max(
+                    candidates,
+                    key=lambda t: index.category_score(t, primary, subcategory),
+                )
+                results[i] = dict(index.terms[best], confidence=1.0, method="exact")
+            else:
+                misses.append((i, name, primary))
+
+        if not misses or not len(index.matrix):
+            return results
+
+        # Pass 2: nearest term for all misses in one matrix multiply
+        queries = self.embed([name for _, name, _ in misses])
+        similarities = queries @ index.matrix.T
+
+        # The category bonus only ranks candidates; confidence is the cosine
+        ranking = similarities
+        if self.category_bonus:
+            hints = np.array([primary for _, _, primary in misses])
+            bonus = (index.row_categories[None, :] == hints[:, None]) & (
+                hints[:, None] != ""
+            )
+            ranking = similarities + bonus.astype(np.float32) * self.category_bonus
+
+        best_rows = ranking.argmax(axis=1)
+        best_scores = similarities[np.arange(len(misses)), best_rows]
+
+        for (i, _, _), row, score in zip(misses, best_rows, best_scores):
+            confidence = float(min(score, 1.0))
+            if confidence < self.min_similarity:
+                continue
+            term_index = int(index.row_term_index[row])
+            results[i] = dict(
+                index.terms[term_index],
+                confidence=round(confidence, 4),
+                method="embedding",
+            )
+
+        return results
+
+
+taxonomy_mapper = TaxonomyMapper()
+
+
+def _invalidate_taxonomy_index(mapper, connection, target):
+    taxonomy_mapper.invalidate()
+
+
+for _model in (KeywordTaxonomy, KeywordSynonym):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_taxonomy_index)
@@ -0,0 +1,172 @@
+# src/catalog/services/taxonomy_prompt.py
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from src.catalog.constants import TAXONOMY_PROMPT
+from src.catalog.models import KeywordTaxonomy
+from src.catalog.services.taxonomy_mapper import normalize_term
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input-token count of text (no tokenizer is available locally)"""
+    chars_per_token = TAXONOMY_PROMPT["CHARS_PER_TOKEN"]
+    return (len(text) + chars_per_token - 1) // chars_per_token
+
+
+def _stems(text: Optional[str]) -> set:
+    """Word prefixes used to match a classification hint to subcategories"""
+    length = TAXONOMY_PROMPT["STEM_LENGTH"]
+    return {word[:length] for word in normalize_term(text).split() if len(word) > 3}
+
+
+class TaxonomyPromptFragment:
+    """
+    The taxonomy section of the keyword prompt, compiled once per version.
+
+    The taxonomy is read and rendered as one compact line per subcategory
+    ("- Subcategory: term | term | ...") when the taxonomy version changes
+    (checked at most every VERSION_CHECK_SECONDS, or immediately after a
+    change made in this process), instead of being queried and serialized
+    as indented JSON for every document.
+
+    With pruning enabled the topic category (PRUNABLE_CATEGORY) is cut down
+    to the subcategories matching the unified pass's classification
+    subcategory; every other category is always kept, and the full
+    fragment is used when nothing matches.
+    """
+
+    def __init__(self, prune: Optional[bool] = None):
+        if prune is None:
+            prune = os.getenv(
+                "TAXONOMY_PROMPT_PRUNE", str(TAXONOMY_PROMPT["PRUNE"])
+            ).lower() in ("1", "true", "yes")
+        self.prune = prune
+        self.check_interval = TAXONOMY_PROMPT["VERSION_CHECK_SECONDS"]
+
+        self._lock = threading.Lock()
+        self._stale = True
+        self._checked_at = 0.0
+        self._version = None
+        self._structure: Dict[str, Dict[str, List[str]]] = {}
+        self._full = ""
+        self._pruned: Dict[frozenset, str] = {}
+
+    def invalidate(self):
+        """Recompile on the next use"""
+        self._stale = True
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    @staticmethod
+    def render(structure: Dict[str, Dict[str, List[str]]]) -> str:
+        """One heading per primary category, one line per subcategory"""
+        lines = []
+        for primary, subcategories in structure.items():
+            lines.append(f"## {primary}")
+            for subcategory, terms in subcategories.items():
+                lines.append(f"- {subcategory or primary}: {' | '.join(terms)}")
+        return "\n".join(lines)
+
+    def _ensure_compiled(self):
+        from src.catalog.services.taxonomy_loader import TaxonomyLoader
+        from src.catalog.services.taxonomy_service import TaxonomyService
+
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.check_interval:
+                return
+
+            version = TaxonomyLoader.current_version()
+            self._checked_at = now
+            if not self._stale and version == self._version:
+                return
+
+            structure = TaxonomyService.get_taxonomy_for_prompt()
+            self._structure = structure
+            self._full = self.render(structure)
+            self._pruned = {}
+            self._version = version
+            # get_taxonomy_for_prompt returns {} on errors; retry next time
+            self._stale = not structure
+
+            logger.info(
+                f"Compiled taxonomy prompt fragment for version {version}: "
+                f"{sum(len(s) for s in structure.values())} subcategories, "
+                f"~{estimate_tokens(self._full)} tokens"
+            )
+
+    def _relevant_subcategories(self, hint: str) -> frozenset:
+        """Subcategories of the topic category matching a classification hint"""
+        from src.catalog.services.taxonomy_mapper import taxonomy_mapper
+
+        topics = self._structure.get(TAXONOMY_PROMPT["PRUNABLE_CATEGORY"], {})
+        hint_stems = _stems(hint)
+        selected = set()
+        for subcategory, terms in topics.items():
+            names = [subcategory] + terms
+            if any(hint_stems & _stems(name) for name in names):
+                selected.add(subcategory)
+
+        # The mapper catches spelling variants the word match misses
+        match = taxonomy_mapper.map_keywords(
+            [{"term": hint, "primary_category": TAXONOMY_PROMPT["PRUNABLE_CATEGORY"]}]
+        )[0]
+        if match and match["primary_category"] == TAXONOMY_PROMPT["PRUNABLE_CATEGORY"]:
+            selected.add(match["subcategory"])
+        return frozenset(s for s in selected if s in topics)
+
+    def get(self, classification: Optional[Dict[str, Any]] = None) -> str:
+        """
+        The compiled fragment, pruned to the classification's subcategory
+        when pruning is enabled and the classification names one.
+        """
+        self._ensure_compiled()
+        hint = (classification or {}).get("subcategory")
+        if not self.prune or not hint:
+            return self._full
+
+        keep = self._relevant_subcategories(hint)
+        if not keep:
+            return self._full
+
+        fragment = self._pruned.get(keep)
+        if fragment is None:
+            category = TAXONOMY_PROMPT["PRUNABLE_CATEGORY"]
+            structure = {
+                primary: (
+                    {s: t for s, t in subcategories.items() if s in keep}
+                    if primary == category
+                    else subcategories
+                )
+                for primary, subcategories in self._structure.items()
+            }
+            fragment = self.render(structure)
+            self._pruned[keep] = fragment
+            logger.info(
+                f"Pruned taxonomy fragment to {sorted(keep)} for '{hint}': "
+                f"~{estimate_tokens(fragment)} of ~{estimate_tokens(self._full)} tokens"
+            )
+        return fragment
+
+
+taxonomy_prompt_fragment = TaxonomyPromptFragment()
+
+
+def _invalidate_taxonomy_fragment(mapper, connection, target):
+    taxonomy_prompt_fragment.invalidate()
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(KeywordTaxonomy, _event_name, _invalidate_taxonomy_fragment)
@@ -17,47 +17,34 @@ class TaxonomyService:
     """Service for managing keyword taxonomy"""
 
     @staticmethod
-    def initialize_taxonomy_from_file(file_path):
-        """Initialize taxonomy from a structured CSV file"""
+    def initialize_taxonomy_from_file(file_path, delete_missing=True):
+        """Bring the taxonomy in line with a structured CSV file"""
+        from src.catalog.services.taxonomy_loader import TaxonomyLoader
+
         try:
             if not os.path.exists(file_path):
                 logger.error(f"Taxonomy file not found: {file_path}")
                 return False, "Taxonomy file not found"
 
-            with open(file_path, "r") as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-
-            counter = {"created": 0, "errors": 0}
-
-            for row in rows:
-                if not row.get("primary_category") or not row.get("term"):
-                    counter["errors"] += 1
-                    continue
-
-                try:
-                    term = KeywordTaxonomy(
-                        term=row["term"],
-                        primary_category=row["primary_category"],
-                        subcategory=row.get("subcategory", ""),
-                        description=row.get("description", ""),
-                    )
-                    db.session.add(term)
-                    counter["created"] += 1
-                except Exception as e:
-                    logger.error(
-                        f"Error creating taxonomy term {row.get('term')}: {str(e)}"
-                    )
-                    counter["errors"] += 1
-                    continue
-            db.session.commit()
+            result = TaxonomyLoader.load(file_path, delete_missing=delete_missing)
+            if result["changed"]:
+                from src.catalog.tasks.taxonomy_tasks import remap_keywords
+
+                remap_keywords.delay(
+                    result["remap"]["names"], result["remap"]["keyword_ids"]
+                )
             logger.info(
-                f"Taxonomy initialization complete: {counter['created']} terms created, {counter['errors']} errors"
+                f"Taxonomy initialization complete: {result['terms_inserted']} created, "
+                f"{result['terms_updated']} updated, {result['terms_deleted']} deleted, "
+                f"{result['errors']} errors"
+            )
+            return True, (
+                f"Taxonomy version {result['version']}: "
+                f"{result['terms_inserted']} terms created, "
+                f"{result['terms_updated']} updated, {result['terms_deleted']} deleted"
             )
-            return True, f"Successfully created {counter['created']} taxonomy terms"
 
         except Exception as e:
-            db.session.rollback()
             logger.error(f"Taxonomy initialization failed: {str(e)}")
             return False, f"Taxonomy initialization failed: {str(e)}"
 
@@ -0,0 +1,130 @@
+# src/catalog/services/upload_service.py
+import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from werkzeug.utils import secure_filename
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES, UPLOAD_SETTINGS
+from src.catalog.models import Document
+from src.catalog.services.storage_service import MinIOStorage
+
+logger = logging.getLogger(__name__)
+
+
+class UploadService:
+    """
+    Streaming ingest for multi-file uploads.
+
+    werkzeug has already parsed the multipart body by the time the files
+    are read, keeping small parts in memory and spooling larger ones to
+    temporary files. Each file is then streamed from there into object
+    storage (a MinIO multipart upload) without another full copy, hashed
+    and measured as it goes, and kept under its content hash, with a bounded
+    number of files in flight. The Document rows for the whole batch are
+    then created with one INSERT.
+    """
+
+    @staticmethod
+    def _stream_one(storage: MinIOStorage, file_storage, filename: str) -> Dict[str, Any]:
+        content_type = (
+            file_storage.mimetype
+            or mimetypes.guess_type(filename)[0]
+            or "application/octet-stream"
+        )
+        stored = storage.store_content(
+            file_storage.stream,
+            filename,
+            content_type=content_type,
+            part_size=UPLOAD_SETTINGS["PART_SIZE"],
+        )
+        return dict(stored, filename=filename)
+
+    @staticmethod
+    def create_documents(
+        uploads: List[Dict[str, Any]], status: str, commit: bool = True
+    ) -> List[int]:
+        """
+        Insert one Document per stored upload; returns ids in input order.
+        With commit=False the insert joins the caller's transaction.
+        """
+        if not uploads:
+            return []
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "filename": upload["filename"],
+                "upload_date": now,
+                "file_size": upload["size"],
+                "content_sha256": upload["sha256"],
+                "storage_key": upload["key"],
+                "status": status,
+                "page_count": 0,
+            }
+            for upload in uploads
+        ]
+        stmt = insert(Document).returning(Document.id, sort_by_parameter_order=True)
+        document_ids = list(db.session.execute(stmt, rows).scalars())
+        if commit:
+            db.session.commit()
+        return document_ids
+
+    @staticmethod
+    def ingest(files, status: Optional[str] = None) -> Tuple[List[int], List[str]]:
+        """
+        Store a batch of uploaded files and create their documents.
+
+        Args:
+            files: werkzeug FileStorage objects from the request
+            status: initial document status (default BATCH_PENDING)
+
+        Returns:
+            (document ids, names of files that failed to upload)
+        """
+        status = status or DOCUMENT_STATUSES["BATCH_PENDING"]
+        storage = MinIOStorage()
+
+        entries = []
+        failed = []
+        for file_storage in files:
+            if not file_storage or not file_storage.filename:
+                continue
+            filename = secure_filename(file_storage.filename)
+            if not filename:
+                failed.append(file_storage.filename)
+                continue
+            entries.append((file_storage, filename))
+
+        if not entries:
+            return [], failed
+
+        uploads = []
+        workers = min(UPLOAD_SETTINGS["MAX_PARALLEL_UPLOADS"], len(entries))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (
+                    filename,
+                    pool.submit(
+                        UploadService._stream_one, storage, file_storage, filename
+                    ),
+                )
+                for file_storage, filename in entries
+            ]
+            for filename, future in futures:
+                try:
+                    uploads.append(future.result())
+                except Exception as e:
+                    logger.error(f"Upload error for file '{filename}': {str(e)}")
+                    failed.append(filename)
+
+        document_ids = UploadService.create_documents(uploads, status)
+        logger.info(
+            f"Stored {len(document_ids)} uploads "
+            f"({sum(u['size'] for u in uploads)} bytes), {len(failed)} failed"
+        )
+        return document_ids, failed
@@ -1,6 +1,95 @@
 // static/js/document-preview-loader.js
 
 document.addEventListener('DOMContentLoaded', function() {
+    // Must match PRESIGNED_URL_SETTINGS['BATCH_LIMIT'] on the server
+    const PREVIEW_BATCH_LIMIT = 100;
+
+    // Thumbnails are rendered at several widths; let the browser pick one
+    // for the card's size and prefer WebP
+    const PREVIEW_SIZES = '(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw';
+
+    function renderPreviewImage(container, preview, filename) {
+      const webpSource = preview.srcset_webp
+        ? `<source type="image/webp" srcset="${preview.srcset_webp}" sizes="${PREVIEW_SIZES}">`
+        : '';
+      const jpegSrcset = preview.srcset
+        ? `srcset="${preview.srcset}" sizes="${PREVIEW_SIZES}"`
+        : '';
+      container.innerHTML = `
+        <picture class="w-full h-full">
+          ${webpSource}
+          <img 
+            src="${preview.url}"
+            ${jpegSrcset}
+            alt="Preview of ${filename}" 
+            loading="lazy"
+            class="w-full h-full object-contain fade-in"
+            onerror="this.onerror=null; this.parentNode.querySelectorAll('source').forEach(s => s.remove()); this.removeAttribute('srcset'); this.src='/api/placeholder-image';"
+          >
+        </picture>
+      `;
+      container.dataset.loaded = 'true';
+      container.dataset.loading = 'false';
+    }
+
+    // Resolve every already-generated preview on the page with one request
+    // per PREVIEW_BATCH_LIMIT cards. Cards left without a URL are handled
+    // lazily by the per-document endpoint below, which starts generation.
+    const pendingBatch = new Map();
+    let batchTimer = null;
+
+    function queueForBatch(container) {
+      const documentId = container.dataset.documentId;
+      if (!documentId || container.dataset.loaded === 'true') {
+        return;
+      }
+      container.dataset.batchPending = 'true';
+      pendingBatch.set(documentId, container);
+      if (!batchTimer) {
+        batchTimer = setTimeout(flushBatch, 0);
+      }
+    }
+
+    function flushBatch() {
+      batchTimer = null;
+      const entries = Array.from(pendingBatch.entries());
+      pendingBatch.clear();
+
+      for (let i = 0; i < entries.length; i += PREVIEW_BATCH_LIMIT) {
+        const chunk = new Map(entries.slice(i, i + PREVIEW_BATCH_LIMIT));
+        fetch(`/api/previews?ids=${Array.from(chunk.keys()).join(',')}`)
+          .then(response => {
+            if (!response.ok) {
+              throw new Error(`Batch preview fetch failed: ${response.status}`);
+            }
+            return response.json();
+          })
+          .then(data => {
+            Object.entries(data.previews || {}).forEach(([documentId, preview]) => {
+              const container = chunk.get(documentId);
+              if (preview.url && container) {
+                renderPreviewImage(container, preview, container.dataset.filename);
+              }
+            });
+          })
+          .catch(error => {
+            console.error('[PreviewLoader] Batch preview error:', error);
+          })
+          .finally(() => {
+            // Re-observe cards the batch could not resolve so visible ones
+            // go through the per-document endpoint now
+            chunk.forEach(container => {
+              delete container.dataset.batchPending;
+              const card = container.closest('.document-card');
+              if (card && container.dataset.loaded !== 'true') {
+                previewObserver.unobserve(card);
+                previewObserver.observe(card);
+              }
+            });
+          });
+      }
+    }
+
     // Function to load document preview
     function loadDocumentPreview(container, documentId, filename, card, observerInstance) {
       // dataset.loading is true, set by IntersectionObserver callback
@@ -48,16 +137,7 @@ document.addEventListener('DOMContentLoaded', function() {
             container.dataset.loading = 'false';
             observerInstance.unobserve(card);
           } else if (data.status === 'success' && data.url) {
-            container.innerHTML = `
-              <img 
-                src="${data.url}"
-                alt="Preview of ${filename}" 
-                class="w-full h-full object-contain fade-in"
-                onerror="this.onerror=null; this.src='/api/placeholder-image';"
-              >
-            `;
-            container.dataset.loaded = 'true';
-            container.dataset.loading = 'false';
+            renderPreviewImage(container, data, filename);
             observerInstance.unobserve(card);
           } else {
             console.warn(`No preview or fallback from initial API for docId: ${documentId}, filename: ${filename}. Data:`, data);
@@ -133,7 +213,8 @@ document.addEventListener('DOMContentLoaded', function() {
             
             if (previewContainer && 
                 previewContainer.dataset.loaded !== 'true' && 
-                previewContainer.dataset.loading !== 'true') {
+                previewContainer.dataset.loading !== 'true' &&
+                previewContainer.dataset.batchPending !== 'true') {
                   
               const documentId = previewContainer.dataset.documentId;
               const filename = previewContainer.dataset.filename;
@@ -163,6 +244,7 @@ document.addEventListener('DOMContentLoaded', function() {
             const previewContainer = cardElement.querySelector('.preview-container');
             // Only observe if it has a preview container and hasn't been passed to observer yet
             if (previewContainer && previewContainer.dataset.observedByLoader !== 'true') {
+                 queueForBatch(previewContainer);
                  previewObserver.observe(cardElement);
                  previewContainer.dataset.observedByLoader = 'true'; 
             }
@@ -3,6 +3,8 @@ import logging
 from sqlalchemy.orm import Session
 from flask import current_app
 
+from src.catalog.constants import PIPELINE_SETTINGS
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,9 +50,28 @@ def check_minimum_analysis(document_id: int) -> bool:
                 f"No extracted text found for document ID {document_id}")
 
         # Consider document analyzable if it has at least one of these components
-        return has_llm_analysis or has_extracted_text
+        has_minimum = has_llm_analysis or has_extracted_text
+
+        # Rows left by an earlier run don't count if none of the components
+        # producing them succeeded
+        missing = missing_analysis_components(document_id)
+        required = PIPELINE_SETTINGS["REQUIRED_COMPONENTS"]
+        if all(component in missing for component in required):
+            has_minimum = False
+
+        if not has_minimum:
+            logger.warning(
+                f"Components to resubmit for document ID {document_id}: {missing}")
+        return has_minimum
 
     except Exception as e:
         logger.error(
             f"Error checking minimum analysis: {str(e)}", exc_info=True)
         return False
+
+
+def missing_analysis_components(document_id: int) -> list:
+    """Analysis components without a successful checkpoint; retries resubmit only these"""
+    from src.catalog.services.checkpoint_service import AnalysisCheckpointService
+
+    return AnalysisCheckpointService.missing_components(document_id)
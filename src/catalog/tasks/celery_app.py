@@ -1,7 +1,8 @@
 # src/catalog/tasks/celery_app.py
 import os
 import logging
-from celery import Celery
+from celery import Celery, Task
+from flask import has_app_context
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
@@ -9,7 +10,13 @@ logger = logging.getLogger(__name__)
 
 # Get queue names from constants (moved before Celery app initialization)
 try:
-    from src.catalog.constants import QUEUE_NAMES, DOCUMENT_STATUSES
+    from src.catalog.constants import (
+        ADMISSION_SETTINGS,
+        DOCUMENT_STATUSES,
+        DROPBOX_SYNC_SETTINGS,
+        LEASE_SETTINGS,
+        QUEUE_NAMES,
+    )
 except ImportError:
     # Fallback if constants not available yet
     DOCUMENT_STATUSES = {
@@ -23,9 +30,18 @@ except ImportError:
         "DOCUMENT_PROCESSING": "document_processing",
         "ANALYSIS": "analysis",
         "PREVIEWS": "previews",
+        "EMBEDDINGS": "embeddings",
+        "FETCH": "pipeline_fetch",
+        "RASTERIZE": "pipeline_rasterize",
+        "LLM": "pipeline_llm",
+        "PERSIST": "pipeline_persist",
         "DEFAULT": "celery",
     }
 
+    LEASE_SETTINGS = {"SWEEP_INTERVAL": 15}
+    ADMISSION_SETTINGS = {"SAFETY_NET_INTERVAL": 45}
+    DROPBOX_SYNC_SETTINGS = {"WATCH_INTERVAL": 60}
+
 # Redis URLs
 broker_url = (
     os.environ.get("CELERY_BROKER_URL")
@@ -42,8 +58,32 @@ result_backend = (
 safe_broker = broker_url.replace("redis://", "redis://****:****@")
 logger.info(f"Initializing Celery with broker: {safe_broker}")
 
+
+class AppContextTask(Task):
+    """
+    Runs each task inside the worker's Flask app context (built once per
+    process, see worker_context.py) and removes the scoped session afterwards.
+    """
+
+    abstract = True
+
+    def __call__(self, *args, **kwargs):
+        # Already inside an app (eager execution from a request or script)
+        if has_app_context():
+            return super().__call__(*args, **kwargs)
+
+        from src.catalog import db
+        from src.catalog.tasks.worker_context import get_worker_app
+
+        with get_worker_app().app_context():
+            try:
+                return super().__call__(*args, **kwargs)
+            finally:
+                db.session.remove()
+
+
 # Initialize Celery ONCE
-celery_app = Celery("src.catalog.tasks", broker=broker_url)
+celery_app = Celery("src.catalog.tasks", broker=broker_url, task_cls=AppContextTask)
 
 # Autodiscover tasks from specified modules.
 # Ensure all modules containing tasks are listed here or tasks are imported directly.
@@ -55,6 +95,8 @@ celery_app.autodiscover_tasks(
         "src.catalog.tasks.embedding_tasks",
         "src.catalog.tasks.dropbox_tasks",  # if it exists and has tasks
         "src.catalog.tasks.recovery_tasks",  # if it exists and has tasks
+        "src.catalog.tasks.pipeline_tasks",
+        "src.catalog.tasks.taxonomy_tasks",
     ]
 )  # Add other task modules if necessary
 
@@ -68,40 +110,48 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
-# Configure task routing
+# Configure task routing (keys are the registered task names)
 celery_app.conf.task_routes = {
-    "catalog.tasks.process_document": {"queue": QUEUE_NAMES["DOCUMENT_PROCESSING"]},
-    "src.catalog.tasks.document_tasks.process_document": {
-        "queue": QUEUE_NAMES["DOCUMENT_PROCESSING"]
-    },
+    "process_document": {"queue": QUEUE_NAMES["DOCUMENT_PROCESSING"]},
     "src.catalog.tasks.analyze_document": {"queue": QUEUE_NAMES["ANALYSIS"]},
-    "src.catalog.tasks.preview_tasks.generate_preview": {
-        "queue": QUEUE_NAMES["PREVIEWS"]
-    },
-    "src.catalog.tasks.dropbox_tasks.sync_dropbox": {
-        "queue": QUEUE_NAMES["DOCUMENT_PROCESSING"]
-    },
-    "src.catalog.tasks.embedding_tasks.generate_embeddings": {
-        "queue": QUEUE_NAMES["DEFAULT"]
-    },
+    "tasks.sync_dropbox": {"queue": QUEUE_NAMES["DOCUMENT_PROCESSING"]},
+    "tasks.watch_dropbox": {"queue": QUEUE_NAMES["DEFAULT"]},
     "tasks.process_batch_uploads": {
         "queue": QUEUE_NAMES["DEFAULT"]
     },  # Route for the new batch task
+    # Ingestion pipeline stages, each on its own queue so worker
+    # concurrency can be sized per stage
+    "pipeline.fetch_document": {"queue": QUEUE_NAMES["FETCH"]},
+    "pipeline.rasterize_document": {"queue": QUEUE_NAMES["RASTERIZE"]},
+    "pipeline.analyze_component": {"queue": QUEUE_NAMES["LLM"]},
+    "pipeline.analyze_in_sequence": {"queue": QUEUE_NAMES["LLM"]},
+    "pipeline.persist_analysis": {"queue": QUEUE_NAMES["PERSIST"]},
+    "tasks.generate_embeddings": {"queue": QUEUE_NAMES["EMBEDDINGS"]},
+    "tasks.generate_preview": {"queue": QUEUE_NAMES["PREVIEWS"]},
+    "tasks.generate_previews_batch": {"queue": QUEUE_NAMES["PREVIEWS"]},
+    "tasks.remap_keywords": {"queue": QUEUE_NAMES["DEFAULT"]},
 }
 
 # Configure Celery Beat schedule
 celery_app.conf.beat_schedule = {
-    "process-batch-uploads-every-45-seconds": {
+    # Safety net: uploads are normally dispatched as soon as they land
+    "process-batch-uploads": {
         "task": "tasks.process_batch_uploads",
-        "schedule": 45.0,  # Run every 45 seconds
-        "options": {"queue": QUEUE_NAMES["DEFAULT"]},  # Can specify queue here too
+        "schedule": float(ADMISSION_SETTINGS["SAFETY_NET_INTERVAL"]),
+        "options": {"queue": QUEUE_NAMES["DEFAULT"]},
+    },
+    # Longpoll Dropbox and sync only when the folder changed
+    "watch-dropbox": {
+        "task": "tasks.watch_dropbox",
+        "schedule": float(DROPBOX_SYNC_SETTINGS["WATCH_INTERVAL"]),
+        "options": {"queue": QUEUE_NAMES["DEFAULT"]},
+    },
+    # Re-queue documents whose processing lease expired (dead workers)
+    "recover-expired-leases": {
+        "task": "tasks.recover_pending_documents",
+        "schedule": float(LEASE_SETTINGS["SWEEP_INTERVAL"]),
+        "options": {"queue": QUEUE_NAMES["DEFAULT"]},
     },
-    # Example of another periodic task (if you had one)
-    # 'recover-pending-documents-hourly': {
-    #     'task': 'tasks.recover_pending_documents', # Assuming you have this task defined
-    #     'schedule': 3600.0, # Run every hour
-    #     'options': {'queue': QUEUE_NAMES['DEFAULT']}
-    # },
 }
 
 # Verify Redis connection on module import
@@ -112,6 +162,13 @@ except Exception as e:
     logger.error(f"Failed to connect to Redis: {str(e)}")
 
 
+# Register the worker_process_init hook, pipeline stage metrics and
+# per-task query metrics
+from src.catalog.tasks import worker_context  # noqa: E402,F401
+from src.catalog.utils import stage_metrics  # noqa: E402,F401
+from src.catalog.utils import query_metrics  # noqa: E402,F401
+
+
 @celery_app.task(name="debug.list_tasks")
 def list_registered_tasks():
     """List all registered tasks"""
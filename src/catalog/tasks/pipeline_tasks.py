@@ -0,0 +1,419 @@
+# src/catalog/tasks/pipeline_tasks.py
+"""
+Stage-decomposed ingestion pipeline.
+
+    fetch -> rasterize -> analyze (group, one task per prompt)
+          -> persist -> {embeddings, preview}
+
+With taxonomy prompt pruning on, the keyword prompt runs after the
+unified prompt in the same analyze task, so it can use its
+classification.
+
+Each stage is routed to its own queue (see celery_app.task_routes) so slow
+LLM calls only occupy pipeline_llm workers. Stages pass a small payload of
+object keys, never file contents.
+
+Analysis results are checkpointed per component, so a rerun only submits
+the components that have not succeeded yet. All stages are idempotent and
+acknowledged late, so a task redelivered after a worker crash is safe.
+
+Each run holds a lease on its document (services/lease_service.py). Stages
+renew it on entry and stop without doing any work if another run has taken
+over; expired leases are re-queued by recover_pending_documents.
+"""
+
+import os
+import tempfile
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+from celery import chain, group
+from celery.exceptions import Ignore
+
+from .celery_app import celery_app, logger
+from src.catalog import db
+from src.catalog.constants import (
+    CHECKPOINT_STATUSES,
+    DOCUMENT_STATUSES,
+    LEASE_SETTINGS,
+    PIPELINE_SETTINGS,
+    RENDER_SETTINGS,
+    SUPPORTED_FILE_TYPES,
+)
+from src.catalog.models import Document
+from src.catalog.services.analysis_store import AnalysisStore
+from src.catalog.services.checkpoint_service import AnalysisCheckpointService
+from src.catalog.services.dedup_service import DuplicateDetector
+from src.catalog.services.lease_service import DocumentLease
+from src.catalog.services.llm_service import LLMService
+from src.catalog.services.pdf_renderer import get_renderer
+from src.catalog.services.taxonomy_prompt import taxonomy_prompt_fragment
+from src.catalog.tasks.analysis_utils import check_minimum_analysis
+from src.catalog.tasks.worker_context import get_service
+
+IMAGE_MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+}
+
+# Safe to redeliver: every stage is idempotent
+STAGE_OPTIONS = {"acks_late": True, "reject_on_worker_lost": True}
+
+
+def _mark_failed(document_id: int, lease_owner: str, reason: str):
+    """Mark a document FAILED and stop the rest of the chain"""
+    logger.error(f"Pipeline stopped for document {document_id}: {reason}")
+    doc = db.session.get(Document, document_id)
+    if doc:
+        doc.status = DOCUMENT_STATUSES["FAILED"]
+        db.session.commit()
+    DocumentLease.release(document_id, lease_owner)
+    raise Ignore()
+
+
+def _enter_stage(document_id: int, lease_owner: str, stage: str):
+    """Renew the run's lease, or stop if another run owns the document"""
+    if not DocumentLease.renew(document_id, lease_owner):
+        logger.warning(
+            f"Skipping {stage} for document {document_id}: lease held by another run"
+        )
+        raise Ignore()
+
+
+def _hand_off(document_id: int, lease_owner: str):
+    """Keep the lease while the next stage waits in its queue"""
+    DocumentLease.renew(document_id, lease_owner, LEASE_SETTINGS["HANDOFF_SECONDS"])
+
+
+def build_document_pipeline(document_id: int, filename: str, lease_owner: str):
+    """Build the ingestion canvas for one document run"""
+    # Deferred to avoid importing the task modules at import time
+    from src.catalog.tasks.embedding_tasks import generate_embeddings
+    from src.catalog.tasks.preview_tasks import generate_preview
+
+    missing = AnalysisCheckpointService.missing_components(document_id)
+    postprocess = group(
+        generate_embeddings.si(document_id),
+        generate_preview.si(document_id, filename),
+    )
+
+    if not missing:
+        # Every component is checkpointed: only persist needs to run again
+        return chain(
+            fetch_document.si(document_id, filename, lease_owner),
+            persist_analysis.si([], document_id, lease_owner),
+            postprocess,
+        )
+
+    if len(missing) < len(PIPELINE_SETTINGS["ANALYSIS_COMPONENTS"]):
+        logger.info(f"Resuming document {document_id} with components {missing}")
+
+    # With a pruned taxonomy prompt the keyword prompt needs the unified
+    # pass's classification, so the two run in sequence in one task; the
+    # other prompts still run in parallel
+    sequenced = []
+    if taxonomy_prompt_fragment.prune and "unified" in missing:
+        sequenced = [
+            c for c in PIPELINE_SETTINGS["CLASSIFIED_COMPONENTS"] if c in missing
+        ]
+    analyses = [
+        analyze_component.s(component)
+        for component in missing
+        if component not in sequenced and not (sequenced and component == "unified")
+    ]
+    if sequenced:
+        analyses.append(analyze_in_sequence.s(["unified"] + sequenced))
+
+    # A group followed by a task in a chain becomes a chord
+    return chain(
+        fetch_document.si(document_id, filename, lease_owner),
+        rasterize_document.s(),
+        group(analyses),
+        persist_analysis.s(document_id, lease_owner),
+        postprocess,
+    )
+
+
+def start_document_pipeline(
+    document_id: int, filename: str, lease_owner: Optional[str] = None
+):
+    """
+    Claim the document and queue the ingestion pipeline for it.
+
+    A lease_owner that already holds the document's lease (the expired
+    lease sweeper) keeps it instead of claiming a new one.
+
+    Exact duplicates of a completed document are completed from the
+    original's results instead. Returns the canvas result, or None if
+    nothing was queued (another live run holds the lease, or the document
+    was linked to its original).
+    """
+    if lease_owner:
+        claimed = DocumentLease.renew(
+            document_id, lease_owner, LEASE_SETTINGS["HANDOFF_SECONDS"]
+        )
+    else:
+        lease_owner = DocumentLease.new_owner()
+        claimed = DocumentLease.claim(document_id, lease_owner)
+    if not claimed:
+        logger.info(f"Document {document_id} is already being processed")
+        return None
+
+    doc = db.session.get(Document, document_id)
+    original = DuplicateDetector.find_original(doc) if doc else None
+    if original:
+        try:
+            if DuplicateDetector.link_duplicate(document_id, original):
+                DocumentLease.release(document_id, lease_owner)
+                return None
+        except Exception as e:
+            db.session.rollback()
+            logger.error(
+                f"Could not link document {document_id} to {original.id}: {str(e)}"
+            )
+
+    result = build_document_pipeline(document_id, filename, lease_owner).apply_async()
+    logger.info(f"Queued ingestion pipeline for document {document_id} ({filename})")
+    return result
+
+
+@celery_app.task(name="pipeline.fetch_document", **STAGE_OPTIONS)
+def fetch_document(document_id: int, filename: str, lease_owner: str) -> Dict[str, Any]:
+    """Check the source object exists and mark the document PROCESSING"""
+    doc = db.session.get(Document, document_id)
+    if not doc:
+        logger.error(f"Document with ID {document_id} not found")
+        raise Ignore()
+
+    _enter_stage(document_id, lease_owner, "fetch")
+
+    source_key = doc.object_key
+    storage = get_service("storage")
+    try:
+        storage.stat_object(storage.bucket, source_key)
+    except Exception as e:
+        _mark_failed(
+            document_id, lease_owner, f"source object {source_key} not found: {str(e)}"
+        )
+
+    doc.status = DOCUMENT_STATUSES["PROCESSING"]
+    db.session.commit()
+    _hand_off(document_id, lease_owner)
+
+    return {
+        "document_id": document_id,
+        "filename": filename,
+        "source_key": source_key,
+        "lease_owner": lease_owner,
+    }
+
+
+@celery_app.task(name="pipeline.rasterize_document", **STAGE_OPTIONS)
+def rasterize_document(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Produce the image the analysis prompts look at"""
+    document_id, lease_owner = payload["document_id"], payload["lease_owner"]
+    _enter_stage(document_id, lease_owner, "rasterize")
+    try:
+        return _rasterize(payload)
+    finally:
+        _hand_off(document_id, lease_owner)
+
+
+def _rasterize(payload: Dict[str, Any]) -> Dict[str, Any]:
+    document_id, lease_owner = payload["document_id"], payload["lease_owner"]
+    source_key = payload["source_key"]
+    ext = os.path.splitext(source_key)[1].lower()
+
+    storage = get_service("storage")
+
+    if ext in IMAGE_MEDIA_TYPES:
+        try:
+            with storage.fetch_to_tempfile(source_key) as source:
+                _record_perceptual_hash(
+                    document_id, DuplicateDetector.open_image(source, source_key)
+                )
+        except Exception as e:
+            logger.warning(f"Could not hash {source_key}: {str(e)}")
+        # Images are sent to the model as-is
+        return dict(
+            payload, raster_key=source_key, raster_media_type=IMAGE_MEDIA_TYPES[ext]
+        )
+
+    if ext not in SUPPORTED_FILE_TYPES["DOCUMENTS"]:
+        logger.warning(f"No rasterizer for {source_key}; analyzing without image")
+        return dict(payload, raster_key=None, raster_media_type=None)
+
+    with ExitStack() as stack:
+        # The renderer reads a local copy, so the PDF is never held in memory
+        try:
+            pdf_path = stack.enter_context(storage.fetch_to_path(source_key))
+        except Exception as e:
+            _mark_failed(
+                document_id, lease_owner, f"could not read {source_key}: {str(e)}"
+            )
+
+        try:
+            page = get_renderer().render_first_page(
+                pdf_path, dpi=RENDER_SETTINGS["RASTER_DPI"]
+            )
+        except Exception as e:
+            logger.error(f"Failed to rasterize {source_key}: {str(e)}")
+            page = None
+
+    if page is None:
+        return dict(payload, raster_key=None, raster_media_type=None)
+
+    _record_perceptual_hash(document_id, page)
+
+    raster_key = f"{PIPELINE_SETTINGS['RASTER_PREFIX']}{document_id}.jpg"
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as temp_file:
+        page.save(temp_file, "JPEG")
+        temp_file.flush()
+        storage.upload_file(temp_file.name, raster_key)
+
+    logger.info(f"Rasterized {source_key} to {raster_key}")
+    return dict(payload, raster_key=raster_key, raster_media_type="image/jpeg")
+
+
+def _record_perceptual_hash(document_id: int, image):
+    """Hash the first page and flag near-duplicates; never fails the stage"""
+    if image is None:
+        return
+    try:
+        DuplicateDetector.flag_near_duplicate(
+            document_id, DuplicateDetector.perceptual_hash(image)
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Near-duplicate check failed for {document_id}: {str(e)}")
+
+
+@celery_app.task(bind=True, name="pipeline.analyze_component", **STAGE_OPTIONS)
+def analyze_component(
+    self, payload: Dict[str, Any], component: str
+) -> Dict[str, Any]:
+    """Run one analysis prompt against the rasterized document"""
+    document_id, lease_owner = payload["document_id"], payload["lease_owner"]
+    _enter_stage(document_id, lease_owner, f"analysis of {component}")
+    try:
+        return _analyze(self.request.id, payload, component)
+    finally:
+        _hand_off(document_id, lease_owner)
+
+
+@celery_app.task(bind=True, name="pipeline.analyze_in_sequence", **STAGE_OPTIONS)
+def analyze_in_sequence(
+    self, payload: Dict[str, Any], components: List[str]
+) -> List[Dict[str, Any]]:
+    """Run analysis prompts one after another, for prompts that build on earlier ones"""
+    document_id, lease_owner = payload["document_id"], payload["lease_owner"]
+    _enter_stage(document_id, lease_owner, f"analysis of {components}")
+    try:
+        return [_analyze(self.request.id, payload, c) for c in components]
+    finally:
+        _hand_off(document_id, lease_owner)
+
+
+def _prior_analysis(document_id: int):
+    """Prompt context from a checkpointed unified pass, with its classification"""
+    result = AnalysisCheckpointService.succeeded_result(document_id, "unified")
+    if not result:
+        return None
+    return dict(
+        result.get("document_analysis") or {},
+        classification=result.get("classification"),
+    )
+
+
+def _analyze(task_id: str, payload: Dict[str, Any], component: str) -> Dict[str, Any]:
+    document_id, lease_owner = payload["document_id"], payload["lease_owner"]
+    checkpoint = AnalysisCheckpointService.begin(document_id, component, task_id)
+    if checkpoint.status == CHECKPOINT_STATUSES["SUCCEEDED"]:
+        # Redelivered or duplicate task: the result is already paid for
+        logger.info(f"Reusing checkpointed {component} for document {document_id}")
+        return {"component": component, "status": checkpoint.status}
+
+    image_data = None
+    if payload.get("raster_key"):
+        data = get_service("storage").get_file(payload["raster_key"])
+        if data:
+            image_data = LLMService.encode_image_bytes(
+                data, payload["raster_media_type"]
+            )
+
+    metadata = None
+    if component in PIPELINE_SETTINGS["CLASSIFIED_COMPONENTS"]:
+        metadata = _prior_analysis(document_id)
+
+    # Failures are checkpointed rather than raised, so one bad prompt
+    # doesn't prevent the chord from persisting the others
+    try:
+        with DocumentLease.heartbeat(document_id, lease_owner) as lease_lost:
+            result = get_service("llm").analyze_component(
+                component, payload["filename"], image_data, metadata=metadata
+            )
+        if lease_lost.is_set():
+            # Keep the paid-for result: the run that took over will reuse it
+            logger.warning(
+                f"Lease on document {document_id} lost during {component} analysis"
+            )
+    except Exception as e:
+        logger.error(
+            f"Analysis component {component} failed for document "
+            f"{document_id}: {str(e)}"
+        )
+        AnalysisCheckpointService.fail(document_id, component, str(e))
+        return {"component": component, "status": CHECKPOINT_STATUSES["FAILED"]}
+
+    if not result:
+        AnalysisCheckpointService.fail(document_id, component, "empty response")
+        return {"component": component, "status": CHECKPOINT_STATUSES["FAILED"]}
+
+    AnalysisCheckpointService.succeed(document_id, component, result)
+    return {"component": component, "status": CHECKPOINT_STATUSES["SUCCEEDED"]}
+
+
+@celery_app.task(name="pipeline.persist_analysis", **STAGE_OPTIONS)
+def persist_analysis(
+    component_results: List[Dict[str, Any]], document_id: int, lease_owner: str
+) -> Dict[str, Any]:
+    """Write all checkpointed component results in one transaction"""
+    _enter_stage(document_id, lease_owner, "persist")
+
+    # Celery unrolls a one-task group into a plain task, which passes its
+    # result on unwrapped
+    if isinstance(component_results, dict):
+        component_results = [component_results]
+
+    # analyze_in_sequence contributes a list of results
+    results = []
+    for r in component_results:
+        results.extend(r if isinstance(r, list) else [r])
+    failed = [
+        r["component"] for r in results if r["status"] == CHECKPOINT_STATUSES["FAILED"]
+    ]
+    if failed:
+        logger.warning(f"Components failed for document {document_id}: {failed}")
+
+    # Includes results checkpointed by earlier runs
+    response = AnalysisCheckpointService.merged_results(document_id)
+    if response:
+        try:
+            AnalysisStore.persist(document_id, response)
+        except Exception as e:
+            logger.error(f"Error persisting analysis for {document_id}: {str(e)}")
+
+    if not check_minimum_analysis(document_id):
+        _mark_failed(
+            document_id, lease_owner, "minimum required analysis not available"
+        )
+
+    doc = db.session.get(Document, document_id)
+    doc.status = DOCUMENT_STATUSES["COMPLETED"]
+    db.session.commit()
+    DocumentLease.release(document_id, lease_owner)
+    logger.info(f"Document {document_id} processing completed")
+
+    return {"document_id": document_id, "failed_components": failed}
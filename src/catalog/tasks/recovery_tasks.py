@@ -7,29 +7,32 @@ from src.catalog.constants import DOCUMENT_STATUSES
 
 
 @celery_app.task(name='tasks.reprocess_document', bind=True)
-def reprocess_document(self, filename: str, minio_path: str, document_id: int):
-    """Reprocess a document that failed or is stuck"""
+def reprocess_document(self, filename: str, minio_path: str, document_id: int,
+                       reset_checkpoints: bool = False):
+    """
+    Reprocess a document that failed or is stuck. Components that already
+    succeeded are reused unless reset_checkpoints is set.
+    """
     logger.info(
         f"Starting reprocessing for document: {filename} (ID: {document_id})")
 
-    # Import Flask app
-    from src.catalog import create_app
-    app = create_app()
+    if reset_checkpoints:
+        from src.catalog.services.checkpoint_service import AnalysisCheckpointService
+        AnalysisCheckpointService.reset(document_id)
 
-    with app.app_context():
-        doc = Document.query.get(document_id)
+    doc = Document.query.get(document_id)
 
-        if not doc:
-            logger.error(f"Document not found: {document_id}")
-            return False
+    if not doc:
+        logger.error(f"Document not found: {document_id}")
+        return False
 
-        # Update status to PENDING
-        doc.status = DOCUMENT_STATUSES['PENDING']  # Use imported constant
-        db.session.commit()
+    # Update status to PENDING
+    doc.status = DOCUMENT_STATUSES['PENDING']  # Use imported constant
+    db.session.commit()
 
-        # Call the regular processing task
-        from src.catalog.tasks.document_tasks import process_document
-        process_document.delay(filename, minio_path, document_id)
+    # Call the regular processing task
+    from src.catalog.tasks.document_tasks import process_document
+    process_document.delay(filename, minio_path, document_id)
 
-        logger.info(f"Queued document {document_id} for reprocessing")
-        return True
+    logger.info(f"Queued document {document_id} for reprocessing")
+    return True
@@ -0,0 +1,20 @@
+# tasks/taxonomy_tasks.py
+
+from .celery_app import celery_app, logger
+
+
+@celery_app.task(name="tasks.remap_keywords", bind=True)
+def remap_keywords(self, names=None, keyword_ids=None, include_unmapped=False):
+    """
+    Re-resolve stored keywords after a taxonomy change (see
+    KeywordRemapper); makes no LLM calls.
+    """
+    from src.catalog.services.keyword_remapper import KeywordRemapper
+
+    logger.info(
+        f"Task {self.request.id}: Remapping keywords for {len(names or [])} new "
+        f"names and {len(keyword_ids or [])} orphaned keywords"
+    )
+    return KeywordRemapper.remap(
+        names or [], keyword_ids or [], include_unmapped=include_unmapped
+    )
@@ -0,0 +1,95 @@
+# src/catalog/tasks/worker_context.py
+"""
+Per-worker-process Flask app and service singletons.
+
+Building the Flask app registers blueprints and initializes SQLAlchemy, the
+cache and CSRF, so it is done once per worker process in the
+worker_process_init hook rather than in every task. Tasks run inside this
+app's context via AppContextTask (see celery_app.py).
+"""
+
+import time
+import logging
+import threading
+
+from celery.signals import worker_process_init
+
+logger = logging.getLogger(__name__)
+
+_app = None
+_services = {}
+_lock = threading.Lock()
+
+
+def _storage_factory():
+    from src.catalog.services.storage_service import MinIOStorage
+
+    return MinIOStorage()
+
+
+def _preview_factory():
+    from src.catalog.services.preview_service import PreviewService
+
+    return PreviewService()
+
+
+def _llm_factory():
+    from src.catalog.services.llm_service import LLMService
+
+    return LLMService()
+
+
+SERVICE_FACTORIES = {
+    "storage": _storage_factory,
+    "preview": _preview_factory,
+    "llm": _llm_factory,
+}
+
+
+def get_worker_app():
+    """Return this process's Flask app, creating it on first use"""
+    global _app
+    if _app is None:
+        with _lock:
+            if _app is None:
+                from src.catalog import create_app
+
+                _app = create_app()
+    return _app
+
+
+def get_service(name: str):
+    """Return the process-wide instance of a service, creating it on first use"""
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.get(name)
+            if service is None:
+                service = SERVICE_FACTORIES[name]()
+                _services[name] = service
+    return service
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the Flask app and warm service singletons in each worker process"""
+    start_time = time.perf_counter()
+    app = get_worker_app()
+
+    with app.app_context():
+        from src.catalog import db
+
+        # Connections inherited from the parent process must not be shared
+        # across the fork
+        db.engine.dispose()
+
+        for name in SERVICE_FACTORIES:
+            try:
+                get_service(name)
+            except Exception as e:
+                # Leave it to be created (and fail loudly) on first use
+                logger.warning(f"Could not initialize {name} service: {str(e)}")
+
+    logger.info(
+        f"Worker process initialized in {time.perf_counter() - start_time:.3f}s"
+    )
@@ -0,0 +1,86 @@
+# src/catalog/utils/bulk_operations.py
+"""
+Dialect-aware bulk insert/upsert helpers.
+
+Both PostgreSQL (production) and SQLite (local development) support
+INSERT ... ON CONFLICT, so rows can be written in one statement per table
+instead of one ORM add/flush per row.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.catalog import db
+
+logger = logging.getLogger(__name__)
+
+
+def _dialect_insert():
+    """Return the insert() construct for the active database dialect"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(
+            f"Upserts are not supported for dialect {dialect} "
+            f"(supported: postgresql, sqlite)"
+        )
+    return insert
+
+
+def filter_columns(model, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop keys that are not columns of the model's table"""
+    columns = model.__table__.columns
+    return {key: value for key, value in data.items() if key in columns}
+
+
+def upsert_rows(
+    model,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Optional[Iterable[str]] = None,
+    returning: Optional[Sequence[Any]] = None,
+    where: Optional[Any] = None,
+):
+    """
+    Insert rows in a single multi-VALUES statement, updating on conflict.
+
+    Args:
+        model: SQLAlchemy model class
+        rows: Row dictionaries; all rows must share the same keys
+        index_elements: Columns of the unique index to resolve conflicts on
+        update_columns: Columns to overwrite on conflict (default: every
+            non-key column present in the rows). Pass an empty list to
+            ignore conflicting rows instead.
+        returning: Optional columns to return
+        where: Optional condition on the existing row; conflicting rows
+            that don't match it are left unchanged (and not returned)
+
+    Returns:
+        The execution result, or None if there was nothing to write
+    """
+    if not rows:
+        return None
+
+    insert = _dialect_insert()
+    stmt = insert(model).values(rows)
+
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in index_elements]
+    update_columns = list(update_columns)
+
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={column: stmt.excluded[column] for column in update_columns},
+            where=where,
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+
+    if returning:
+        stmt = stmt.returning(*returning)
+
+    return db.session.execute(stmt)
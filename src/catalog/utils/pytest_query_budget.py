@@ -0,0 +1,49 @@
+# src/catalog/utils/pytest_query_budget.py
+"""
+pytest plugin failing tests that exceed their SQL query budget.
+
+Enable it from a conftest with
+``pytest_plugins = ["src.catalog.utils.pytest_query_budget"]``, then
+either declare a budget for the whole test:
+
+    @pytest.mark.query_budget(12)
+    def test_home(client):
+        client.get("/")
+
+or budget individual blocks with the query_budget fixture:
+
+    def test_search(client, query_budget):
+        with query_budget(20, allow_n_plus_one=True):
+            client.get("/search/?q=tax")
+
+Only statements issued while the test body runs are counted, not those
+of fixture setup.
+"""
+
+import pytest
+
+from src.catalog.utils.query_metrics import query_budget as _query_budget
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, allow_n_plus_one=False): fail the test "
+        "when its body issues more SQL statements or an N+1",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    with _query_budget(*marker.args, label=item.nodeid, **marker.kwargs):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget():
+    """query_budget(max_queries, allow_n_plus_one=False) context manager"""
+    return _query_budget
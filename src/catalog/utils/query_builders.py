@@ -3,7 +3,7 @@
 Reusable database query patterns for consistent and optimized database access
 """
 
-from sqlalchemy import or_, func, desc, asc, case, text
+from sqlalchemy import or_, func, desc, asc
 from sqlalchemy.orm import joinedload
 from src.catalog import db
 from src.catalog.models import (
@@ -269,26 +269,52 @@ def get_failed_documents_query():
     return Document.query.filter_by(status=DOCUMENT_STATUSES['FAILED']).order_by(Document.upload_date.desc())
 
 
-def get_stuck_documents_query(hours=1):
+def get_stuck_documents_query():
     """
-    Get query for documents stuck in PROCESSING state
-
-    Args:
-        hours: Minimum hours since upload to consider a document stuck
+    Get query for in-flight documents whose processing lease has expired,
+    i.e. no live worker is responsible for them any more
 
     Returns:
         SQLAlchemy query for stuck documents
     """
-    from datetime import datetime, timedelta
-    from src.catalog.constants import DOCUMENT_STATUSES
+    from src.catalog.services.lease_service import DocumentLease
+
+    return DocumentLease.expired_query().order_by(Document.upload_date.desc())
 
-    time_threshold = datetime.utcnow() - timedelta(hours=hours)
 
-    # We're specifically looking for PROCESSING documents
-    return Document.query.filter(
-        Document.status == DOCUMENT_STATUSES['PROCESSING'],
-        Document.upload_date < time_threshold
-    ).order_by(Document.upload_date.desc())
+def get_near_duplicates_query():
+    """
+    Get query for documents flagged as near-duplicates of an earlier one,
+    for review
+
+    Returns:
+        SQLAlchemy query for flagged documents
+    """
+    return Document.query.filter(Document.near_duplicate_of_id.isnot(None)).order_by(Document.upload_date.desc())
+
+
+def get_missing_previews_query(include_outdated=False):
+    """
+    Get query for ids of documents without a generated preview, in id order
+
+    Args:
+        include_outdated: Also include documents whose preview predates
+            content-hash preview keys for the current renderer version
+
+    Returns:
+        SQLAlchemy query of document ids
+    """
+    from src.catalog.constants import PREVIEW_SETTINGS
+
+    missing = or_(
+        Document.preview_status.is_(None),
+        Document.preview_status != 'SUCCESS',
+        Document.s3_preview_key.is_(None),
+    )
+    if include_outdated:
+        current_prefix = f"previews/v{PREVIEW_SETTINGS['VERSION']}/"
+        missing = or_(missing, ~Document.s3_preview_key.startswith(current_prefix))
+    return db.session.query(Document.id).filter(missing).order_by(Document.id)
 
 
 def search_document_ids_by_vector(embeddings, similarity_threshold=0.7):
@@ -354,68 +380,15 @@ def get_document_statistics(days=30):
     """
     Get statistics about documents
 
+    Reads the daily_document_stats rollup, so the cost grows with the
+    number of days rather than the number of documents.
+
     Args:
         days: Number of days to look back
 
     Returns:
         Dictionary with document statistics
     """
-    from datetime import datetime, timedelta
-    time_period = datetime.utcnow() - timedelta(days=days)
-
-    # Base query for recent documents
-    base_query = Document.query.filter(Document.upload_date >= time_period)
-    total_docs = base_query.count()
-
-    # Calculate counts by status
-    completed = base_query.filter(
-        Document.status == DOCUMENT_STATUSES['COMPLETED']).count()
-    failed = base_query.filter(
-        Document.status == DOCUMENT_STATUSES['FAILED']).count()
-    pending = base_query.filter(
-        Document.status == DOCUMENT_STATUSES['PENDING']).count()
-    processing = base_query.filter(
-        Document.status == DOCUMENT_STATUSES['PROCESSING']).count()
-
-    # Calculate success rate
-    success_rate = (completed / total_docs * 100) if total_docs > 0 else 0
-
-    # Daily document processing volume
-    daily_processing = db.session.query(
-        func.date(Document.upload_date).label('date'),
-        func.count().label('total'),
-        func.sum(case((Document.status == DOCUMENT_STATUSES['COMPLETED'], 1), else_=0)).label(
-            'completed'),
-        func.sum(case((Document.status == DOCUMENT_STATUSES['FAILED'], 1), else_=0)).label(
-            'failed')
-    ).filter(
-        Document.upload_date >= time_period
-    ).group_by(
-        text('date')
-    ).order_by(
-        text('date')
-    ).all()
-
-    # Format daily processing data
-    daily_data = [
-        {
-            'date': date.strftime('%Y-%m-%d'),
-            'total': total,
-            'completed': completed,
-            'failed': failed,
-            'success_rate': (completed / total * 100) if total > 0 else 0
-        }
-        for date, total, completed, failed in daily_processing
-    ]
-
-    return {
-        'document_counts': {
-            'total': total_docs,
-            'completed': completed,
-            'failed': failed,
-            'pending': pending,
-            'processing': processing
-        },
-        'processing_success_rate': success_rate,
-        'daily_processing': daily_data
-    }
+    from src.catalog.services.stats_rollup import DocumentStatsRollup
+
+    return DocumentStatsRollup.statistics(days)
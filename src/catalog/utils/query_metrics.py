@@ -0,0 +1,246 @@
+# src/catalog/utils/query_metrics.py
+"""
+SQL statement counts and database time per request and per Celery task.
+
+Engine cursor events add every statement to the tracker of the current
+unit of work (a Flask request or a Celery task, held in a context
+variable, nested units also counting towards the enclosing one).
+Statements are grouped by shape, the SQL with literals and IN-list
+lengths collapsed, and a shape issued REPEAT_THRESHOLD times in one unit
+is reported as an N+1 together with the application frames that issued
+it. Outside a tracked unit the listeners do nothing.
+
+query_budget() fails a block that issues more statements than declared;
+tests get it from the src.catalog.utils.pytest_query_budget plugin.
+"""
+
+import os
+import re
+import time
+import logging
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from celery.signals import task_prerun, task_postrun
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.catalog.constants import QUERY_METRICS
+
+logger = logging.getLogger(__name__)
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_PARAMETER_LISTS = re.compile(
+    rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+_current: ContextVar = ContextVar("query_tracker", default=None)
+_task_tokens = {}
+
+
+def enabled() -> bool:
+    """Whether requests and tasks are tracked automatically"""
+    return os.getenv(
+        "QUERY_METRICS_ENABLED", str(QUERY_METRICS["ENABLED"])
+    ).lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """Statement with literals and parameter lists collapsed to one ?"""
+    shape = _LITERALS.sub("?", statement)
+    shape = _PARAMETER_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def stack_summary(limit: Optional[int] = None) -> List[str]:
+    """Innermost application frames of the current stack, outermost first"""
+    limit = limit or QUERY_METRICS["STACK_FRAMES"]
+    frames = [
+        f"{os.path.relpath(frame.filename, _PACKAGE_DIR)}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(_PACKAGE_DIR) and frame.filename != _THIS_FILE
+    ]
+    return frames[-limit:]
+
+
+class QueryTracker:
+    """Statements issued by one request, task or budgeted block"""
+
+    def __init__(self, label: str, parent: Optional["QueryTracker"] = None):
+        self.label = label
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.stacks: Dict[str, List[str]] = {}
+
+    def record(self, statement: str, seconds: float):
+        tracker = self
+        shape = statement_shape(statement)
+        while tracker is not None:
+            tracker.count += 1
+            tracker.seconds += seconds
+            tracker.shapes[shape] += 1
+            if tracker.shapes[shape] == QUERY_METRICS["REPEAT_THRESHOLD"]:
+                tracker.stacks[shape] = stack_summary()
+            tracker = tracker.parent
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        """Repeated statement shapes, most frequent first"""
+        return [
+            {"shape": shape, "count": self.shapes[shape], "stack": stack}
+            for shape, stack in sorted(
+                self.stacks.items(), key=lambda item: -self.shapes[item[0]]
+            )
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "queries": self.count,
+            "seconds": round(self.seconds, 4),
+            "n_plus_one": len(self.stacks),
+        }
+
+    def report(self):
+        """Log the unit's totals, and each N+1 offender with its stack"""
+        message = (
+            f"{self.label}: {self.count} queries, "
+            f"{self.seconds * 1000:.1f} ms in the database"
+        )
+        if (
+            self.stacks
+            or self.count > QUERY_METRICS["WARN_QUERIES"]
+            or self.seconds > QUERY_METRICS["WARN_SECONDS"]
+        ):
+            logger.warning(message)
+        else:
+            logger.debug(message)
+
+        for offender in self.n_plus_one():
+            stack = "\n    ".join(offender["stack"]) or "(no application frames)"
+            logger.warning(
+                f"Possible N+1 in {self.label}: {offender['count']}x "
+                f"{offender['shape'][:300]}\n    {stack}"
+            )
+
+
+@contextmanager
+def track(label: str):
+    """Track the statements issued inside the block"""
+    tracker = QueryTracker(label, parent=_current.get())
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block issued more statements than its declared budget"""
+
+
+@contextmanager
+def query_budget(
+    max_queries: int, allow_n_plus_one: bool = False, label: str = "query budget"
+):
+    """
+    Fail when the block issues more than max_queries statements, or
+    repeats a statement shape REPEAT_THRESHOLD times unless
+    allow_n_plus_one.
+    """
+    with track(label) as tracker:
+        yield tracker
+
+    problems = []
+    if tracker.count > max_queries:
+        problems.append(f"{tracker.count} queries, budget is {max_queries}")
+    if not allow_n_plus_one:
+        for offender in tracker.n_plus_one():
+            problems.append(
+                f"N+1: {offender['count']}x {offender['shape'][:300]}\n    "
+                + "\n    ".join(offender["stack"])
+            )
+    if problems:
+        raise QueryBudgetExceeded(f"{label}: " + "\n".join(problems))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracker = _current.get()
+    start_time = getattr(context, "_query_metrics_start", None)
+    if tracker is None or start_time is None:
+        return
+    tracker.record(statement, time.perf_counter() - start_time)
+
+
+def init_app(app):
+    """Track every request of app and add a Server-Timing header"""
+    if not enabled():
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_query_tracking():
+        tracker = QueryTracker(
+            f"{request.method} {request.path}", parent=_current.get()
+        )
+        g._query_tracker = (tracker, _current.set(tracker))
+
+    @app.after_request
+    def _add_server_timing(response):
+        tracker, _ = g.get("_query_tracker", (None, None))
+        if tracker is not None:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={tracker.seconds * 1000:.1f};desc="{tracker.count} queries"',
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_query_tracking(exc):
+        tracker, token = g.pop("_query_tracker", (None, None))
+        if tracker is None:
+            return
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Torn down in a different context than the request started in
+            _current.set(tracker.parent)
+        tracker.report()
+
+
+@task_prerun.connect
+def _task_started(task_id=None, task=None, **kwargs):
+    if task is not None and enabled():
+        tracker = QueryTracker(f"task {task.name}", parent=_current.get())
+        _task_tokens[task_id] = (tracker, _current.set(tracker))
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, **kwargs):
+    tracker, token = _task_tokens.pop(task_id, (None, None))
+    if tracker is None:
+        return
+    try:
+        _current.reset(token)
+    except ValueError:
+        _current.set(tracker.parent)
+    tracker.report()
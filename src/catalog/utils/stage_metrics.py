@@ -0,0 +1,107 @@
+# src/catalog/utils/stage_metrics.py
+"""
+Per-stage throughput metrics for the ingestion pipeline.
+
+Task start/finish signals are turned into per-minute Redis hashes
+(pipeline_metrics:<stage>:<minute>) holding completed/failed counts and
+total seconds, so throughput can be compared across stages and workers.
+"""
+
+import os
+import time
+import logging
+from typing import Any, Dict
+
+import redis
+from celery.signals import task_prerun, task_postrun
+
+from src.catalog.constants import PIPELINE_SETTINGS, PIPELINE_STAGES
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "pipeline_metrics"
+
+_client = None
+_started = {}
+
+
+def redis_client():
+    global _client
+    if _client is None:
+        url = (
+            os.environ.get("CELERY_BROKER_URL")
+            or os.environ.get("REDIS_URL")
+            or "redis://redis:6379/0"
+        )
+        _client = redis.Redis.from_url(url)
+    return _client
+
+
+def record_stage(stage: str, seconds: float, succeeded: bool = True):
+    """Add one finished stage run to the current minute's bucket"""
+    minute = int(time.time() // 60)
+    key = f"{KEY_PREFIX}:{stage}:{minute}"
+    try:
+        pipe = redis_client().pipeline()
+        pipe.hincrby(key, "completed" if succeeded else "failed", 1)
+        pipe.hincrbyfloat(key, "seconds", seconds)
+        pipe.expire(key, PIPELINE_SETTINGS["METRICS_TTL"])
+        pipe.execute()
+    except Exception as e:
+        # Metrics must never fail a task
+        logger.warning(f"Could not record metrics for stage {stage}: {str(e)}")
+
+
+def get_stage_metrics(window_minutes: int = 15) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the last window_minutes for every pipeline stage.
+
+    Returns:
+        {stage: {completed, failed, avg_seconds, per_minute}}
+    """
+    current_minute = int(time.time() // 60)
+    minutes = range(current_minute - window_minutes + 1, current_minute + 1)
+    stages = sorted(set(PIPELINE_STAGES.values()))
+
+    pipe = redis_client().pipeline()
+    for stage in stages:
+        for minute in minutes:
+            pipe.hgetall(f"{KEY_PREFIX}:{stage}:{minute}")
+    buckets = iter(pipe.execute())
+
+    summary = {}
+    for stage in stages:
+        completed = failed = 0
+        seconds = 0.0
+        for _ in minutes:
+            bucket = next(buckets)
+            completed += int(bucket.get(b"completed", 0))
+            failed += int(bucket.get(b"failed", 0))
+            seconds += float(bucket.get(b"seconds", 0.0))
+
+        runs = completed + failed
+        summary[stage] = {
+            "completed": completed,
+            "failed": failed,
+            "avg_seconds": round(seconds / runs, 3) if runs else None,
+            "per_minute": round(completed / window_minutes, 2),
+        }
+    return summary
+
+
+@task_prerun.connect
+def _stage_started(task_id=None, task=None, **kwargs):
+    if task is not None and task.name in PIPELINE_STAGES:
+        _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _stage_finished(task_id=None, task=None, state=None, **kwargs):
+    start_time = _started.pop(task_id, None)
+    if start_time is None:
+        return
+
+    elapsed = time.perf_counter() - start_time
+    stage = PIPELINE_STAGES[task.name]
+    record_stage(stage, elapsed, succeeded=state == "SUCCESS")
+    logger.info(f"Pipeline stage {stage} finished in {elapsed:.3f}s ({state})")
@@ -186,61 +186,17 @@ def review_document(document_id):
 def generate_missing_scorecards():
     """Generate evaluation scorecards for all documents that don't have them"""
     try:
-        # Find documents with COMPLETED status that don't have scorecards
-        from src.catalog.models import Document, DocumentScorecard
-        from sqlalchemy import and_, not_, exists
-        from src.catalog.services.evaluation_service import EvaluationService
-
-        # Use a clearer subquery approach that's less prone to SQLAlchemy issues
-        subquery = db.session.query(DocumentScorecard.document_id).subquery()
-
-        documents_without_scorecards = Document.query.filter(
-            Document.status == 'COMPLETED',
-            not_(Document.id.in_(subquery))
-        ).all()
-
-        current_app.logger.info(
-            f"Found {len(documents_without_scorecards)} documents without scorecards")
-
-        # Create evaluation service
-        eval_service = EvaluationService()
+        from src.catalog.services.bulk_evaluation import BulkScorecardEvaluator
 
-        # Create scorecards for each document
-        created_count = 0
-        error_count = 0
-
-        for doc in documents_without_scorecards:
-            try:
-                # Evaluate each batch
-                current_app.logger.info(
-                    f"Processing document {doc.id}: {doc.filename}")
-
-                batch1_success, batch1_message = eval_service.evaluate_batch1(
-                    doc.id)
-                current_app.logger.info(
-                    f"Batch 1 result: {batch1_success} - {batch1_message}")
-
-                batch2_success, batch2_message = eval_service.evaluate_batch2(
-                    doc.id)
-                current_app.logger.info(
-                    f"Batch 2 result: {batch2_success} - {batch2_message}")
-
-                batch3_success, batch3_message = eval_service.evaluate_batch3(
-                    doc.id)
-                current_app.logger.info(
-                    f"Batch 3 result: {batch3_success} - {batch3_message}")
-
-                created_count += 1
-                current_app.logger.info(
-                    f"Created scorecard for document {doc.id}")
-            except Exception as e:
-                current_app.logger.error(
-                    f"Error creating scorecard for document {doc.id}: {str(e)}")
-                error_count += 1
+        # Score COMPLETED documents without scorecards, a chunk per statement;
+        # ?rescore=1 re-scores every COMPLETED document
+        rescore = request.args.get('rescore', '').lower() in ('1', 'true', 'yes')
+        result = BulkScorecardEvaluator().run(only_missing=not rescore)
 
         return jsonify({
             'success': True,
-            'message': f"Created {created_count} scorecards out of {len(documents_without_scorecards)} documents with {error_count} errors"
+            'message': f"Scored {result['documents']} documents in {result['seconds']}s, {result['requires_review']} need review",
+            'result': result
         })
     except Exception as e:
         current_app.logger.error(f"Error generating scorecards: {str(e)}")
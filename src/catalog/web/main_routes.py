@@ -10,8 +10,8 @@ from flask import (
     url_for,
     jsonify,
     current_app,
+    Response,
 )
-from werkzeug.utils import secure_filename
 import os
 import logging
 import src.catalog
@@ -30,7 +30,13 @@ from src.catalog.models import (
 )
 from src.catalog.models import KeywordTaxonomy, KeywordSynonym
 from sqlalchemy import or_, func, desc, case, extract
-from src.catalog.services.preview_service import PreviewService
+from src.catalog.services.preview_service import (
+    PREVIEW_CACHE_CONTROL,
+    PREVIEW_FORMATS,
+    PREVIEW_KEY_PATTERN,
+    PreviewService,
+    placeholder_png,
+)
 from src.catalog.services.dropbox_service import DropboxService
 from flask_wtf.csrf import generate_csrf
 from src.catalog import csrf
@@ -55,10 +61,18 @@ from src.catalog.utils.query_builders import (
     build_document_with_relationships_query,
     apply_sorting,
     get_stuck_documents_query,
+    get_near_duplicates_query,
+)
+from src.catalog.constants import (
+    CACHE_TIMEOUTS,
+    PRESIGNED_URL_SETTINGS,
 )
-from src.catalog.constants import CACHE_TIMEOUTS
+from src.catalog.services.admission_service import AdmissionController
+from src.catalog.services.upload_service import UploadService
+from src.catalog.services.object_cache import ObjectDiskCache
 from flask import send_file  # Added for sending image file
 import io  # Added for BytesIO
+import hashlib
 
 
 main_routes = Blueprint("main_routes", __name__)
@@ -222,15 +236,7 @@ def home():
 
         for doc in documents:
             # Get preview if possible
-            preview = None
-            try:
-                preview = preview_service.get_preview(
-                    doc.id, doc.filename
-                )  # Pass doc.id
-            except Exception as e:
-                current_app.logger.error(
-                    f"Preview generation failed for {doc.filename}: {str(e)}"
-                )
+            preview = page_preview_links(doc)
 
             # Format document data
             formatted_doc = {
@@ -275,84 +281,31 @@ def upload_file():
         flash("No files selected or all files are empty.", "error")
         return redirect(url_for("main_routes.search_documents"))
 
-    uploaded_count = 0
-    failed_uploads = []
-
-    for file_storage in files:
-        if file_storage and file_storage.filename != "":
-            document = None  # Initialize document to None
-            temp_path = None  # Initialize temp_path
-            filename = secure_filename(file_storage.filename)
-
-            try:
-                temp_path = os.path.join("/tmp", filename)
-                file_storage.save(temp_path)
-
-                if not os.path.exists(temp_path):
-                    raise IOError(f"Failed to save temporary file: {temp_path}")
-
-                file_size = os.path.getsize(temp_path)
-
-                document = Document(
-                    filename=filename,
-                    upload_date=datetime.utcnow(),
-                    file_size=file_size,
-                    status="BATCH_PENDING",  # New status for batch processing
-                    page_count=0,
-                )
-                db.session.add(document)
-                db.session.commit()  # Commit to get document.id
-
-                # Upload to MinIO
-                minio_path = storage.upload_file(
-                    temp_path, filename
-                )  # Use document.id in path if preferred
-                current_app.logger.info(
-                    f"Successfully uploaded {filename} (ID: {document.id}) to MinIO at {minio_path}. Status: BATCH_PENDING."
-                )
-
-                # Update document with minio_path if your model stores it, or if it's derived
-                # For now, we assume minio_path is not directly stored on Document model but used by tasks
-
-                uploaded_count += 1
+    # Files are streamed from werkzeug's parsed parts (in memory or spooled
+    # temp files) to storage in parallel, and their documents created in
+    # one insert
+    try:
+        uploaded_ids, failed_uploads = UploadService.ingest(files)
+    except Exception as e:
+        current_app.logger.error(f"Upload error: {str(e)}", exc_info=True)
+        db.session.rollback()
+        uploaded_ids, failed_uploads = [], [f.filename for f in files if f.filename]
+    uploaded_count = len(uploaded_ids)
 
-            except Exception as e:
-                current_app.logger.error(
-                    f"Upload error for file '{filename}': {str(e)}",
-                    exc_info=True,
-                )
-                db.session.rollback()
-                if document and document.id:  # If document was created before error
-                    try:
-                        doc_to_fail = Document.query.get(document.id)
-                        if doc_to_fail:
-                            doc_to_fail.status = "FAILED"
-                            db.session.commit()
-                    except Exception as db_err:
-                        current_app.logger.error(
-                            f"Failed to mark document {filename} as FAILED after upload error: {db_err}",
-                            exc_info=True,
-                        )
-                        db.session.rollback()
-
-                failed_uploads.append(filename)
-
-            finally:
-                if temp_path and os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except OSError as os_err:
-                        current_app.logger.error(
-                            f"Error removing temp file '{temp_path}' during cleanup: {os_err}",
-                            exc_info=True,
-                        )
-        else:
-            # This case handles if an empty file part was somehow included in the list
-            current_app.logger.info("Skipped an empty file part in batch upload.")
+    # Start processing now; anything over the pipeline's capacity stays
+    # BATCH_PENDING for the process_batch_uploads safety net
+    dispatched = 0
+    if uploaded_ids:
+        try:
+            dispatched = AdmissionController.dispatch(document_ids=uploaded_ids)
+        except Exception as e:
+            current_app.logger.error(f"Error dispatching uploads: {str(e)}")
 
     if uploaded_count > 0:
+        queued = uploaded_count - dispatched
         flash(
-            f"{uploaded_count} file(s) uploaded successfully and are pending batch processing.",
+            f"{uploaded_count} file(s) uploaded successfully, {dispatched} processing"
+            + (f", {queued} queued for batch processing." if queued else "."),
             "success",
         )
     if failed_uploads:
@@ -370,34 +323,11 @@ def search_documents():
     return redirect(url_for("search_routes.search_documents", **request.args))
 
 
-@cache.memoize(timeout=300)
 def get_document_hierarchical_keywords(document_id):
-    """Get hierarchical keywords for a document"""
-    try:
-        keywords = (
-            db.session.query(LLMKeyword, KeywordTaxonomy)
-            .join(KeywordTaxonomy, LLMKeyword.taxonomy_id == KeywordTaxonomy.id)
-            .join(LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
-            .filter(LLMAnalysis.document_id == document_id)
-            .all()
-        )
+    """Get hierarchical keywords for a document (its stored keyword payload)"""
+    from src.catalog.services.keyword_manager import DocumentKeywordManager
 
-        result = []
-        for llm_kw, taxonomy in keywords:
-            result.append(
-                {
-                    "id": taxonomy.id,
-                    "term": taxonomy.term,
-                    "primary_category": taxonomy.primary_category,
-                    "subcategory": taxonomy.subcategory,
-                    "relevance_score": llm_kw.relevance_score,
-                }
-            )
-
-        return result
-    except Exception as e:
-        logger.error(f"Error getting hierarchical keywords: {str(e)}")
-        return []
+    return DocumentKeywordManager.get_document_keywords(document_id)
 
 
 @cache.memoize(timeout=300)
@@ -505,15 +435,7 @@ def recovery_dashboard():
         documents_data = []
 
         for doc in failed_documents:
-            preview = None
-            try:
-                preview = preview_service.get_preview(
-                    doc.id, doc.filename
-                )  # Pass doc.id
-            except Exception as e:
-                current_app.logger.error(
-                    f"Preview generation failed for {doc.filename}: {str(e)}"
-                )
+            preview = page_preview_links(doc)
 
             documents_data.append(
                 {
@@ -540,9 +462,8 @@ def recovery_dashboard():
 def recover_pending():
     """Display pending documents that might be stuck for recovery"""
     try:
-        # Use query builder for stuck documents (processing for more than 1 hour)
-        # We'll explicitly look for PROCESSING status
-        stuck_documents = get_stuck_documents_query(hours=1).all()
+        # Documents whose processing lease has expired
+        stuck_documents = get_stuck_documents_query().all()
 
         # Log the number of stuck documents
         current_app.logger.info(f"Found {len(stuck_documents)} stuck documents")
@@ -555,62 +476,7 @@ def recover_pending():
             time_since_upload = datetime.utcnow() - doc.upload_date
             hours_pending = time_since_upload.total_seconds() / 3600
 
-            # Get preview with better error handling
-            preview = None
-            try:  # This try was missing its except/finally, and filename was not defined
-                preview_data_from_service = preview_service.get_preview(
-                    doc.id, doc.filename  # Pass doc.id
-                )  # Use doc.filename
-
-                # Detailed logging for debugging the signal
-                current_app.logger.info(
-                    f"Preview data from service for '{doc.filename}': '{preview_data_from_service}' (type: {type(preview_data_from_service)})"
-                )
-                # Explicitly compare with the known signal string
-                expected_signal = "fallback_to_direct_url"
-                is_fallback_signal = preview_data_from_service == expected_signal
-                current_app.logger.info(
-                    f"Is it the fallback signal ('{expected_signal}')? {is_fallback_signal}"
-                )
-
-                if is_fallback_signal:
-                    current_app.logger.info(
-                        f"Fallback signal detected for '{doc.filename}'. Getting presigned URL."
-                    )
-                    direct_url = storage.get_presigned_url(doc.filename)
-                    if direct_url:
-                        current_app.logger.info(
-                            f"Successfully got presigned URL for '{doc.filename}': {direct_url}"
-                        )
-                        # This part seems to be from a different route /api/preview/, not recover_pending view
-                        # For recover_pending, we just need the preview content for the template
-                        preview = {
-                            "status": "fallback_redirect",
-                            "url": direct_url,
-                            "filename": doc.filename,
-                        }
-                    else:  # Failed to get presigned URL
-                        current_app.logger.error(
-                            f"Could not get presigned URL for '{doc.filename}' after fallback signal."
-                        )
-                        preview = {
-                            "status": "error",
-                            "message": "Preview generation signaled fallback, but failed to get direct URL.",
-                        }
-                else:
-                    # Not the fallback signal, so preview_data_from_service is actual preview content
-                    current_app.logger.info(
-                        f"Not the fallback signal for '{doc.filename}'. Treating as preview content. Preview data starts with: '{str(preview_data_from_service)[:100]}...'"
-                    )
-                    preview = {
-                        "status": "success",
-                        "preview": preview_data_from_service,
-                    }
-            except Exception as preview_exc:
-                current_app.logger.error(
-                    f"Preview generation failed for {doc.filename} in recover_pending: {str(preview_exc)}"
-                )
-                preview = None  # Ensure preview is None if an error occurs
+            preview = page_preview_links(doc)
 
             documents_data.append(
                 {
@@ -622,7 +488,7 @@ def recover_pending():
                     ),
                     "status": doc.status,
                     "hours_pending": f"{hours_pending:.2f}",
-                    "preview": preview,  # Use the fetched preview data
+                    "preview": preview,
                 }
             )
 
@@ -660,7 +526,7 @@ def recover_document(document_id):
         # Verify file exists in storage
         file_exists = False
         try:
-            storage.client.stat_object(storage.bucket, document.filename)
+            storage.client.stat_object(storage.bucket, document.object_key)
             file_exists = True
         except Exception as e:
             current_app.logger.error(f"File not found in storage: {str(e)}")
@@ -705,11 +571,14 @@ def recover_document(document_id):
             db.session.commit()
             raise task_error
 
+        from src.catalog.tasks.analysis_utils import missing_analysis_components
+
         return jsonify(
             {
                 "status": "success",
                 "message": f"Document recovery initiated for {document.filename}",
                 "task_id": task.id,
+                "resubmitted_components": missing_analysis_components(document.id),
             }
         )
 
@@ -797,6 +666,8 @@ def cache_stats():
         except Exception as e:
             stats["error"] = str(e)
 
+    stats["object_cache"] = ObjectDiskCache.get_stats()
+
     return jsonify(stats)
 
 
@@ -848,6 +719,159 @@ def api_documents():
     )
 
 
+@main_routes.route("/api/near-duplicates")
+def api_near_duplicates():
+    """Documents flagged as near-duplicates of an earlier document"""
+    limit = request.args.get("limit", 50, type=int)
+    documents = get_near_duplicates_query().limit(limit).all()
+
+    return jsonify(
+        {
+            "documents": [
+                {
+                    "id": doc.id,
+                    "filename": doc.filename,
+                    "upload_date": doc.upload_date.isoformat(),
+                    "near_duplicate_of_id": doc.near_duplicate_of_id,
+                }
+                for doc in documents
+            ]
+        }
+    )
+
+
+def preview_links_for_key(s3_key):
+    """
+    {"url", "srcset", "srcset_webp"} for a stored preview. Content-hash keys
+    get stable /previews/ URLs; legacy keys fall back to a presigned URL.
+    """
+    links = PreviewService.preview_links(s3_key)
+    if links:
+        return links
+    try:
+        url = storage.get_presigned_url(
+            s3_key,
+            bucket_name=current_app.config.get("S3_PREVIEW_BUCKET", storage.bucket),
+        )
+    except Exception as e:
+        current_app.logger.error(
+            f"Error generating presigned URL for {s3_key}: {str(e)}"
+        )
+        return None
+    return {"url": url, "srcset": None, "srcset_webp": None} if url else None
+
+
+def page_preview_links(doc):
+    """
+    {"url", "srcset", "srcset_webp"} for a server-rendered preview. Stored
+    previews get their multi-width srcsets; otherwise whatever get_preview
+    returns (a URL or placeholder data URI) is used without srcsets.
+    """
+    if doc.preview_status == "SUCCESS" and doc.s3_preview_key:
+        links = preview_links_for_key(doc.s3_preview_key)
+        if links:
+            return links
+
+    try:
+        preview = preview_service.get_preview(doc.id, doc.filename)
+        if preview == "fallback_to_direct_url":
+            preview = storage.get_presigned_url(doc.object_key)
+    except Exception as e:
+        current_app.logger.error(
+            f"Preview generation failed for {doc.filename}: {str(e)}"
+        )
+        return None
+    if not isinstance(preview, str) or not preview:
+        return None
+    return {"url": preview, "srcset": None, "srcset_webp": None}
+
+
+@main_routes.route("/previews/<path:key>")
+def serve_preview(key):
+    """
+    Send the browser to a preview variant in object storage. The objects
+    carry immutable Cache-Control metadata (keys contain the content hash
+    and renderer version); the redirect itself is cached only while the
+    presigned URL it points to stays valid.
+    """
+    object_name = f"previews/{key}"
+    match = PREVIEW_KEY_PATTERN.match(object_name)
+    if not match:
+        return jsonify({"status": "error", "message": "Unknown preview"}), 404
+
+    url = storage.get_presigned_url(object_name)
+    if url and url.startswith(("http://", "https://")):
+        response = redirect(url)
+        response.headers["Cache-Control"] = (
+            f"public, max-age={PRESIGNED_URL_SETTINGS['REFRESH_BEFORE']}"
+        )
+        return response
+
+    # Local storage has no URLs a browser can fetch: serve the bytes
+    etag = f"{match.group('sha')}-v{match.group('version')}-{os.path.basename(key)}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        data = storage.get_file(object_name)
+        if not data:
+            return jsonify({"status": "error", "message": "Preview not found"}), 404
+        mimetype = (
+            PREVIEW_FORMATS["webp"]["mimetype"]
+            if key.endswith(PREVIEW_FORMATS["webp"]["ext"])
+            else PREVIEW_FORMATS["jpeg"]["mimetype"]
+        )
+        response = Response(data, mimetype=mimetype)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = PREVIEW_CACHE_CONTROL
+    return response
+
+
+@main_routes.route("/api/previews")
+def api_previews_batch():
+    """
+    Preview URLs and statuses for up to BATCH_LIMIT documents in one call.
+
+    ?ids=1,2,3 -> {"previews": {"1": {...}}, "missing": [...]}. Documents
+    without a generated preview come back with url null; the client falls
+    back to /api/preview/<id>/<filename> for those, which starts generation.
+    """
+    try:
+        ids = [int(i) for i in request.args.get("ids", "").split(",") if i.strip()]
+    except ValueError:
+        return (
+            jsonify({"error": "ids must be a comma-separated list of integers"}),
+            400,
+        )
+
+    limit = PRESIGNED_URL_SETTINGS["BATCH_LIMIT"]
+    if len(ids) > limit:
+        return jsonify({"error": f"At most {limit} ids per request"}), 400
+    if not ids:
+        return jsonify({"previews": {}, "missing": []})
+
+    rows = db.session.query(
+        Document.id,
+        Document.filename,
+        Document.preview_status,
+        Document.s3_preview_key,
+    ).filter(Document.id.in_(ids))
+
+    previews = {}
+    for row in rows:
+        links = None
+        if row.preview_status == "SUCCESS" and row.s3_preview_key:
+            links = preview_links_for_key(row.s3_preview_key)
+        previews[str(row.id)] = dict(
+            links or {"url": None},
+            filename=row.filename,
+            preview_status=row.preview_status,
+        )
+
+    missing = [i for i in ids if str(i) not in previews]
+    return jsonify({"previews": previews, "missing": missing})
+
+
 # Add to app/routes/main_routes.py
 
 
@@ -885,33 +909,20 @@ def get_document_preview(document_id, filename):
             current_app.logger.info(
                 f"Doc ID {document_id}: Found SUCCESS status with s3_preview_key: {document.s3_preview_key}"
             )
-            preview_bucket_name = current_app.config.get(
-                "S3_PREVIEW_BUCKET", storage.bucket
-            )
-            try:
-                preview_url = storage.get_presigned_url(
-                    document.s3_preview_key, bucket_name=preview_bucket_name
-                )
-                if preview_url:
-                    return jsonify(
-                        {
-                            "status": "success",
-                            "url": preview_url,
-                            "filename": filename,
-                            "preview_type": "s3_generated",
-                        }
-                    )
-                else:
-                    current_app.logger.error(
-                        f"Doc ID {document_id}: Failed to get presigned URL for {document.s3_preview_key}"
+            links = preview_links_for_key(document.s3_preview_key)
+            if links:
+                return jsonify(
+                    dict(
+                        links,
+                        status="success",
+                        filename=filename,
+                        preview_type="s3_generated",
                     )
-                    # Fall through to call preview_service.get_preview for a fresh attempt or placeholder
-            except Exception as e_presign:
-                current_app.logger.error(
-                    f"Doc ID {document_id}: Error generating presigned URL for {document.s3_preview_key}: {e_presign}",
-                    exc_info=True,
                 )
-                # Fall through
+            current_app.logger.error(
+                f"Doc ID {document_id}: Failed to get a URL for {document.s3_preview_key}"
+            )
+            # Fall through to call preview_service.get_preview for a fresh attempt or placeholder
 
         # Check 2: Document preview generation is PENDING
         # This state is primarily managed by PreviewService's cache, but we can reflect it if DB says PENDING
@@ -955,42 +966,26 @@ def get_document_preview(document_id, filename):
                     "preview_type": "data_uri_from_service",
                 }
             )
-        elif isinstance(preview_data, dict) and "s3_key" in preview_data:
-            # This case might occur if _generate_preview_internal (called by get_preview) succeeded synchronously
-            s3_key = preview_data["s3_key"]
-            preview_bucket_name = current_app.config.get(
-                "S3_PREVIEW_BUCKET", storage.bucket
+        elif isinstance(preview_data, str) and preview_data.startswith("/previews/"):
+            # Generated (or already stored) synchronously under a content-hash key
+            links = PreviewService.preview_links(
+                preview_data.replace("/previews/", "previews/", 1)
             )
-            try:
-                preview_url = storage.get_presigned_url(
-                    s3_key, bucket_name=preview_bucket_name
-                )
-                if preview_url:
-                    return jsonify(
-                        {
-                            "status": "success",
-                            "url": preview_url,
-                            "filename": filename,
-                            "preview_type": "s3_sync_generated",
-                        }
-                    )
-                else:
-                    raise Exception(
-                        "Failed to generate presigned URL for synchronously generated S3 key."
-                    )
-            except Exception as e_presign_sync:
-                current_app.logger.error(
-                    f"Doc ID {document_id}: Error with sync generated s3_key {s3_key}: {e_presign_sync}",
-                    exc_info=True,
+            return jsonify(
+                dict(
+                    links,
+                    status="success",
+                    filename=filename,
+                    preview_type="s3_sync_generated",
                 )
-                # Fall through to final placeholder
+            )
         elif preview_data == "fallback_to_direct_url":
             current_app.logger.info(
                 f"Doc ID {document_id}: PreviewService signaled fallback_to_direct_url."
             )
             try:
                 original_doc_url = storage.get_presigned_url(
-                    filename, bucket_name=storage.bucket
+                    document.object_key, bucket_name=storage.bucket
                 )
                 if original_doc_url:
                     return jsonify(
@@ -1101,8 +1096,9 @@ def view_document(filename):
         # Log the request
         current_app.logger.info(f"Fetching document file: {filename}")
 
-        # Get the file data
-        file_data = storage.get_file(filename)
+        # Content-addressed documents are stored under their hash
+        document = Document.query.filter_by(filename=filename).first()
+        file_data = storage.get_file(document.object_key if document else filename)
 
         if not file_data:
             current_app.logger.error(f"Document file not found: {filename}")
@@ -1159,85 +1155,41 @@ def get_quality_metrics():
 @main_routes.route("/api/placeholder-image")
 def get_placeholder_image_route():
     """API endpoint to serve the placeholder image."""
-    try:
-        # The 'storage' instance is MinIOStorage, which has _get_placeholder_image
-        image_data = storage._get_placeholder_image()
-        if image_data:
-            return send_file(
-                io.BytesIO(image_data),
-                mimetype="image/png",
-                as_attachment=False,
-                download_name="placeholder.png",
-            )
-        else:
-            # This case should ideally not happen if _get_placeholder_image always returns something
-            current_app.logger.error("Placeholder image data was empty.")
-            return (
-                jsonify(
-                    {
-                        "status": "error",
-                        "message": "Failed to generate placeholder image",
-                    }
-                ),
-                500,
-            )
-    except Exception as e:
-        current_app.logger.error(
-            f"Error serving placeholder image: {str(e)}", exc_info=True
-        )
+    image_data = placeholder_png()
+    if not image_data:
+        current_app.logger.error("Placeholder image data was empty.")
         return (
             jsonify(
-                {"status": "error", "message": "Server error generating placeholder"}
+                {"status": "error", "message": "Failed to generate placeholder image"}
             ),
             500,
         )
 
+    response = send_file(
+        io.BytesIO(image_data),
+        mimetype="image/png",
+        as_attachment=False,
+        download_name="placeholder.png",
+        etag=False,
+    )
+    response.set_etag(hashlib.sha256(image_data).hexdigest()[:16])
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return response.make_conditional(request)
+
 
 @main_routes.route("/api/generate-scorecards", methods=["POST"])
 def generate_missing_scorecards():
     """Generate evaluation scorecards for all documents that don't have them"""
     try:
-        # Get documents with COMPLETED status
-        from src.catalog.models import Document, DocumentScorecard
-        from src.catalog.services.evaluation_service import EvaluationService
+        from src.catalog.services.bulk_evaluation import BulkScorecardEvaluator
 
-        # Find documents that don't have scorecards
-        documents_without_scorecards = (
-            db.session.query(Document)
-            .filter(
-                Document.status == "COMPLETED",
-                ~Document.id.in_(db.session.query(DocumentScorecard.document_id)),
-            )
-            .all()
-        )
-
-        current_app.logger.info(
-            f"Found {len(documents_without_scorecards)} documents without scorecards"
-        )
-
-        # Create evaluation service
-        eval_service = EvaluationService()
-
-        # Create scorecards for each document
-        created_count = 0
-        for doc in documents_without_scorecards:
-            try:
-                # Evaluate each batch
-                batch1_success, _ = eval_service.evaluate_batch1(doc.id)
-                batch2_success, _ = eval_service.evaluate_batch2(doc.id)
-                batch3_success, _ = eval_service.evaluate_batch3(doc.id)
-
-                created_count += 1
-                current_app.logger.info(f"Created scorecard for document {doc.id}")
-            except Exception as e:
-                current_app.logger.error(
-                    f"Error creating scorecard for document {doc.id}: {str(e)}"
-                )
+        result = BulkScorecardEvaluator().run(only_missing=True)
 
         return jsonify(
             {
                 "success": True,
-                "message": f"Created {created_count} scorecards out of {len(documents_without_scorecards)} documents",
+                "message": f"Created {result['documents']} scorecards in {result['seconds']}s",
+                "result": result,
             }
         )
     except Exception as e: